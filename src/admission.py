@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+LLM Admission Control for MCPMark
+=================================
+
+Proactive request budgeting for concurrent agents that share one provider
+account. Before each LLM call an agent asks the controller for admission
+with an estimate of the request's tokens; the controller admits calls in
+FIFO order while the last minute's requests and tokens stay within the
+provider's RPM / TPM limits, and corrects the estimate once the actual
+usage is known. A 429 pauses admission for everybody instead of letting
+every agent retry on its own.
+
+Controllers are shared per (provider, base URL). The budget window lives
+in memory by default; with ``MCPMARK_ADMISSION_DIR`` set it is kept in a
+lock-protected file there, so separate worker processes share it too.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+WINDOW_SECONDS = 60.0
+# Default pause after a 429 without a Retry-After hint
+RATE_LIMIT_PAUSE_SECONDS = 10.0
+# Longest single sleep while waiting, so pauses and freed capacity are noticed quickly
+MAX_POLL_SECONDS = 1.0
+# Request size estimate used before the provider reports usage
+CHARS_PER_TOKEN = 4
+OUTPUT_TOKENS_RESERVE = 1024
+
+
+@dataclass
+class Admission:
+    """Ticket for one admitted request."""
+
+    entry_id: int
+    estimated_tokens: int
+    waited: float
+
+
+def _evict(state: Dict[str, Any], now: float) -> None:
+    cutoff = now - WINDOW_SECONDS
+    entries = state["entries"]
+    while entries and entries[0][0] <= cutoff:
+        entries.pop(0)
+
+
+class _BudgetWindow(ABC):
+    """Sliding one-minute window of (timestamp, tokens, id) request entries."""
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int]):
+        self.rpm = rpm
+        self.tpm = tpm
+
+    @abstractmethod
+    def _state(self) -> ContextManager[Dict[str, Any]]:
+        """Exclusive access to the window state; changes are kept on exit."""
+
+    def try_acquire(self, tokens: int) -> Tuple[Optional[int], float]:
+        """Record a request if the budget allows it.
+
+        Returns:
+            Tuple of (entry id or None, seconds to wait before retrying)
+        """
+        with self._state() as state:
+            now = time.time()
+            _evict(state, now)
+            entries = state["entries"]
+
+            if now < state["paused_until"]:
+                return None, state["paused_until"] - now
+            if self.rpm and len(entries) >= self.rpm:
+                return None, entries[0][0] + WINDOW_SECONDS - now
+            # A request larger than the whole budget is admitted into an empty window
+            used = sum(entry[1] for entry in entries)
+            if self.tpm and entries and used + tokens > self.tpm:
+                return None, entries[0][0] + WINDOW_SECONDS - now
+
+            state["next_id"] += 1
+            entries.append([now, tokens, state["next_id"]])
+            return state["next_id"], 0.0
+
+    def adjust(self, entry_id: int, tokens: int) -> None:
+        """Replace the estimate of an admitted request with its actual usage."""
+        with self._state() as state:
+            for entry in state["entries"]:
+                if entry[2] == entry_id:
+                    entry[1] = tokens
+                    break
+
+    def pause(self, seconds: float) -> None:
+        with self._state() as state:
+            state["paused_until"] = max(state["paused_until"], time.time() + seconds)
+
+
+class _MemoryBudgetWindow(_BudgetWindow):
+    def __init__(self, rpm: Optional[int], tpm: Optional[int]):
+        super().__init__(rpm, tpm)
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {"entries": [], "paused_until": 0.0, "next_id": 0}
+
+    @contextmanager
+    def _state(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            yield self._data
+
+
+class _FileBudgetWindow(_BudgetWindow):
+    """Window stored in a JSON file guarded by ``flock`` (shared across processes)."""
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int], path: Union[str, Path]):
+        import fcntl  # Unix only; the in-memory window works everywhere
+
+        super().__init__(rpm, tpm)
+        self._fcntl = fcntl
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _state(self) -> Iterator[Dict[str, Any]]:
+        with self._lock, self.path.open("r+", encoding="utf-8") as f:
+            self._fcntl.flock(f, self._fcntl.LOCK_EX)
+            try:
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw.strip() else {}
+                except ValueError:
+                    state = {}
+                state.setdefault("entries", [])
+                state.setdefault("paused_until", 0.0)
+                state.setdefault("next_id", 0)
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                self._fcntl.flock(f, self._fcntl.LOCK_UN)
+
+
+class AdmissionController:
+    """FIFO admission of LLM requests under per-minute request and token budgets."""
+
+    def __init__(
+        self,
+        name: str,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        state_file: Union[str, Path, None] = None,
+    ):
+        """
+        Args:
+            name: Budget identity for logging (e.g. ``openai@default``)
+            rpm: Requests per minute allowed (None = unlimited; 429 pauses still apply)
+            tpm: Tokens per minute allowed (None = unlimited)
+            state_file: Share the window with other processes through this file
+        """
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self._window: _BudgetWindow = (
+            _FileBudgetWindow(rpm, tpm, state_file) if state_file else _MemoryBudgetWindow(rpm, tpm)
+        )
+        # asyncio.Lock wakes waiters in FIFO order; one lock per event loop
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def __repr__(self):
+        return f"AdmissionController({self.name!r}, rpm={self.rpm}, tpm={self.tpm})"
+
+    def _queue(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._queues.get(loop)
+        if lock is None:
+            lock = self._queues[loop] = asyncio.Lock()
+        return lock
+
+    async def admit(self, estimated_tokens: int) -> Admission:
+        """Wait (in arrival order) until the request fits the budget and no 429 pause is active."""
+        start = time.monotonic()
+        async with self._queue():
+            while True:
+                entry_id, wait = self._window.try_acquire(estimated_tokens)
+                if entry_id is not None:
+                    break
+                await asyncio.sleep(min(max(wait, 0.05), MAX_POLL_SECONDS))
+
+        waited = time.monotonic() - start
+        if waited > 5:
+            logger.info(f"| Waited {waited:.1f}s for {self.name} LLM budget")
+        return Admission(entry_id=entry_id, estimated_tokens=estimated_tokens, waited=waited)
+
+    def complete(self, admission: Admission, actual_tokens: Optional[int]) -> None:
+        """Replace the admitted estimate with the request's actual token usage."""
+        if actual_tokens is not None:
+            self._window.adjust(admission.entry_id, int(actual_tokens))
+
+    def release(self, admission: Admission) -> None:
+        """Drop the token estimate of a request that failed (429, timeout, error).
+
+        The request still counts toward the request budget, but its tokens
+        no longer hold back other requests, or the retry, for a minute.
+        """
+        self._window.adjust(admission.entry_id, 0)
+
+    def report_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Pause all admissions after a 429 from the provider."""
+        pause = retry_after if retry_after is not None else RATE_LIMIT_PAUSE_SECONDS
+        self._window.pause(pause)
+        logger.warning(f"| {self.name} rate limited; pausing LLM admissions for {pause:.1f}s")
+
+
+class RequestTokenEstimator:
+    """Pre-send token estimate for one growing conversation.
+
+    Starts from ~4 characters per token and, once the provider reports usage,
+    only estimates the messages appended since the last response.
+    """
+
+    def __init__(self, fixed_chars: int = 0, output_tokens: int = OUTPUT_TOKENS_RESERVE):
+        """
+        Args:
+            fixed_chars: Size of content sent with every request but not in the messages (tools, system)
+            output_tokens: Tokens reserved for the response
+        """
+        self.output_tokens = output_tokens
+        self._base_tokens = fixed_chars // CHARS_PER_TOKEN
+        self._counted = 0
+
+    def estimate(self, messages: List[Dict[str, Any]]) -> int:
+        new_chars = sum(len(json.dumps(m, default=str)) for m in messages[self._counted:])
+        return self._base_tokens + new_chars // CHARS_PER_TOKEN + self.output_tokens
+
+    def observe(self, sent_messages: int, input_tokens: int, output_tokens: int) -> None:
+        """Anchor the estimate on reported usage; the reply is the next message appended."""
+        if input_tokens:
+            self._base_tokens = input_tokens + output_tokens
+            self._counted = sent_messages + 1
+
+
+_controllers: Dict[Tuple[str, str], AdmissionController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_admission_controller(
+    provider: str,
+    base_url: Optional[str] = None,
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None,
+) -> AdmissionController:
+    """Process-wide controller for one provider account (provider + base URL)."""
+    key = (provider, base_url or "default")
+    with _controllers_lock:
+        controller = _controllers.get(key)
+        if controller is None:
+            state_dir = os.getenv("MCPMARK_ADMISSION_DIR")
+            state_file = None
+            if state_dir:
+                digest = hashlib.sha256("|".join(key).encode("utf-8")).hexdigest()[:16]
+                state_file = Path(state_dir) / f"{provider}-{digest}.json"
+            controller = AdmissionController(f"{key[0]}@{key[1]}", rpm, tpm, state_file)
+            _controllers[key] = controller
+        return controller
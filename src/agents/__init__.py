@@ -6,6 +6,13 @@ Provides a unified agent implementation using LiteLLM for model interactions
 and minimal MCP server management.
 """
 
-from .mcpmark_agent import MCPMarkAgent
+__all__ = ["MCPMarkAgent"]
 
-__all__ = ["MCPMarkAgent"]
\ No newline at end of file
+
+def __getattr__(name):
+    # Imported lazily: the agent module is only needed once an agent is built
+    if name == "MCPMarkAgent":
+        from .mcpmark_agent import MCPMarkAgent
+
+        return MCPMarkAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,5 +7,6 @@ Minimal MCP server implementations for MCPMark.
 
 from .stdio_server import MCPStdioServer
 from .http_server import MCPHttpServer
+from .inprocess_server import MCPInProcessServer
 
-__all__ = ["MCPStdioServer", "MCPHttpServer"]
\ No newline at end of file
+__all__ = ["MCPStdioServer", "MCPHttpServer", "MCPInProcessServer"]
\ No newline at end of file
@@ -31,6 +31,7 @@ class MCPHttpServer:
         self._stack: Optional[AsyncExitStack] = None
         self.session: Optional[ClientSession] = None
         self._tools_cache: Optional[List[Dict[str, Any]]] = None
+        self.server_info: Dict[str, Any] = {}  # name / version reported on initialize
 
     async def __aenter__(self):
         await self.start()
@@ -48,7 +49,10 @@ class MCPHttpServer:
         )
 
         self.session = await self._stack.enter_async_context(ClientSession(read_stream, write_stream))
-        await asyncio.wait_for(self.session.initialize(), timeout=self.timeout)
+        init = await asyncio.wait_for(self.session.initialize(), timeout=self.timeout)
+        # Field is ``serverInfo`` in older SDK releases, ``server_info`` in newer ones
+        info = getattr(init, "serverInfo", None) or getattr(init, "server_info", None)
+        self.server_info = {"name": info.name, "version": info.version} if info else {}
 
     async def stop(self):
         """Close the session/transport cleanly."""
@@ -0,0 +1,74 @@
+"""
+Minimal MCP In-Process Server Implementation
+============================================
+
+Runs an MCP SDK low-level ``Server`` in the agent's event loop and talks to
+it over in-memory streams, for services implemented in Python (e.g. the
+in-process Notion server).
+"""
+
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Any, AsyncContextManager, Dict, List, Optional
+
+import anyio
+from mcp import ClientSession
+from mcp.shared.memory import create_client_server_memory_streams
+
+
+class MCPInProcessServer:
+    """Same interface as :class:`MCPStdioServer`, without a subprocess."""
+
+    def __init__(self, server: Any, context: Optional[AsyncContextManager] = None, timeout: int = 120):
+        """
+        Args:
+            server: MCP SDK low-level ``Server`` to run
+            context: Optional async context manager held open for the session
+                (e.g. the server's API client)
+            timeout: Timeout in seconds of initialization and tool calls
+        """
+        self.server = server
+        self.context = context
+        self.timeout = timeout
+        self._stack: Optional[AsyncExitStack] = None
+        self.session: Optional[ClientSession] = None
+        self.server_info: Dict[str, Any] = {}  # name / version reported on initialize
+
+    async def __aenter__(self):
+        self._stack = AsyncExitStack()
+        try:
+            if self.context is not None:
+                await self._stack.enter_async_context(self.context)
+            client_streams, server_streams = await self._stack.enter_async_context(
+                create_client_server_memory_streams()
+            )
+            task_group = await self._stack.enter_async_context(anyio.create_task_group())
+            task_group.start_soon(
+                self.server.run, *server_streams, self.server.create_initialization_options()
+            )
+            # Stop the server before the task group waits for it (runs first on exit)
+            self._stack.callback(task_group.cancel_scope.cancel)
+            self.session = await self._stack.enter_async_context(ClientSession(*client_streams))
+            init = await asyncio.wait_for(self.session.initialize(), timeout=self.timeout)
+        except BaseException:
+            await self._stack.aclose()
+            self._stack = None
+            raise
+        # Field is ``serverInfo`` in older SDK releases, ``server_info`` in newer ones
+        info = getattr(init, "serverInfo", None) or getattr(init, "server_info", None)
+        self.server_info = {"name": info.name, "version": info.version} if info else {}
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._stack:
+            await self._stack.aclose()
+        self._stack = None
+        self.session = None
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        resp = await asyncio.wait_for(self.session.list_tools(), timeout=self.timeout)
+        return [t.model_dump(by_alias=True) for t in resp.tools]
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        result = await asyncio.wait_for(self.session.call_tool(name, arguments), timeout=self.timeout)
+        return result.model_dump(by_alias=True)
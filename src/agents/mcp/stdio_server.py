@@ -23,12 +23,16 @@ class MCPStdioServer:
         self._stack: Optional[AsyncExitStack] = None
         self._streams = None
         self.session: Optional[ClientSession] = None
+        self.server_info: Dict[str, Any] = {}  # name / version reported on initialize
 
     async def __aenter__(self):
         self._stack = AsyncExitStack()
         read, write = await self._stack.enter_async_context(stdio_client(self.params))
         self.session = await self._stack.enter_async_context(ClientSession(read, write))
-        await asyncio.wait_for(self.session.initialize(), timeout=self.timeout)
+        init = await asyncio.wait_for(self.session.initialize(), timeout=self.timeout)
+        # Field is ``serverInfo`` in older SDK releases, ``server_info`` in newer ones
+        info = getattr(init, "serverInfo", None) or getattr(init, "server_info", None)
+        self.server_info = {"name": info.name, "version": info.version} if info else {}
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
@@ -7,28 +7,65 @@ Unified agent using LiteLLM for all model interactions with minimal MCP support.
 
 import asyncio
 import json
+import logging
+import os
 import time
-import uuid
-import copy
  
-from typing import Any, Dict, List, Optional, Callable
-
-import httpx
-import litellm
-import nest_asyncio
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Callable, Tuple
 
+from src.admission import Admission, AdmissionController, RequestTokenEstimator
 from src.logger import get_logger
-from .mcp import MCPStdioServer, MCPHttpServer
-from .utils import TokenUsageTracker
-
-# Apply nested asyncio support
-nest_asyncio.apply()
+from src.mcp_services.notion.mcp_server import notion_mcp_backend
+from src.rate_limiter import RateLimiter
+from src.tracing import NOOP_SPAN, current_span, start_span, trace_span
+from .utils.tool_selection import EXPAND_TOOL_NAME
+from .utils import (
+    AgentCheckpoint,
+    CachedTools,
+    ExecutionLogWriter,
+    SDKFormatConverter,
+    TokenUsageTracker,
+    ToolArgumentError,
+    ToolArgumentValidator,
+    ToolSelector,
+    ToolStatsTracker,
+    TrajectoryWriter,
+    get_tool_schema_cache,
+    minification_enabled,
+    minifier_settings,
+    minify_tool_schema,
+    parse_tool_arguments,
+    read_trajectory,
+    schema_size,
+    tool_fingerprint,
+)
 
-# Configure LiteLLM
-litellm.suppress_debug_info = True
+# litellm, httpx and the MCP client stack are imported on first
+# use so that importing the agent (e.g. via the evaluator) stays fast
+if TYPE_CHECKING:
+    from .mcp import MCPStdioServer, MCPHttpServer, MCPInProcessServer
 
 logger = get_logger(__name__)
 
+
+def _import_litellm():
+    """Import and configure LiteLLM on first use."""
+    # Use the bundled model cost map instead of fetching it over the network at import
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    import litellm
+
+    litellm.suppress_debug_info = True
+    return litellm
+
+def _retry_after(response: Any) -> Optional[float]:
+    """Seconds from a response's ``Retry-After`` header, if present."""
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
 class MCPMarkAgent:
     """
     Unified agent for LLM and MCP server management using LiteLLM.
@@ -40,6 +77,8 @@ class MCPMarkAgent:
     # Constants
     MAX_TURNS = 100
     DEFAULT_TIMEOUT = 600
+    # 429 retries that go through the admission controller's shared pause
+    MAX_RATE_LIMIT_RETRIES = 5
     SYSTEM_PROMPT = (
         "You are a helpful agent that uses tools iteratively to complete the user's task, "
         "and when finished, provides the final answer or simply states \"Task completed\" without further tool calls."
@@ -68,6 +107,9 @@ class MCPMarkAgent:
         service_config: Optional[Dict[str, Any]] = None,
         service_config_provider: Optional[Callable[[], Dict]] = None,
         reasoning_effort: Optional[str] = "default",
+        rate_limiter: Optional[RateLimiter] = None,
+        admission: Optional[AdmissionController] = None,
+        tool_profiles: Optional[Dict[str, Dict[str, int]]] = None,
     ):
         """
         Initialize the MCPMark agent.
@@ -81,6 +123,10 @@ class MCPMarkAgent:
             service_config: Service-specific configuration
             service_config_provider: Optional provider for dynamic config
             reasoning_effort: Reasoning effort level ("default", "minimal", "low", "medium", "high")
+            rate_limiter: Optional shard rate limiter applied to MCP tool calls
+            admission: Optional LLM admission controller shared by agents on the same provider account
+            tool_profiles: Optional per-category tool call counts of this service; tasks of a
+                profiled category start with only those tools (see utils.tool_selection)
         """
         self.litellm_input_model_name = litellm_input_model_name
         self.api_key = api_key
@@ -90,6 +136,9 @@ class MCPMarkAgent:
         self.service_config = service_config or {}
         self._service_config_provider = service_config_provider
         self.reasoning_effort = reasoning_effort
+        self.rate_limiter = rate_limiter
+        self.admission = admission
+        self.tool_profiles = tool_profiles or {}
         
         # Detect if this is a Claude model
         self.is_claude = self._is_anthropic_model(litellm_input_model_name)
@@ -99,6 +148,9 @@ class MCPMarkAgent:
         
         # Initialize usage tracker
         self.usage_tracker = TokenUsageTracker()
+
+        # Per-tool latency / payload statistics of the current execution
+        self.tool_stats = ToolStatsTracker()
         
         # Track the actual model name from responses
         self.litellm_run_model_name = None
@@ -107,6 +159,27 @@ class MCPMarkAgent:
         self._partial_messages = []
         self._partial_token_usage = {}
         self._partial_turn_count = 0
+
+        # Optional streaming trajectory sink for the current execution
+        self._trajectory: Optional[TrajectoryWriter] = None
+        self._trajectory_message_count = 0
+
+        # SDK-format view of the (OpenAI-format) conversation, built as it grows
+        self._sdk_converter = SDKFormatConverter()
+
+        # Buffered execution.log sink for the current execution
+        self._execution_log: Optional[ExecutionLogWriter] = None
+
+        # Per-turn checkpointing and resume of the current execution
+        self._checkpoint_file: Optional[str] = None
+        self._checkpoint_state: Dict[str, Any] = {}
+        self._resume_from: Optional[AgentCheckpoint] = None
+
+        # Task category of the current execution (selects the tool profile)
+        self._task_category: Optional[str] = None
+
+        # Argument validator for the tools of the current MCP session
+        self._arg_validator: Optional[ToolArgumentValidator] = None
         
         logger.debug(
             f"Initialized MCPMarkAgent for '{mcp_service}' with model '{litellm_input_model_name}' "
@@ -145,17 +218,79 @@ class MCPMarkAgent:
         self._partial_messages = []
         self._partial_token_usage = {}
         self._partial_turn_count = 0
+        self._trajectory_message_count = 0
+        self._sdk_converter = SDKFormatConverter()
+        self.tool_stats.reset()
 
-    def _update_progress(self, messages: List[Dict], token_usage: Dict, turn_count: int):
-        """Record partial progress so we can return it on timeout/errors."""
+    def _write_execution_log(self, text: str) -> None:
+        """Append *text* to the task's execution log, if one is open (buffered, non-blocking)."""
+        if self._execution_log is not None:
+            self._execution_log.write(text)
+
+    def _update_progress(
+        self, messages: List[Dict], token_usage: Dict, turn_count: int, checkpoint: bool = False
+    ):
+        """Record partial progress so we can return it on timeout/errors.
+
+        Messages appended since the previous call are also streamed to the
+        trajectory file, if one is open, and converted to SDK format. With
+        *checkpoint* (end of a complete turn) a resumable checkpoint is
+        written after them.
+        """
         try:
-            # Deep copy to avoid mutation by callers
-            self._partial_messages = copy.deepcopy(messages)
+            # Messages are never mutated after being appended, so a shallow
+            # copy of the list is enough to freeze the partial trajectory
+            self._partial_messages = list(messages)
             self._partial_token_usage = dict(token_usage or {})
             self._partial_turn_count = int(turn_count or 0)
+
+            if self._trajectory is not None:
+                self._trajectory.extend(messages[self._trajectory_message_count:])
+                self._trajectory_message_count = len(messages)
+
+            # Convert each new message once, so finalizing is O(1)
+            if self.trajectory_format == "openai":
+                self._sdk_converter.sync(messages)
+
+            if checkpoint and self._trajectory is not None and self._checkpoint_file:
+                self._trajectory.checkpoint(
+                    self._checkpoint_file,
+                    AgentCheckpoint(
+                        trajectory_format=self.trajectory_format,
+                        message_count=len(messages),
+                        turn_count=self._partial_turn_count,
+                        token_usage=self._partial_token_usage,
+                        litellm_run_model_name=self.litellm_run_model_name,
+                        service_state=self._checkpoint_state,
+                    ),
+                )
         except Exception:
             # Best-effort; don't let progress recording crash execution
             pass
+
+    def _resume_progress(
+        self, messages: List[Dict], token_usage: Dict
+    ) -> Tuple[List[Dict], Dict, int]:
+        """Starting (messages, token usage, turn count) of a loop: fresh, or from the resume checkpoint."""
+        resume = self._resume_from
+        if resume is None:
+            return messages, token_usage, 0
+        logger.info(f"| Resuming from checkpoint at turn {resume.turn_count} ({resume.message_count} messages)")
+        self.litellm_run_model_name = resume.litellm_run_model_name
+        return list(resume.messages), {**token_usage, **resume.token_usage}, resume.turn_count
+
+    @property
+    def trajectory_format(self) -> str:
+        """Message dialect of the active execution path ("anthropic" or "openai")."""
+        return "anthropic" if self.use_claude_thinking else "openai"
+
+    @classmethod
+    def load_trajectory_messages(cls, trajectory_file: str) -> List[Dict]:
+        """Rebuild messages.json content from a streamed trajectory file."""
+        trajectory_format, messages = read_trajectory(trajectory_file)
+        if trajectory_format == "openai":
+            return cls._convert_to_sdk_format(messages)
+        return messages
     
 
 
@@ -164,7 +299,12 @@ class MCPMarkAgent:
     async def execute(
         self, 
         instruction: str, 
-        tool_call_log_file: Optional[str] = None
+        tool_call_log_file: Optional[str] = None,
+        trajectory_file: Optional[str] = None,
+        checkpoint_file: Optional[str] = None,
+        checkpoint_state: Optional[Dict[str, Any]] = None,
+        resume_from: Optional[AgentCheckpoint] = None,
+        task_category: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Execute instruction with the agent.
@@ -172,6 +312,12 @@ class MCPMarkAgent:
         Args:
             instruction: The instruction/prompt to execute
             tool_call_log_file: Optional path to log tool calls
+            trajectory_file: Optional JSONL file each message is streamed to
+            checkpoint_file: Optional checkpoint written after every complete turn
+                (requires trajectory_file, which holds the messages)
+            checkpoint_state: Service state stored in each checkpoint
+            resume_from: Checkpoint to continue the conversation from
+            task_category: Task category, used to pick a tool subset from ``tool_profiles``
             
         Returns:
             Dictionary containing execution results
@@ -181,6 +327,21 @@ class MCPMarkAgent:
         try:
             # Reset partial progress for this run
             self._reset_progress()
+            if resume_from is not None and resume_from.trajectory_format != self.trajectory_format:
+                logger.warning("| Checkpoint was written by a different execution path; starting fresh")
+                resume_from = None
+            self._resume_from = resume_from
+            self._checkpoint_file = checkpoint_file
+            self._checkpoint_state = dict(checkpoint_state or {})
+            self._task_category = task_category
+            if trajectory_file:
+                resumed_messages = resume_from.messages if resume_from is not None else None
+                self._trajectory = TrajectoryWriter(
+                    trajectory_file, self.trajectory_format, resumed_messages=resumed_messages
+                )
+                self._trajectory_message_count = len(resumed_messages or [])
+            if tool_call_log_file:
+                self._execution_log = ExecutionLogWriter(tool_call_log_file)
             # Refresh service configuration
             self._refresh_service_config()
             
@@ -214,6 +375,7 @@ class MCPMarkAgent:
             )
             
             result["execution_time"] = execution_time
+            result["tool_stats"] = self.tool_stats.get_stats()
             return result
         
         except Exception as e:
@@ -234,7 +396,7 @@ class MCPMarkAgent:
 
             if self._partial_messages:
                 if not self.is_claude:
-                    final_msg = self._convert_to_sdk_format(self._partial_messages)
+                    final_msg = self._sdk_converter.sync(self._partial_messages)
                 else:
                     final_msg = self._partial_messages
             else:
@@ -248,18 +410,35 @@ class MCPMarkAgent:
                 "execution_time": execution_time,
                 "error": error_msg,
                 "litellm_run_model_name": self.litellm_run_model_name,
+                "tool_stats": self.tool_stats.get_stats(),
             }
+
+        finally:
+            # Closing joins the writer threads; do it off the event loop
+            if self._trajectory is not None:
+                await asyncio.to_thread(self._trajectory.close)
+                self._trajectory = None
+            if self._execution_log is not None:
+                await asyncio.to_thread(self._execution_log.close)
+                self._execution_log = None
+            self._resume_from = None
+            self._checkpoint_file = None
+            self._task_category = None
             
 
     def execute_sync(
         self,
         instruction: str,
-        tool_call_log_file: Optional[str] = None
+        tool_call_log_file: Optional[str] = None,
+        trajectory_file: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Synchronous wrapper for execute method.
+
+        Only for callers without an event loop; inside a running loop (e.g. the
+        evaluator) await :meth:`execute` instead.
         """
-        return asyncio.run(self.execute(instruction, tool_call_log_file))
+        return asyncio.run(self.execute(instruction, tool_call_log_file, trajectory_file))
     
 
     def get_usage_stats(self) -> Dict[str, Any]:
@@ -294,9 +473,10 @@ class MCPMarkAgent:
         async with mcp_server:
             # Get available tools
             tools = await mcp_server.list_tools()
+            self._arg_validator = ToolArgumentValidator(tools)
             
-            # Convert MCP tools to Anthropic format
-            anthropic_tools = self._convert_to_anthropic_format(tools)
+            # Convert MCP tools to Anthropic format (cached across tasks)
+            anthropic_tools = self._get_converted_tools(tools, mcp_server, "anthropic")
             
             # Execute with function calling loop
             return await self._execute_anthropic_native_tool_loop(
@@ -309,9 +489,10 @@ class MCPMarkAgent:
         self,
         messages: List[Dict],
         thinking_budget: int,
-        tools: Optional[List[Dict]] = None,
+        tools: Optional[CachedTools] = None,
         mcp_servers: Optional[List[Dict]] = None,
-        system: Optional[str] = None
+        system: Optional[str] = None,
+        estimated_tokens: int = 0
     ) -> Dict[str, Any]:
         """
         Call Claude's native API directly using httpx.
@@ -319,15 +500,17 @@ class MCPMarkAgent:
         Args:
             messages: Conversation messages
             thinking_budget: Token budget for thinking
-            tools: Tool definitions for function calling
+            tools: Converted tool definitions (their cached JSON is spliced into the body)
             mcp_servers: MCP server configurations
             system: System prompt
+            estimated_tokens: Request size estimate for admission control
             
         Returns:
             API response as dictionary
         """
+        import httpx
+
         # Get API base and headers
-        import os
         api_base = os.getenv("ANTHROPIC_API_BASE", "https://api.anthropic.com") 
         headers = {
             "x-api-key": self.api_key,
@@ -353,7 +536,6 @@ class MCPMarkAgent:
         
         # Add tools if provided
         if tools:
-            payload["tools"] = tools
             payload["tool_choice"] = {"type": "auto"}
         
         # Add MCP servers if provided
@@ -364,28 +546,49 @@ class MCPMarkAgent:
         # Add system prompt if provided
         if system:
             payload["system"] = system
+
+        # Splice in the pre-serialized tools instead of re-encoding them every turn
+        body = json.dumps(payload)
+        if tools:
+            body = f'{body[:-1]},"tools":{tools.tools_json}}}'
         
         # Make the API call
         async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{api_base}/v1/messages",
-                    headers=headers,
-                    json=payload,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                return response.json(), None
-            except httpx.HTTPStatusError as e:
-                return None, e.response.text
-            except Exception as e:
-                return None, e
+            for attempt in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+                admission = await self._admit_llm_request(estimated_tokens)
+                try:
+                    response = await client.post(
+                        f"{api_base}/v1/messages",
+                        headers=headers,
+                        content=body.encode("utf-8"),
+                        timeout=self.timeout
+                    )
+                    response.raise_for_status()
+                    data = response.json()
+                    usage = data.get("usage") or {}
+                    self._complete_llm_request(
+                        admission, usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+                    )
+                    return data, None
+                except httpx.HTTPStatusError as e:
+                    self._release_llm_request(admission)
+                    if (
+                        e.response.status_code == 429
+                        and self.admission
+                        and attempt < self.MAX_RATE_LIMIT_RETRIES
+                    ):
+                        self.admission.report_rate_limited(_retry_after(e.response))
+                        continue
+                    return None, e.response.text
+                except Exception as e:
+                    self._release_llm_request(admission)
+                    return None, e
     
 
     async def _execute_anthropic_native_tool_loop(
         self,
         instruction: str,
-        tools: List[Dict],
+        tools: CachedTools,
         mcp_server: Any,
         thinking_budget: int,
         tool_call_log_file: Optional[str] = None
@@ -396,25 +599,40 @@ class MCPMarkAgent:
         """
         messages = [{"role": "user", "content": instruction}]
         total_tokens = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0, "reasoning_tokens": 0}
-        turn_count = 0
+        messages, total_tokens, turn_count = self._resume_progress(messages, total_tokens)
         max_turns = self.MAX_TURNS
         hit_turn_limit = False
         ended_normally = False
         
         system_text = self.SYSTEM_PROMPT
+        selector = self._make_tool_selector(tools.tools, "anthropic")
+        estimator = RequestTokenEstimator(fixed_chars=len(system_text) + len(tools.tools_json if tools else ""))
         # Record initial state
         self._update_progress(messages, total_tokens, turn_count)
+
+        turn_span = NOOP_SPAN
         
-        for _ in range(max_turns):
+        for _ in range(max_turns - turn_count):
             turn_count += 1
+            turn_span.end()
+            turn_span = start_span("agent.turn", turn=turn_count)
             
             # Call Claude native API
-            response, error_msg = await self._call_claude_native_api(
-                messages=messages,
-                thinking_budget=thinking_budget,
-                tools=tools,
-                system=system_text
-            )
+            with trace_span("llm.request", parent=turn_span, messages=len(messages)) as llm_span:
+                response, error_msg = await self._call_claude_native_api(
+                    messages=messages,
+                    thinking_budget=thinking_budget,
+                    tools=selector.current() if selector else tools,
+                    system=system_text,
+                    estimated_tokens=estimator.estimate(messages),
+                )
+                if error_msg:
+                    llm_span.set_error(str(error_msg))
+                elif "usage" in response:
+                    llm_span.set_attributes(
+                        input_tokens=response["usage"].get("input_tokens", 0),
+                        output_tokens=response["usage"].get("output_tokens", 0),
+                    )
             if turn_count == 1:
                 self.litellm_run_model_name = response['model'].split("/")[-1]
             
@@ -432,6 +650,7 @@ class MCPMarkAgent:
                 total_tokens["input_tokens"] += input_tokens
                 total_tokens["output_tokens"] += output_tokens
                 total_tokens["total_tokens"] += total_tokens_count
+                estimator.observe(len(messages), input_tokens, output_tokens)
                 
                 ## TODO: add reasoning tokens for claude
             
@@ -443,12 +662,9 @@ class MCPMarkAgent:
             
             # Log text output
             for tb in text_blocks:
-                if tb.get("text") and tool_call_log_file:
-                    with open(tool_call_log_file, 'a', encoding='utf-8') as f:
-                        f.write(f"{tb['text']}\n")
                 if tb.get("text"):
-                    for line in tb["text"].splitlines():
-                        logger.info(f"| {line}")
+                    self._write_execution_log(f"{tb['text']}\n")
+                    logger.info("\n".join(f"| {line}" for line in tb["text"].splitlines()))
             
             # Build assistant message with all blocks
             assistant_content = []
@@ -496,20 +712,26 @@ class MCPMarkAgent:
                 display_args = args_str[:140] + "..." if len(args_str) > 140 else args_str
                 logger.info(f"| \033[1m{name}\033[0m \033[2;37m{display_args}\033[0m")
                 
-                if tool_call_log_file:
-                    with open(tool_call_log_file, 'a', encoding='utf-8') as f:
-                        f.write(f"| {name} {args_str}\n")
+                self._write_execution_log(f"| {name} {args_str}\n")
                 
                 # Execute tool
                 try:
-                    result = await asyncio.wait_for(
-                        mcp_server.call_tool(name, inputs),
-                        timeout=60
+                    result_text = await self._run_tool_call(
+                        mcp_server, name, inputs, parent_span=turn_span, args_bytes=len(args_str),
+                        selector=selector,
                     )
                     tool_results.append({
                         "type": "tool_result",
                         "tool_use_id": tu["id"],
-                        "content": [{"type": "text", "text": json.dumps(result)}],
+                        "content": [{"type": "text", "text": result_text}],
+                    })
+                except ToolArgumentError as e:
+                    self.tool_stats.record_rejected(name)
+                    logger.warning(f"| {e}")
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": tu["id"],
+                        "content": [{"type": "text", "text": f"Error: {str(e)}"}],
                     })
                 except Exception as e:
                     logger.error(f"Tool call failed: {e}")
@@ -520,28 +742,20 @@ class MCPMarkAgent:
                     })
             
             messages.append({"role": "user", "content": tool_results})
-            # Update partial progress after tool results
-            self._update_progress(messages, total_tokens, turn_count)
+            # Update partial progress after tool results; the turn is complete
+            self._update_progress(messages, total_tokens, turn_count, checkpoint=True)
+
+        turn_span.end()
         
         # Detect if we exited due to hitting the turn limit
         if not ended_normally:
             if turn_count >= max_turns:
                 hit_turn_limit = True
                 logger.warning(f"| Max turns ({max_turns}) exceeded; returning failure with partial output.")
-                if tool_call_log_file:
-                    try:
-                        with open(tool_call_log_file, 'a', encoding='utf-8') as f:
-                            f.write(f"| Max turns ({max_turns}) exceeded\n")
-                    except Exception:
-                        pass
+                self._write_execution_log(f"| Max turns ({max_turns}) exceeded\n")
             elif error_msg:
                 logger.warning(f"| {error_msg}\n")
-                if tool_call_log_file:
-                    try:
-                        with open(tool_call_log_file, 'a', encoding='utf-8') as f:
-                            f.write(f"| {error_msg}\n")
-                    except Exception:
-                        pass
+                self._write_execution_log(f"| {error_msg}\n")
         
         # Display final token usage
         if total_tokens["total_tokens"] > 0:
@@ -608,9 +822,11 @@ class MCPMarkAgent:
             async with mcp_server:
                 # Get available tools
                 tools = await mcp_server.list_tools()
+                self._arg_validator = ToolArgumentValidator(tools)
                 
-                # Convert MCP tools to OpenAI function format
-                functions = self._convert_to_openai_format(tools)
+                # Convert MCP tools to OpenAI function format (cached across tasks)
+                flavor = "openai-gemini" if self._is_gemini_model() else "openai"
+                functions = self._get_converted_tools(tools, mcp_server, flavor).tools
                 
                 # Execute with function calling loop
                 return await self._execute_litellm_tool_loop(
@@ -635,7 +851,7 @@ class MCPMarkAgent:
             {"role": "user", "content": instruction}
         ]
         total_tokens = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0, "reasoning_tokens": 0}
-        turn_count = 0
+        messages, total_tokens, turn_count = self._resume_progress(messages, total_tokens)
         max_turns = self.MAX_TURNS  # Limit turns to prevent infinite loops
         consecutive_failures = 0
         max_consecutive_failures = 3
@@ -644,12 +860,23 @@ class MCPMarkAgent:
         
         # Convert functions to tools format for newer models
         tools = [{"type": "function", "function": func} for func in functions] if functions else None
+        selector = self._make_tool_selector(tools, "openai") if tools else None
+        estimator = RequestTokenEstimator(fixed_chars=len(json.dumps(tools)) if tools else 0)
+        rate_limit_retries = 0
 
         # Record initial state
         self._update_progress(messages, total_tokens, turn_count)
+
+        turn_span = NOOP_SPAN
+        span_turn = 0
         
         try:
             while turn_count < max_turns:
+                # Retries of a failed LLM call stay in the same turn span
+                if span_turn != turn_count + 1:
+                    turn_span.end()
+                    span_turn = turn_count + 1
+                    turn_span = start_span("agent.turn", turn=span_turn)
                 
                 # Build completion kwargs
                 completion_kwargs = {
@@ -660,7 +887,7 @@ class MCPMarkAgent:
                 
                 # Always use tools format if available - LiteLLM will handle conversion
                 if tools:
-                    completion_kwargs["tools"] = tools
+                    completion_kwargs["tools"] = selector.current().tools if selector else tools
                     completion_kwargs["tool_choice"] = "auto"
                 
                 # Add reasoning_effort and base_url if specified
@@ -669,14 +896,32 @@ class MCPMarkAgent:
                 if self.base_url:
                     completion_kwargs["base_url"] = self.base_url
                 
+                admission = None
                 try:
                     # Call LiteLLM with timeout for individual call
-                    response = await asyncio.wait_for(
-                        litellm.acompletion(**completion_kwargs),
-                        timeout = self.timeout / 2  # Use half of total timeout
-                    )
+                    with trace_span(
+                        "llm.request", parent=turn_span, messages=len(messages), attempt=consecutive_failures + 1
+                    ) as llm_span:
+                        admission = await self._admit_llm_request(estimator.estimate(messages))
+                        response = await asyncio.wait_for(
+                            _import_litellm().acompletion(**completion_kwargs),
+                            timeout = self.timeout / 2  # Use half of total timeout
+                        )
+                        if getattr(response, "usage", None):
+                            llm_span.set_attributes(
+                                input_tokens=response.usage.prompt_tokens or 0,
+                                output_tokens=response.usage.completion_tokens or 0,
+                            )
+                            self._complete_llm_request(admission, response.usage.total_tokens)
+                            estimator.observe(
+                                len(messages),
+                                response.usage.prompt_tokens or 0,
+                                response.usage.completion_tokens or 0,
+                            )
                     consecutive_failures = 0  # Reset failure counter on success
+                    rate_limit_retries = 0
                 except asyncio.TimeoutError:
+                    self._release_llm_request(admission)
                     logger.warning(f"| ✗ LLM call timed out on turn {turn_count + 1}")
                     consecutive_failures += 1
                     if consecutive_failures >= max_consecutive_failures:
@@ -684,6 +929,17 @@ class MCPMarkAgent:
                     await asyncio.sleep(8 ** consecutive_failures)  # Exponential backoff
                     continue
                 except Exception as e:
+                    self._release_llm_request(admission)
+                    # Rate limits pause every agent on this account instead of each backing off alone
+                    if (
+                        "RateLimitError" in str(e)
+                        and self.admission
+                        and rate_limit_retries < self.MAX_RATE_LIMIT_RETRIES
+                    ):
+                        rate_limit_retries += 1
+                        logger.warning(f"| ✗ LLM call rate limited on turn {turn_count + 1}")
+                        self.admission.report_rate_limited(_retry_after(getattr(e, "response", None)))
+                        continue
                     logger.error(f"| ✗ LLM call failed on turn {turn_count + 1}: {e}")
                     consecutive_failures += 1
                     if consecutive_failures >= max_consecutive_failures:
@@ -725,14 +981,11 @@ class MCPMarkAgent:
                     
                 # Log assistant's text content if present
                 if hasattr(message, 'content') and message.content:
-                    # Display the content with line prefix
-                    for line in message.content.splitlines():
-                        logger.info(f"| {line}")
+                    # Display the content with line prefix (one record, not one per line)
+                    logger.info("\n".join(f"| {line}" for line in message.content.splitlines()))
                     
                     # Also log to file if specified
-                    if tool_call_log_file:
-                        with open(tool_call_log_file, 'a', encoding='utf-8') as f:
-                            f.write(f"{message.content}\n")
+                    self._write_execution_log(f"{message.content}\n")
                 
                 # Check for tool calls (newer format)
                 if hasattr(message, 'tool_calls') and message.tool_calls:
@@ -743,17 +996,19 @@ class MCPMarkAgent:
                     # Process tool calls
                     for tool_call in message.tool_calls:
                         func_name = tool_call.function.name
-                        func_args = json.loads(tool_call.function.arguments)
+                        func_args = tool_call.function.arguments
                         
                         try:
-                            result = await asyncio.wait_for(
-                                mcp_server.call_tool(func_name, func_args),
-                                timeout=60
+                            func_args = parse_tool_arguments(tool_call.function.arguments)
+                            result_text = await self._run_tool_call(
+                                mcp_server, func_name, func_args, parent_span=turn_span,
+                                args_bytes=len(tool_call.function.arguments or ""),
+                                selector=selector,
                             )
                             messages.append({
                                 "role": "tool",
                                 "tool_call_id": tool_call.id,
-                                "content": json.dumps(result)
+                                "content": result_text
                             })
                         except asyncio.TimeoutError:
                             error_msg = f"Tool call '{func_name}' timed out after 60 seconds"
@@ -763,6 +1018,14 @@ class MCPMarkAgent:
                                 "tool_call_id": tool_call.id,
                                 "content": f"Error: {error_msg}"
                             })
+                        except ToolArgumentError as e:
+                            self.tool_stats.record_rejected(func_name)
+                            logger.warning(f"| {e}")
+                            messages.append({
+                                "role": "tool",
+                                "tool_call_id": tool_call.id,
+                                "content": f"Error: {str(e)}"
+                            })
                         except Exception as e:
                             logger.error(f"Tool call failed: {e}")
                             messages.append({
@@ -771,18 +1034,19 @@ class MCPMarkAgent:
                                 "content": f"Error: {str(e)}"
                             })   
                             
-                        # Format arguments for display (truncate if too long)
-                        args_str = json.dumps(func_args, separators=(",", ": "))
+                        # Format arguments for display (truncate if too long); unparsable ones verbatim
+                        if isinstance(func_args, dict):
+                            args_str = json.dumps(func_args, separators=(",", ": "))
+                        else:
+                            args_str = str(func_args)
                         display_arguments = args_str[:140] + "..." if len(args_str) > 140 else args_str
                         
                         # Log with ANSI color codes (bold tool name, dim gray arguments)
                         logger.info(f"| \033[1m{func_name}\033[0m \033[2;37m{display_arguments}\033[0m")
                         
-                        if tool_call_log_file:
-                            with open(tool_call_log_file, 'a', encoding='utf-8') as f:
-                                f.write(f"| {func_name} {args_str}\n")
-                    # Update progress after tool results appended
-                    self._update_progress(messages, total_tokens, turn_count)
+                        self._write_execution_log(f"| {func_name} {args_str}\n")
+                    # Update progress after tool results appended; the turn is complete
+                    self._update_progress(messages, total_tokens, turn_count, checkpoint=True)
                     continue
                 else:
                     # Log end reason
@@ -798,11 +1062,15 @@ class MCPMarkAgent:
                     self._update_progress(messages, total_tokens, turn_count)
                     ended_normally = True
                     break
+
+            turn_span.end()
                 
         except Exception as loop_error:
             # On any error, return partial conversation, token usage, and turn count
+            turn_span.set_error(str(loop_error))
+            turn_span.end()
             logger.error(f"Manual MCP loop failed: {loop_error}", exc_info=True)
-            sdk_format_messages = self._convert_to_sdk_format(messages)
+            sdk_format_messages = self._sdk_converter.sync(messages)
             return {
                 "success": False,
                 "output": sdk_format_messages,
@@ -816,12 +1084,7 @@ class MCPMarkAgent:
         if (not ended_normally) and (turn_count >= max_turns):
             hit_turn_limit = True
             logger.warning(f"| Max turns ({max_turns}) exceeded); returning failure with partial output.")
-            if tool_call_log_file:
-                try:
-                    with open(tool_call_log_file, 'a', encoding='utf-8') as f:
-                        f.write(f"| Max turns ({max_turns}) exceeded\n")
-                except Exception:
-                    pass
+            self._write_execution_log(f"| Max turns ({max_turns}) exceeded\n")
 
         # Display final token usage
         if total_tokens["total_tokens"] > 0:
@@ -836,7 +1099,7 @@ class MCPMarkAgent:
             logger.info(f"| Turns: {turn_count}")
         
         # Convert messages to SDK format for backward compatibility
-        sdk_format_messages = self._convert_to_sdk_format(messages)
+        sdk_format_messages = self._sdk_converter.sync(messages)
         
         return {
             "success": not hit_turn_limit,
@@ -851,203 +1114,100 @@ class MCPMarkAgent:
 
     # ==================== Format Conversion Methods ====================
 
-    def _convert_to_sdk_format(self, messages: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _convert_to_sdk_format(messages: List[Dict]) -> List[Dict]:
         """Convert OpenAI messages format to old SDK format for backward compatibility."""
-        sdk_format = []
-        function_call_map = {}  # Track function names to call IDs for legacy format
-
-        for msg in messages:
-            role = msg.get("role")
-
-            if role == "user":
-                # User messages stay mostly the same
-                user_content = msg.get("content", "")
-                
-                # Handle tool_result messages (content as list)
-                if isinstance(user_content, list):
-                    # Check if this is a tool_result message
-                    tool_results = [item for item in user_content if isinstance(item, dict) and item.get("type") == "tool_result"]
-                    if tool_results:
-                        # Convert tool_results to function_call_output format
-                        for tr in tool_results:
-                            content_items = tr.get("content", [])
-                            text_content = ""
-                            for ci in content_items:
-                                if isinstance(ci, dict) and ci.get("type") == "text":
-                                    text_content = ci.get("text", "")
-                                    break
-                            sdk_format.append({
-                                "call_id": tr.get("tool_use_id", ""),
-                                "output": json.dumps({
-                                    "type": "text",
-                                    "text": text_content,
-                                    "annotations": None,
-                                    "meta": None
-                                }),
-                                "type": "function_call_output"
-                            })
-                    else:
-                        # Regular user content as list - extract text
-                        text_parts = []
-                        for item in user_content:
-                            if isinstance(item, dict) and item.get("type") == "text":
-                                text_parts.append(item.get("text", ""))
-                        sdk_format.append({
-                            "content": "\n".join(text_parts) if text_parts else "",
-                            "role": "user"
-                        })
-                else:
-                    # String content
-                    sdk_format.append({
-                        "content": user_content,
-                        "role": "user"
-                    })
+        return SDKFormatConverter().extend(messages)
 
-            elif role == "assistant":
-                # === CHANGED ORDER START ===
-                tool_calls = msg.get("tool_calls", [])
-                function_call = msg.get("function_call")
-                content = msg.get("content")
-
-                # Handle both string content and list content (for Claude thinking)
-                if isinstance(content, list):
-                    # Extract text from content blocks (e.g., Claude responses with thinking)
-                    text_parts = []
-                    claude_tool_uses = []
-                    for block in content:
-                        if isinstance(block, dict):
-                            if block.get("type") == "text":
-                                text_parts.append(block.get("text", ""))
-                            elif block.get("type") == "thinking":
-                                # Include thinking in output (marked as such)
-                                thinking_text = block.get("thinking", "")
-                                if thinking_text:
-                                    text_parts.append(f"<think>\n{thinking_text}\n</think>")
-                            elif block.get("type") == "tool_use":
-                                # Store tool_use blocks for later processing
-                                claude_tool_uses.append(block)
-                    content = "\n".join(text_parts) if text_parts else ""
-                    
-                    # Add Claude tool_uses to regular tool_calls
-                    if claude_tool_uses and not tool_calls:
-                        tool_calls = []
-                        for tu in claude_tool_uses:
-                            tool_calls.append({
-                                "id": tu.get("id"),
-                                "function": {
-                                    "name": tu.get("name"),
-                                    "arguments": json.dumps(tu.get("input", {}))
-                                }
-                            })
-                
-                # 1) First add assistant's text content (if present)
-                if content:
-                    sdk_format.append({
-                        "id": "__fake_id__",
-                        "content": [
-                            {
-                                "annotations": [],
-                                "text": content if content else "",
-                                "type": "output_text"
-                            }
-                        ],
-                        "role": "assistant",
-                        "status": "completed",
-                        "type": "message"
-                    })
+    
 
-                # 2) Then add (new format) tool_calls
-                if tool_calls:
-                    for tool_call in tool_calls:
-                        call_id = tool_call.get("id", f"call_{uuid.uuid4().hex}")
-                        func_name = tool_call.get("function", {}).get("name", "")
-                        sdk_format.append({
-                            "arguments": tool_call.get("function", {}).get("arguments", "{}"),
-                            "call_id": call_id,
-                            "name": func_name,
-                            "type": "function_call",
-                            "id": "__fake_id__"
-                        })
-
-                # 3) Finally handle (legacy format) function_call
-                if function_call:
-                    func_name = function_call.get("name", "")
-                    call_id = f"call_{uuid.uuid4().hex}"
-                    function_call_map[func_name] = call_id  # Store for matching responses
-                    sdk_format.append({
-                        "arguments": function_call.get("arguments", "{}"),
-                        "call_id": call_id,
-                        "name": func_name,
-                        "type": "function_call",
-                        "id": "__fake_id__"
-                    })
+    def _make_tool_selector(self, tools: List[Dict], flavor: str) -> Optional[ToolSelector]:
+        """Tool subset for the current task's category, or None to send every tool.
 
-                # 4) If neither content nor any calls exist, maintain fallback behavior
-                if not content and not tool_calls and not function_call:
-                    sdk_format.append({
-                        "id": "__fake_id__",
-                        "content": [
-                            {
-                                "annotations": [],
-                                "text": "",
-                                "type": "output_text"
-                            }
-                        ],
-                        "role": "assistant",
-                        "status": "completed",
-                        "type": "message"
-                    })
-                # === CHANGED ORDER END ===
-
-            elif role == "tool":
-                # Tool responses
-                sdk_format.append({
-                    "call_id": msg.get("tool_call_id", ""),
-                    "output": json.dumps({
-                        "type": "text",
-                        "text": msg.get("content", ""),
-                        "annotations": None,
-                        "meta": None
-                    }),
-                    "type": "function_call_output"
-                })
+        *tools* are converted tools of *flavor*: "anthropic" (``name``) or
+        "openai" (``{"type": "function", "function": {...}}``).
+        """
+        profile = self.tool_profiles.get(self._task_category or "")
+        if not profile:
+            return None
 
-            elif role == "function":
-                # Legacy function responses - try to match with stored call ID
-                func_name = msg.get("name", "")
-                call_id = function_call_map.get(func_name, f"call_{uuid.uuid4().hex}")
-                sdk_format.append({
-                    "call_id": call_id,
-                    "output": json.dumps({
-                        "type": "text",
-                        "text": msg.get("content", ""),
-                        "annotations": None,
-                        "meta": None
-                    }),
-                    "type": "function_call_output"
-                })
+        if flavor == "anthropic":
+            selector = ToolSelector(
+                tools,
+                profile,
+                name_of=lambda tool: tool["name"],
+                make_tool=lambda name, description, schema: {
+                    "name": name, "description": description, "input_schema": schema
+                },
+            )
+        else:
+            selector = ToolSelector(
+                tools,
+                profile,
+                name_of=lambda tool: tool["function"]["name"],
+                make_tool=lambda name, description, schema: {
+                    "type": "function",
+                    "function": {"name": name, "description": description, "parameters": schema},
+                },
+            )
+        if not selector.enabled_count:
+            return None
+        logger.info(
+            f"| Tool selection: {selector.enabled_count}/{len(tools)} tools for category '{self._task_category}'"
+        )
+        return selector
 
-        return sdk_format
+    def _get_converted_tools(self, tools: List[Dict], mcp_server: Any, flavor: str) -> CachedTools:
+        """Convert MCP tools for *flavor* ("anthropic", "openai", "openai-gemini"), memoized.
 
-    
+        The cache key covers the service, the MCP server's name/version, the
+        full tool list and the converter version, so identical servers across
+        tasks and workers reuse one conversion. Minified conversions are keyed
+        by the minifier settings as well.
+        """
+        if minification_enabled():
+            flavor += f"+min:{minifier_settings()}"
+        fingerprint = tool_fingerprint(
+            self.mcp_service, flavor, tools, getattr(mcp_server, "server_info", None)
+        )
+        if flavor.startswith("anthropic"):
+            convert = lambda: self._convert_to_anthropic_format(tools)
+        else:
+            convert = lambda: self._convert_to_openai_format(tools)
+        return get_tool_schema_cache().get_or_convert(fingerprint, convert)
 
     def _convert_to_anthropic_format(self, tools: List[Dict]) -> List[Dict]:
         """Convert MCP tool definitions to Anthropic format."""
         anthropic_tools = []
+        minify = minification_enabled()
         
         for tool in tools:
+            description = tool.get("description", "")
+            input_schema = tool.get("inputSchema", {
+                "type": "object",
+                "properties": {},
+                "required": []
+            })
+            if minify:
+                description, input_schema = minify_tool_schema(tool.get("name"), description, input_schema)
             anthropic_tool = {
                 "name": tool.get("name"),
-                "description": tool.get("description", ""),
-                "input_schema": tool.get("inputSchema", {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                })
+                "description": description,
+                "input_schema": input_schema
             }
             anthropic_tools.append(anthropic_tool)
         
+        if minify:
+            self._log_minified_size(tools, anthropic_tools)
         return anthropic_tools
+
+    def _log_minified_size(self, tools: List[Dict], converted: List[Dict]) -> None:
+        original = schema_size(tools)
+        if original:
+            logger.info(
+                f"| Minified tool schemas: {original} -> {schema_size(converted)} chars "
+                f"({len(tools)} tools)"
+            )
     
     def _is_gemini_model(self) -> bool:
         """Check if the model is a Gemini model."""
@@ -1101,9 +1261,13 @@ class MCPMarkAgent:
         
         For Gemini models, applies schema simplification to handle
         compatibility issues with deeply nested array type definitions.
+        Schemas are minified afterwards if enabled; Gemini gets no
+        ``$ref`` deduplication.
         """
         functions = []
         is_gemini = self._is_gemini_model()
+        minify = minification_enabled()
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         
         if is_gemini:
             logger.debug(f"Detected Gemini model: {self.litellm_input_model_name}")
@@ -1119,22 +1283,29 @@ class MCPMarkAgent:
             
             # Simplify schema for Gemini if needed
             if is_gemini:
-                original_schema = input_schema.copy()  # Keep for debugging
+                original_schema = input_schema
                 input_schema = self._simplify_schema_for_gemini(input_schema)
                 
-                # Log significant changes for debugging
-                if input_schema != original_schema:
+                # Log significant changes for debugging (the deep comparison is skipped otherwise)
+                if debug_enabled and input_schema != original_schema:
                     logger.debug(f"Simplified schema for tool #{i} '{tool.get('name')}'")
             
+            description = tool.get("description", "")
+            if minify:
+                description, input_schema = minify_tool_schema(
+                    tool.get("name"), description, input_schema, dedupe=not is_gemini
+                )
             function = {
                 "name": tool.get("name"),
-                "description": tool.get("description", ""),
+                "description": description,
                 "parameters": input_schema
             }
             functions.append(function)
         
         if is_gemini:
             logger.info(f"| Converted {len(functions)} tools for Gemini model with schema simplification")
+        if minify:
+            self._log_minified_size(tools, functions)
         
         return functions
 
@@ -1143,8 +1314,88 @@ class MCPMarkAgent:
 
     # ==================== MCP Server Management ====================
 
+    async def _admit_llm_request(self, estimated_tokens: int) -> Optional[Admission]:
+        """Wait for the admission controller (if any) to let an LLM request through."""
+        if not self.admission:
+            return None
+        admission = await self.admission.admit(estimated_tokens)
+        current_span().set_attributes(
+            estimated_tokens=estimated_tokens, admission_wait_s=round(admission.waited, 3)
+        )
+        return admission
+
+    def _complete_llm_request(self, admission: Optional[Admission], actual_tokens: Optional[int]) -> None:
+        """Report a request's actual token usage back to the admission controller."""
+        if admission and self.admission:
+            self.admission.complete(admission, actual_tokens)
+
+    def _release_llm_request(self, admission: Optional[Admission]) -> None:
+        """Free the token estimate of a failed LLM request in the admission window."""
+        if admission and self.admission:
+            self.admission.release(admission)
+
+    async def _run_tool_call(
+        self,
+        mcp_server: Any,
+        name: str,
+        arguments: Dict[str, Any],
+        parent_span: Any = None,
+        args_bytes: int = 0,
+        selector: Optional[ToolSelector] = None,
+    ) -> str:
+        """Call a tool and return its JSON-serialized result.
+
+        The call is traced and recorded in the per-tool statistics; exceptions
+        (including timeouts) are recorded and re-raised. With a tool *selector*,
+        ``enable_tools`` is answered locally and calling a hidden tool enables it.
+
+        Raises:
+            ToolArgumentError: Arguments do not match the tool's input schema
+                (checked locally; the call is not dispatched)
+        """
+        if selector is not None:
+            if name == EXPAND_TOOL_NAME:
+                return selector.handle_expand_call(arguments)
+            selector.enable([name])
+        if self._arg_validator is not None:
+            self._arg_validator.validate(name, arguments)
+
+        start = time.perf_counter()
+        result_bytes = 0
+        error = timeout = False
+        try:
+            with trace_span("tool.call", parent=parent_span, tool=name, args_bytes=args_bytes) as span:
+                result = await self._call_mcp_tool(mcp_server, name, arguments)
+                result_text = json.dumps(result)
+                result_bytes = len(result_text)
+                span.set_attribute("result_bytes", result_bytes)
+            return result_text
+        except asyncio.TimeoutError:
+            error = timeout = True
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.tool_stats.record(
+                name, time.perf_counter() - start, result_bytes, error=error, timeout=timeout
+            )
+
+    async def _call_mcp_tool(self, mcp_server: Any, name: str, arguments: Dict[str, Any]) -> Any:
+        """Call an MCP tool, respecting the shard rate limit, with a 60s timeout."""
+        if self.rate_limiter:
+            wait_start = time.perf_counter()
+            await self.rate_limiter.acquire_async()
+            current_span().set_attribute("rate_limit_wait_s", round(time.perf_counter() - wait_start, 4))
+        return await asyncio.wait_for(
+            mcp_server.call_tool(name, arguments),
+            timeout=60
+        )
+
     async def _create_mcp_server(self) -> Any:
         """Create and return an MCP server instance."""
+        if self.mcp_service == "notion" and notion_mcp_backend() == "python":
+            return self._create_inprocess_notion_server()
         if self.mcp_service in self.STDIO_SERVICES:
             return self._create_stdio_server()
         elif self.mcp_service in self.HTTP_SERVICES:
@@ -1153,8 +1404,18 @@ class MCPMarkAgent:
             raise ValueError(f"Unsupported MCP service: {self.mcp_service}")
     
 
-    def _create_stdio_server(self) -> MCPStdioServer:
+    def _create_inprocess_notion_server(self) -> "MCPInProcessServer":
+        """Create the Python Notion MCP server, run in this event loop."""
+        from .mcp import MCPInProcessServer
+        from src.mcp_services.notion.mcp_server import NotionMCPServer
+
+        notion = NotionMCPServer(self.service_config.get("notion_key"))
+        return MCPInProcessServer(notion.server, context=notion)
+
+    def _create_stdio_server(self) -> "MCPStdioServer":
         """Create stdio-based MCP server."""
+        from .mcp import MCPStdioServer
+
         if self.mcp_service == "notion":
             notion_key = self.service_config.get("notion_key")
             if not notion_key:
@@ -1221,8 +1482,10 @@ class MCPMarkAgent:
             raise ValueError(f"Unsupported stdio service: {self.mcp_service}")
     
 
-    def _create_http_server(self) -> MCPHttpServer:
+    def _create_http_server(self) -> "MCPHttpServer":
         """Create HTTP-based MCP server."""
+        from .mcp import MCPHttpServer
+
         if self.mcp_service == "github":
             github_token = self.service_config.get("github_token")
             if not github_token:
@@ -3,6 +3,46 @@ Utility functions for MCPMark Agent
 ====================================
 """
 
+from .arg_validation import ToolArgumentError, ToolArgumentValidator, parse_tool_arguments
+from .checkpoint import CHECKPOINT_FILENAME, AgentCheckpoint
+from .execution_log import ExecutionLogWriter
+from .schema_minifier import (
+    minification_enabled,
+    minifier_settings,
+    minify_schema,
+    minify_tool_schema,
+    schema_size,
+)
+from .sdk_format import SDKFormatConverter
 from .token_usage import TokenUsageTracker
+from .tool_schema_cache import CachedTools, ToolSchemaCache, get_tool_schema_cache, tool_fingerprint
+from .tool_selection import ToolSelector, build_tool_profiles, load_tool_profiles
+from .tool_stats import ToolStatsTracker, merge_tool_stats
+from .trajectory import TrajectoryWriter, read_trajectory
 
-__all__ = ["TokenUsageTracker"]
\ No newline at end of file
+__all__ = [
+    "ToolArgumentError",
+    "ToolArgumentValidator",
+    "parse_tool_arguments",
+    "AgentCheckpoint",
+    "CHECKPOINT_FILENAME",
+    "ExecutionLogWriter",
+    "SDKFormatConverter",
+    "minification_enabled",
+    "minifier_settings",
+    "minify_schema",
+    "minify_tool_schema",
+    "schema_size",
+    "TokenUsageTracker",
+    "CachedTools",
+    "ToolSchemaCache",
+    "get_tool_schema_cache",
+    "tool_fingerprint",
+    "ToolSelector",
+    "build_tool_profiles",
+    "load_tool_profiles",
+    "ToolStatsTracker",
+    "merge_tool_stats",
+    "TrajectoryWriter",
+    "read_trajectory",
+]
@@ -0,0 +1,130 @@
+"""
+Tool Argument Validation
+========================
+
+Checks tool call arguments against the tool's ``inputSchema`` before the
+call is dispatched, so malformed calls are answered locally with a precise
+error instead of a round trip through the MCP server and the service API.
+
+Models sometimes pass an object or array argument as a JSON string. The MCP
+servers decode such strings before use, so arguments are also accepted when
+they only match the schema after decoding them (the call still receives the
+arguments unchanged); only calls the server would reject are answered locally.
+
+Validators are compiled on first use of a tool and cached per process by
+schema, so identical schemas across tasks and sessions compile once.
+Validation needs ``jsonschema``; without it every call is dispatched as
+before.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_REPORTED_ERRORS = 3
+
+
+class ToolArgumentError(ValueError):
+    """Tool call arguments that cannot be parsed or do not match the tool's schema."""
+
+
+def parse_tool_arguments(raw: Optional[str]) -> Dict[str, Any]:
+    """Decode the JSON arguments string of a tool call (empty means no arguments).
+
+    Raises:
+        ToolArgumentError: Invalid JSON or not a JSON object
+    """
+    if raw is None or not raw.strip():
+        return {}
+    try:
+        arguments = json.loads(raw)
+    except ValueError as e:
+        raise ToolArgumentError(f"Tool arguments are not valid JSON: {e}") from None
+    if not isinstance(arguments, dict):
+        raise ToolArgumentError(
+            f"Tool arguments must be a JSON object, got {type(arguments).__name__}"
+        )
+    return arguments
+
+
+def decode_json_string_arguments(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """*arguments* with top-level JSON object/array strings decoded, as the MCP servers do."""
+    decoded = {}
+    for name, value in arguments.items():
+        if isinstance(value, str) and value.lstrip()[:1] in ("{", "["):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        decoded[name] = value
+    return decoded
+
+
+@lru_cache(maxsize=512)
+def _compile(schema_json: str) -> Any:
+    """jsonschema validator of a schema (None if jsonschema is unavailable or the schema is invalid)."""
+    try:
+        from jsonschema import validators
+        from jsonschema.exceptions import SchemaError
+    except ImportError:
+        return None
+    schema = json.loads(schema_json)
+    cls = validators.validator_for(schema)
+    try:
+        cls.check_schema(schema)
+    except SchemaError as e:
+        logger.debug(f"| Not validating against invalid tool schema: {e.message}")
+        return None
+    return cls(schema)
+
+
+def _format_error(error: Any) -> str:
+    location = "/".join(str(part) for part in error.absolute_path)
+    return f"{location}: {error.message}" if location else error.message
+
+
+class ToolArgumentValidator:
+    """Per-session validator for the tools listed by one MCP server."""
+
+    def __init__(self, tools: List[Dict[str, Any]]):
+        """
+        Args:
+            tools: Tool definitions as returned by ``list_tools`` (with ``inputSchema``)
+        """
+        self._schemas = {
+            tool.get("name"): json.dumps(tool.get("inputSchema") or {}, sort_keys=True)
+            for tool in tools
+        }
+        self._validators: Dict[str, Any] = {}
+
+    def validate(self, name: str, arguments: Dict[str, Any]) -> None:
+        """Check *arguments* of a call to *name*; tools without a schema pass.
+
+        Raises:
+            ToolArgumentError: With every violation (up to MAX_REPORTED_ERRORS), by path
+        """
+        if name not in self._schemas:
+            return
+        if name not in self._validators:
+            self._validators[name] = _compile(self._schemas[name])
+        validator = self._validators[name]
+        if validator is None:
+            return
+
+        if validator.is_valid(arguments):
+            return
+        decoded = decode_json_string_arguments(arguments)
+        if decoded != arguments and validator.is_valid(decoded):
+            return  # the server decodes the JSON strings and accepts the call
+        # Report the violations the server would see
+        errors = sorted(
+            validator.iter_errors(decoded), key=lambda e: [str(part) for part in e.absolute_path]
+        )
+        details = "; ".join(_format_error(error) for error in errors[:MAX_REPORTED_ERRORS])
+        if len(errors) > MAX_REPORTED_ERRORS:
+            details += f"; and {len(errors) - MAX_REPORTED_ERRORS} more"
+        raise ToolArgumentError(f"Invalid arguments for tool '{name}': {details}")
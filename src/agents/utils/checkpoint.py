@@ -0,0 +1,76 @@
+"""
+Agent Checkpoints
+=================
+
+Per-turn snapshot of an agent run, written next to ``trajectory.jsonl`` as
+``checkpoint.json``. The messages themselves live in the trajectory file; the
+checkpoint records how many of them form complete turns, the token usage and
+turn count at that point, and opaque service state (e.g. the duplicated
+Notion page) needed to reattach to the task's environment.
+
+The trajectory writer thread writes the checkpoint after the messages it
+covers, so a checkpoint never references messages that are not on disk.
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from src.logger import get_logger
+from .trajectory import read_trajectory
+
+logger = get_logger(__name__)
+
+CHECKPOINT_FILENAME = "checkpoint.json"
+
+
+@dataclass
+class AgentCheckpoint:
+    """State of an agent run at the end of its last completed turn."""
+
+    trajectory_format: str
+    message_count: int
+    turn_count: int
+    token_usage: Dict[str, int] = field(default_factory=dict)
+    litellm_run_model_name: Optional[str] = None
+    service_state: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    # Filled in by load(); not part of the checkpoint file
+    messages: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("messages")
+        return data
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Atomically write the checkpoint (write-then-rename)."""
+        path = Path(path)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self.to_dict(), default=str), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(
+        cls, path: Union[str, Path], trajectory_path: Union[str, Path]
+    ) -> Optional["AgentCheckpoint"]:
+        """Read a checkpoint and the messages it covers; None if either is missing or unusable."""
+        path, trajectory_path = Path(path), Path(trajectory_path)
+        if not path.exists() or not trajectory_path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            checkpoint = cls(**{k: v for k, v in data.items() if k != "messages"})
+            trajectory_format, messages = read_trajectory(trajectory_path)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"| Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+        if trajectory_format != checkpoint.trajectory_format or len(messages) < checkpoint.message_count:
+            logger.warning(f"| Ignoring checkpoint {path}: trajectory does not match")
+            return None
+        checkpoint.messages = messages[: checkpoint.message_count]
+        return checkpoint
@@ -0,0 +1,69 @@
+"""
+Buffered Execution Log Writer
+=============================
+
+Sink for the per-task ``execution.log``. The agent loops used to open and
+close the file for every text chunk and tool call on the event-loop thread;
+here lines are queued and written through one open file by a background
+thread, which flushes whenever it has drained the queue (i.e. at the end of
+each burst of output, typically a turn).
+"""
+
+import queue
+import threading
+from pathlib import Path
+from typing import Union
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class ExecutionLogWriter:
+    """Background-thread appender for a task's execution log."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._file = self.path.open("a", encoding="utf-8")
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"execution-log-{self.path.parent.name}", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, text: str) -> None:
+        """Queue *text* for appending (never blocks on I/O)."""
+        if not self._closed:
+            self._queue.put(text)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            try:
+                self._file.write(item)
+                if self._queue.empty():
+                    self._file.flush()
+            except Exception as e:
+                logger.warning(f"| Failed to write execution log: {e}")
+        self._file.flush()
+
+    def close(self) -> None:
+        """Drain pending lines and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self) -> "ExecutionLogWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,412 @@
+"""
+Tool Schema Minifier
+====================
+
+Shrinks MCP tool input schemas before they are sent with every LLM request:
+
+- drops annotation keywords that do not affect validation (``title``,
+  ``examples``, ``$comment``, ...),
+- trims descriptions to a character budget,
+- unwraps single-branch ``anyOf`` / ``oneOf`` / ``allOf``,
+- hoists subschemas repeated within a tool into ``$defs`` and references them.
+
+None of these changes what a schema accepts. :func:`minify_tool_schema`
+checks that for every tool against the original schema, independently of
+the minification rules:
+
+- the minified schema, with its ``$defs`` references expanded and
+  annotations and descriptions removed, must equal the original with only
+  annotations and descriptions removed;
+- where it does not (an unwrapped combinator), jsonschema must give the same
+  verdict for both schemas on instances generated from the original:
+  defaults, enum values and typed samples per property, objects missing each
+  property or carrying an extra one, and wrong-typed values.
+
+A tool failing the check is minified again without unwrapping, and sent as
+listed if that fails too.
+
+Opt-in with ``MCPMARK_MINIFY_TOOL_SCHEMAS=1``: trimmed descriptions and
+``$ref`` indirection change what the model sees, so minified results are not
+directly comparable with unminified ones. The evaluator records
+:func:`minifier_settings` in each ``meta.json`` of a minified run.
+"""
+
+import copy
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+DESCRIPTION_BUDGET = 160
+TOOL_DESCRIPTION_BUDGET = 1024
+# Only subschemas at least this large (as JSON) are worth a $ref
+MIN_DEDUPE_CHARS = 120
+DEFS_PREFIX = "m"
+MINIFY_ENV = "MCPMARK_MINIFY_TOOL_SCHEMAS"
+# Bump whenever the minification rules change; part of the tool cache key
+MINIFIER_VERSION = 2
+# Instances generated per tool to compare original and minified schemas
+MAX_PROBE_INSTANCES = 500
+
+ANNOTATION_KEYWORDS = frozenset(
+    {"title", "examples", "example", "$comment", "deprecated", "readOnly", "writeOnly", "$schema"}
+)
+_COMBINATORS = ("anyOf", "oneOf", "allOf")
+# Keywords whose value is a schema, a list of schemas, or a name -> schema map
+_SCHEMA_KEYWORDS = frozenset(
+    {
+        "items", "additionalItems", "additionalProperties", "contains", "propertyNames",
+        "not", "if", "then", "else", "unevaluatedItems", "unevaluatedProperties",
+    }
+)
+_SCHEMA_LIST_KEYWORDS = frozenset({"anyOf", "oneOf", "allOf", "prefixItems", "items"})
+_SCHEMA_MAP_KEYWORDS = frozenset(
+    {"properties", "patternProperties", "$defs", "definitions", "dependentSchemas"}
+)
+
+
+def minification_enabled() -> bool:
+    return os.getenv(MINIFY_ENV, "0").lower() in ("1", "true", "yes")
+
+
+def minifier_settings() -> str:
+    """Version and budgets of the minifier, for keying cached conversions."""
+    return f"v{MINIFIER_VERSION}:{DESCRIPTION_BUDGET}:{TOOL_DESCRIPTION_BUDGET}:{MIN_DEDUPE_CHARS}:{DEFS_PREFIX}"
+
+
+def trim_description(text: str, budget: int) -> str:
+    """Cut *text* to at most *budget* characters at a word boundary."""
+    if len(text) <= budget:
+        return text
+    cut = text[: budget - 1]
+    space = cut.rfind(" ")
+    if space > budget // 2:
+        cut = cut[:space]
+    return cut.rstrip(" ,;:.") + "…"
+
+
+def _map_subschemas(schema: Dict[str, Any], fn) -> Dict[str, Any]:
+    """Copy of *schema* with *fn* applied to every direct subschema."""
+    result = {}
+    for key, value in schema.items():
+        if key in _SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            result[key] = {name: fn(sub) if isinstance(sub, dict) else sub for name, sub in value.items()}
+        elif key in _SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            result[key] = [fn(sub) if isinstance(sub, dict) else sub for sub in value]
+        elif key in _SCHEMA_KEYWORDS and isinstance(value, dict):
+            result[key] = fn(value)
+        else:
+            result[key] = value
+    return result
+
+
+def _simplify(
+    schema: Dict[str, Any], description_budget: Optional[int], unwrap: bool = True
+) -> Dict[str, Any]:
+    """Drop annotations, trim (or with ``None`` drop) descriptions, unwrap single branches."""
+    schema = _map_subschemas(schema, lambda sub: _simplify(sub, description_budget, unwrap))
+    for keyword in ANNOTATION_KEYWORDS:
+        schema.pop(keyword, None)
+    if isinstance(schema.get("description"), str):
+        if description_budget is None:
+            del schema["description"]
+        else:
+            schema["description"] = trim_description(schema["description"], description_budget)
+    if not unwrap:
+        return schema
+
+    # {"description": ..., "anyOf": [S]} accepts exactly what S accepts
+    for keyword in _COMBINATORS:
+        branches = schema.get(keyword)
+        if (
+            isinstance(branches, list)
+            and len(branches) == 1
+            and isinstance(branches[0], dict)
+            and set(schema) <= {keyword, "description", "default"}
+            and not set(branches[0]) & (set(schema) - {keyword})
+        ):
+            branch = branches[0]
+            del schema[keyword]
+            schema.update(branch)
+            break
+    return schema
+
+
+def _canonical(schema: Dict[str, Any]) -> str:
+    return json.dumps(schema, sort_keys=True, separators=(",", ":"))
+
+
+def _count_subschemas(schema: Dict[str, Any], counts: Dict[str, int], is_root: bool = True) -> None:
+    if not is_root:
+        key = _canonical(schema)
+        if len(key) >= MIN_DEDUPE_CHARS:
+            counts[key] = counts.get(key, 0) + 1
+
+    def _visit(sub):
+        _count_subschemas(sub, counts, is_root=False)
+        return sub
+
+    _map_subschemas(schema, _visit)
+
+
+def _dedupe(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Move subschemas that occur more than once into ``$defs``."""
+    counts: Dict[str, int] = {}
+    _count_subschemas(schema, counts)
+    repeated = {key for key, count in counts.items() if count > 1}
+    if not repeated:
+        return schema
+
+    existing = set(schema.get("$defs", {}))
+    names: Dict[str, str] = {}
+    defs: Dict[str, Dict[str, Any]] = {}
+
+    def _replace(sub: Dict[str, Any]) -> Dict[str, Any]:
+        key = _canonical(sub)
+        if key not in repeated:
+            return _map_subschemas(sub, _replace)
+        if key not in names:
+            name = f"{DEFS_PREFIX}{len(names)}"
+            while name in existing:
+                name += "_"
+            names[key] = name
+            defs[name] = _map_subschemas(sub, _replace)
+        return {"$ref": f"#/$defs/{names[key]}"}
+
+    result = _map_subschemas(schema, _replace)
+
+    # Nested repeats may end up referenced only once after their parent was hoisted
+    ref_counts: Dict[str, int] = {name: 0 for name in defs}
+
+    def _count_refs(value: Any) -> None:
+        if isinstance(value, dict):
+            ref = value.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#/$defs/") and ref[8:] in ref_counts:
+                ref_counts[ref[8:]] += 1
+            for item in value.values():
+                _count_refs(item)
+        elif isinstance(value, list):
+            for item in value:
+                _count_refs(item)
+
+    _count_refs(result)
+    _count_refs(defs)
+    single = {name for name, count in ref_counts.items() if count == 1}
+    if single:
+        resolved = {name: body for name, body in defs.items()}
+        result = _expand_refs(result, resolved, only=single)
+        defs = {
+            name: _expand_refs(body, resolved, only=single)
+            for name, body in defs.items()
+            if name not in single
+        }
+
+    if defs:
+        result["$defs"] = {**result.get("$defs", {}), **defs}
+    return result
+
+
+def _expand_refs(value: Any, defs: Dict[str, Dict[str, Any]], only: Optional[set] = None) -> Any:
+    """Replace ``{"$ref": "#/$defs/<name>"}`` by the definition (for names in *only*, or all of *defs*)."""
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        if len(value) == 1 and isinstance(ref, str) and ref.startswith("#/$defs/"):
+            name = ref[8:]
+            if name in defs and (only is None or name in only):
+                return _expand_refs(defs[name], defs, only)
+        return {key: _expand_refs(item, defs, only) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_expand_refs(item, defs, only) for item in value]
+    return value
+
+
+def _strip_annotations(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of *schema* without annotations and descriptions; nothing else is rewritten."""
+    schema = _map_subschemas(schema, _strip_annotations)
+    for keyword in ANNOTATION_KEYWORDS | {"description"}:
+        schema.pop(keyword, None)
+    return schema
+
+
+def _validation_view(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Schema without annotations and descriptions, with minifier-generated refs expanded."""
+    defs = {
+        name: body
+        for name, body in (schema.get("$defs") or {}).items()
+        if name.startswith(DEFS_PREFIX)
+    }
+    expanded = _expand_refs(schema, defs) if defs else schema
+    if defs:
+        remaining = {k: v for k, v in expanded["$defs"].items() if k not in defs}
+        if remaining:
+            expanded["$defs"] = remaining
+        else:
+            del expanded["$defs"]
+    return _strip_annotations(expanded)
+
+
+# Values of every JSON type, tried against each property
+_PROBE_VALUES: Tuple[Any, ...] = (None, True, False, 0, 1, -1, 2.5, "", "a", "2024-01-01", [], [None], {}, {"a": 1})
+_PROBE_DEPTH = 4
+
+
+def _resolve_local_ref(ref: str, root: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not ref.startswith("#/"):
+        return None
+    node: Any = root
+    for part in ref[2:].split("/"):
+        part = part.replace("~1", "/").replace("~0", "~")
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node if isinstance(node, dict) else None
+
+
+def _typical_value(schema: Dict[str, Any], root: Dict[str, Any], depth: int) -> Any:
+    """A value *schema* most likely accepts."""
+    if depth > _PROBE_DEPTH:
+        return None
+    if isinstance(schema.get("$ref"), str):
+        target = _resolve_local_ref(schema["$ref"], root)
+        return _typical_value(target, root, depth + 1) if target is not None else None
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    for keyword in _COMBINATORS:
+        branches = schema.get(keyword)
+        if isinstance(branches, list) and branches and isinstance(branches[0], dict):
+            return _typical_value(branches[0], root, depth + 1)
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = schema_type[0] if schema_type else None
+    if schema_type == "object" or "properties" in schema:
+        properties = schema.get("properties") or {}
+        return {
+            name: _typical_value(sub, root, depth + 1)
+            for name, sub in properties.items()
+            if isinstance(sub, dict)
+        }
+    if schema_type == "array":
+        items = schema.get("items")
+        return [_typical_value(items, root, depth + 1)] if isinstance(items, dict) else []
+    return {"string": "a", "integer": 1, "number": 1.5, "boolean": True, "null": None}.get(schema_type, "a")
+
+
+def _probe_values(schema: Dict[str, Any], root: Dict[str, Any], depth: int = 0) -> List[Any]:
+    """Instances around the boundary of *schema*: typical, edge-case and invalid values."""
+    values: List[Any] = list(_PROBE_VALUES)
+    if depth > _PROBE_DEPTH:
+        return values
+    if isinstance(schema.get("$ref"), str):
+        target = _resolve_local_ref(schema["$ref"], root)
+        return _probe_values(target, root, depth + 1) if target is not None else values
+    values.append(_typical_value(schema, root, depth))
+    values.extend(schema.get("enum") or [])
+    for keyword in ("const", "default"):
+        if keyword in schema:
+            values.append(schema[keyword])
+    values.extend(schema.get("examples") or [])
+    for keyword in _COMBINATORS:
+        for branch in schema.get(keyword) or []:
+            if isinstance(branch, dict):
+                values.extend(_probe_values(branch, root, depth + 1))
+
+    properties = schema.get("properties")
+    if isinstance(properties, dict):
+        base = _typical_value(schema, root, depth)
+        if isinstance(base, dict):
+            values.append({**base, "zz_unlisted": 1})
+            for name, sub in properties.items():
+                values.append({key: value for key, value in base.items() if key != name})
+                if isinstance(sub, dict):
+                    values.extend({**base, name: value} for value in _probe_values(sub, root, depth + 1))
+    items = schema.get("items")
+    if isinstance(items, dict):
+        values.extend([value] for value in _probe_values(items, root, depth + 1))
+    return values
+
+
+def _same_verdicts(original: Dict[str, Any], minified: Dict[str, Any]) -> bool:
+    """Whether jsonschema accepts exactly the same probe instances under both schemas.
+
+    False when jsonschema is unavailable or either schema is invalid.
+    """
+    try:
+        from jsonschema import validators
+        from jsonschema.exceptions import SchemaError
+    except ImportError:
+        return False
+    try:
+        checkers = []
+        for schema in (original, minified):
+            cls = validators.validator_for(schema)
+            cls.check_schema(schema)
+            checkers.append(cls(schema))
+    except SchemaError:
+        return False
+
+    seen = set()
+    for instance in _probe_values(original, original):
+        key = json.dumps(instance, sort_keys=True, default=str)
+        if key in seen:
+            continue
+        seen.add(key)
+        if len(seen) > MAX_PROBE_INSTANCES:
+            break
+        if checkers[0].is_valid(instance) != checkers[1].is_valid(instance):
+            return False
+    return True
+
+
+def _equivalent(original: Dict[str, Any], minified: Dict[str, Any]) -> bool:
+    if _validation_view(minified) == _strip_annotations(original):
+        return True
+    return _same_verdicts(original, minified)
+
+
+def minify_schema(
+    schema: Dict[str, Any],
+    description_budget: int = DESCRIPTION_BUDGET,
+    dedupe: bool = True,
+    unwrap: bool = True,
+) -> Dict[str, Any]:
+    """Minified copy of a JSON schema (see module docstring); *schema* is not modified."""
+    minified = _simplify(copy.deepcopy(schema), description_budget, unwrap)
+    return _dedupe(minified) if dedupe else minified
+
+
+def minify_tool_schema(
+    name: str,
+    description: str,
+    schema: Dict[str, Any],
+    dedupe: bool = True,
+) -> Tuple[str, Dict[str, Any]]:
+    """Minified ``(description, input schema)`` of one tool, verified against the original.
+
+    Args:
+        name: Tool name (for logging)
+        description: Tool description
+        schema: Original input schema
+        dedupe: Hoist repeated subschemas into ``$defs`` (disable for providers without ``$ref`` support)
+    """
+    description = trim_description(description or "", TOOL_DESCRIPTION_BUDGET)
+    try:
+        for unwrap in (True, False):
+            minified = minify_schema(schema, dedupe=dedupe, unwrap=unwrap)
+            if _equivalent(schema, minified):
+                return description, minified
+        logger.warning(f"| Minified schema of tool '{name}' changed its meaning; sending it unminified")
+    except (TypeError, ValueError, RecursionError) as e:
+        logger.warning(f"| Could not minify schema of tool '{name}': {e}")
+    return description, schema
+
+
+def schema_size(tools: List[Dict[str, Any]]) -> int:
+    """Size of converted tool definitions as compact JSON (for logging savings)."""
+    return len(json.dumps(tools, separators=(",", ":"), ensure_ascii=False))
@@ -0,0 +1,214 @@
+"""
+Incremental SDK-Format Conversion
+=================================
+
+Converts OpenAI-style chat messages (and Claude content blocks) into the
+legacy Agents-SDK item format stored in messages.json. The converter keeps
+its output and the legacy ``function_call`` ID map between calls, so the
+agent can feed it each message once as the conversation grows and
+finalize without re-walking the trajectory.
+"""
+
+import json
+import uuid
+from typing import Any, Dict, List
+
+
+class SDKFormatConverter:
+    """Append-only OpenAI -> SDK format converter."""
+
+    def __init__(self):
+        self.output: List[Dict[str, Any]] = []
+        self._function_call_map: Dict[str, str] = {}  # Track function names to call IDs for legacy format
+        self._consumed = 0  # Messages of the synced list already converted
+
+    def extend(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert *messages* and return the full output so far."""
+        for msg in messages:
+            self.append(msg)
+        return self.output
+
+    def sync(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert the messages appended to *messages* since the previous sync.
+
+        *messages* must be the same growing conversation on every call
+        (messages are never modified once appended).
+        """
+        if len(messages) < self._consumed:
+            raise ValueError("sync() called with a shorter conversation than already converted")
+        self.extend(messages[self._consumed:])
+        self._consumed = len(messages)
+        return self.output
+
+    def append(self, msg: Dict[str, Any]) -> None:
+        """Convert one message and append the resulting SDK items."""
+        out = self.output
+        role = msg.get("role")
+
+        if role == "user":
+            # User messages stay mostly the same
+            user_content = msg.get("content", "")
+            
+            # Handle tool_result messages (content as list)
+            if isinstance(user_content, list):
+                # Check if this is a tool_result message
+                tool_results = [item for item in user_content if isinstance(item, dict) and item.get("type") == "tool_result"]
+                if tool_results:
+                    # Convert tool_results to function_call_output format
+                    for tr in tool_results:
+                        content_items = tr.get("content", [])
+                        text_content = ""
+                        for ci in content_items:
+                            if isinstance(ci, dict) and ci.get("type") == "text":
+                                text_content = ci.get("text", "")
+                                break
+                        out.append({
+                            "call_id": tr.get("tool_use_id", ""),
+                            "output": json.dumps({
+                                "type": "text",
+                                "text": text_content,
+                                "annotations": None,
+                                "meta": None
+                            }),
+                            "type": "function_call_output"
+                        })
+                else:
+                    # Regular user content as list - extract text
+                    text_parts = []
+                    for item in user_content:
+                        if isinstance(item, dict) and item.get("type") == "text":
+                            text_parts.append(item.get("text", ""))
+                    out.append({
+                        "content": "\n".join(text_parts) if text_parts else "",
+                        "role": "user"
+                    })
+            else:
+                # String content
+                out.append({
+                    "content": user_content,
+                    "role": "user"
+                })
+
+        elif role == "assistant":
+            # === CHANGED ORDER START ===
+            tool_calls = msg.get("tool_calls", [])
+            function_call = msg.get("function_call")
+            content = msg.get("content")
+
+            # Handle both string content and list content (for Claude thinking)
+            if isinstance(content, list):
+                # Extract text from content blocks (e.g., Claude responses with thinking)
+                text_parts = []
+                claude_tool_uses = []
+                for block in content:
+                    if isinstance(block, dict):
+                        if block.get("type") == "text":
+                            text_parts.append(block.get("text", ""))
+                        elif block.get("type") == "thinking":
+                            # Include thinking in output (marked as such)
+                            thinking_text = block.get("thinking", "")
+                            if thinking_text:
+                                text_parts.append(f"<think>\n{thinking_text}\n</think>")
+                        elif block.get("type") == "tool_use":
+                            # Store tool_use blocks for later processing
+                            claude_tool_uses.append(block)
+                content = "\n".join(text_parts) if text_parts else ""
+                
+                # Add Claude tool_uses to regular tool_calls
+                if claude_tool_uses and not tool_calls:
+                    tool_calls = []
+                    for tu in claude_tool_uses:
+                        tool_calls.append({
+                            "id": tu.get("id"),
+                            "function": {
+                                "name": tu.get("name"),
+                                "arguments": json.dumps(tu.get("input", {}))
+                            }
+                        })
+            
+            # 1) First add assistant's text content (if present)
+            if content:
+                out.append({
+                    "id": "__fake_id__",
+                    "content": [
+                        {
+                            "annotations": [],
+                            "text": content if content else "",
+                            "type": "output_text"
+                        }
+                    ],
+                    "role": "assistant",
+                    "status": "completed",
+                    "type": "message"
+                })
+
+            # 2) Then add (new format) tool_calls
+            if tool_calls:
+                for tool_call in tool_calls:
+                    call_id = tool_call.get("id", f"call_{uuid.uuid4().hex}")
+                    func_name = tool_call.get("function", {}).get("name", "")
+                    out.append({
+                        "arguments": tool_call.get("function", {}).get("arguments", "{}"),
+                        "call_id": call_id,
+                        "name": func_name,
+                        "type": "function_call",
+                        "id": "__fake_id__"
+                    })
+
+            # 3) Finally handle (legacy format) function_call
+            if function_call:
+                func_name = function_call.get("name", "")
+                call_id = f"call_{uuid.uuid4().hex}"
+                self._function_call_map[func_name] = call_id  # Store for matching responses
+                out.append({
+                    "arguments": function_call.get("arguments", "{}"),
+                    "call_id": call_id,
+                    "name": func_name,
+                    "type": "function_call",
+                    "id": "__fake_id__"
+                })
+
+            # 4) If neither content nor any calls exist, maintain fallback behavior
+            if not content and not tool_calls and not function_call:
+                out.append({
+                    "id": "__fake_id__",
+                    "content": [
+                        {
+                            "annotations": [],
+                            "text": "",
+                            "type": "output_text"
+                        }
+                    ],
+                    "role": "assistant",
+                    "status": "completed",
+                    "type": "message"
+                })
+            # === CHANGED ORDER END ===
+
+        elif role == "tool":
+            # Tool responses
+            out.append({
+                "call_id": msg.get("tool_call_id", ""),
+                "output": json.dumps({
+                    "type": "text",
+                    "text": msg.get("content", ""),
+                    "annotations": None,
+                    "meta": None
+                }),
+                "type": "function_call_output"
+            })
+
+        elif role == "function":
+            # Legacy function responses - try to match with stored call ID
+            func_name = msg.get("name", "")
+            call_id = self._function_call_map.get(func_name, f"call_{uuid.uuid4().hex}")
+            out.append({
+                "call_id": call_id,
+                "output": json.dumps({
+                    "type": "text",
+                    "text": msg.get("content", ""),
+                    "annotations": None,
+                    "meta": None
+                }),
+                "type": "function_call_output"
+            })
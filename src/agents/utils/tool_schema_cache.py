@@ -0,0 +1,122 @@
+"""
+Tool Schema Cache
+=================
+
+Converted tool definitions (Anthropic / OpenAI / Gemini-simplified) keyed by
+a fingerprint of (service, MCP server name and version, provider flavor,
+converter version, full tool list). Every task starts a fresh MCP server with
+the same tools, so the conversion only has to run once: entries are kept in
+memory for the process and on disk (``MCPMARK_TOOL_CACHE_DIR``, default
+``.mcpmark_cache/tool_schemas``) for the other workers. Each entry also holds
+the tools pre-serialized as JSON for request bodies.
+
+The listed tools are always hashed, as a server may change its schemas
+without changing its reported version. Bump :data:`CONVERTER_VERSION` when the
+conversion code changes; the flavor carries the converter settings.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = Path(".mcpmark_cache") / "tool_schemas"
+# Part of every fingerprint; bump whenever the tool conversion changes
+CONVERTER_VERSION = 2
+
+
+@dataclass(frozen=True)
+class CachedTools:
+    """Converted tools plus their JSON encoding. Treat both as read-only."""
+
+    tools: List[Dict[str, Any]]
+    tools_json: str
+
+
+def tool_fingerprint(
+    service: str, flavor: str, tools: List[Dict[str, Any]], server_info: Optional[Dict[str, Any]] = None
+) -> str:
+    """Stable key for a converted tool list (covers the full listed schemas)."""
+    server_info = server_info or {}
+    identity = [server_info.get("name"), server_info.get("version"), tools]
+    payload = json.dumps([CONVERTER_VERSION, service, flavor, identity], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class ToolSchemaCache:
+    """Two-level (memory, disk) cache of converted tool definitions."""
+
+    def __init__(self, cache_dir: Union[str, Path, None] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._memory: Dict[str, CachedTools] = {}
+        self._lock = threading.Lock()
+
+    def get_or_convert(
+        self, fingerprint: str, convert: Callable[[], List[Dict[str, Any]]]
+    ) -> CachedTools:
+        """Return the cached conversion for *fingerprint*, running *convert* on a miss."""
+        with self._lock:
+            cached = self._memory.get(fingerprint)
+        if cached is not None:
+            return cached
+
+        cached = self._load(fingerprint)
+        if cached is None:
+            tools = convert()
+            cached = CachedTools(tools=tools, tools_json=json.dumps(tools, ensure_ascii=False))
+            self._store(fingerprint, cached)
+
+        with self._lock:
+            self._memory[fingerprint] = cached
+        return cached
+
+    def _path(self, fingerprint: str) -> Optional[Path]:
+        return self.cache_dir / f"{fingerprint}.json" if self.cache_dir else None
+
+    def _load(self, fingerprint: str) -> Optional[CachedTools]:
+        path = self._path(fingerprint)
+        if path is None or not path.exists():
+            return None
+        try:
+            tools_json = path.read_text(encoding="utf-8")
+            return CachedTools(tools=json.loads(tools_json), tools_json=tools_json)
+        except (OSError, ValueError) as e:
+            logger.warning(f"| Ignoring unreadable tool schema cache {path}: {e}")
+            return None
+
+    def _store(self, fingerprint: str, cached: CachedTools) -> None:
+        path = self._path(fingerprint)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so concurrent workers never read a partial file
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(cached.tools_json, encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"| Could not write tool schema cache {path}: {e}")
+
+    def clear(self) -> None:
+        """Drop the in-memory entries (disk entries are keyed by fingerprint and stay valid)."""
+        with self._lock:
+            self._memory.clear()
+
+
+_default_cache: Optional[ToolSchemaCache] = None
+
+
+def get_tool_schema_cache() -> ToolSchemaCache:
+    """Process-wide cache; ``MCPMARK_TOOL_CACHE_DIR=""`` disables the disk level."""
+    global _default_cache
+    if _default_cache is None:
+        cache_dir = os.getenv("MCPMARK_TOOL_CACHE_DIR", str(DEFAULT_CACHE_DIR))
+        _default_cache = ToolSchemaCache(cache_dir or None)
+    return _default_cache
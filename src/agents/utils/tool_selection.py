@@ -0,0 +1,197 @@
+"""
+Tool Subset Selection
+=====================
+
+Sends each LLM request only the tools a task is likely to need instead of
+everything the MCP server lists (the Notion server exposes a large
+OpenAPI-derived tool set with long descriptions).
+
+The starting subset comes from a *tool profile*: per service and task
+category, how often each tool was called in earlier runs, mined from their
+``execution.log`` files. The remaining tools stay reachable: a small
+``enable_tools`` tool lists their names and adds the requested ones to later
+requests, and calling a hidden tool by name enables it as well.
+
+Build a profile from previous results and point the evaluator at it::
+
+    python -m src.agents.utils.tool_selection ./results --out tool_profiles.json
+
+(``./results`` or any experiment, model or run directory below it.)
+    export MCPMARK_TOOL_PROFILES=tool_profiles.json
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from src.logger import get_logger
+from .tool_schema_cache import CachedTools
+
+logger = get_logger(__name__)
+
+PROFILES_ENV = "MCPMARK_TOOL_PROFILES"
+EXPAND_TOOL_NAME = "enable_tools"
+
+# Tool call lines of execution.log: "| <tool name> <JSON arguments>"
+_TOOL_CALL_LINE = re.compile(r"^\| (\S+) [\[{]")
+
+ToolProfiles = Dict[str, Dict[str, Dict[str, int]]]  # service -> category -> tool -> calls
+
+
+def build_tool_profiles(results_dir: Union[str, Path]) -> ToolProfiles:
+    """Count tool calls per service and category in every ``execution.log`` below *results_dir*.
+
+    Expects the evaluator layout
+    ``<exp>/<model>__<service>/run-N/<category>__<task>/execution.log``; the
+    service is taken from the nearest ``<model>__<service>`` ancestor of the
+    task directory, so *results_dir* may be any level of that tree.
+    """
+    counts: Dict[str, Dict[str, Counter]] = defaultdict(lambda: defaultdict(Counter))
+    for log_path in Path(results_dir).rglob("execution.log"):
+        task_dir = log_path.parent
+        model_service = next((parent for parent in task_dir.parents if "__" in parent.name), None)
+        if "__" not in task_dir.name or model_service is None:
+            continue
+        category = task_dir.name.split("__", 1)[0]
+        service = model_service.name.rsplit("__", 1)[1]
+        # Keyed like the evaluator looks profiles up
+        if service == "playwright_webarena":
+            service = "playwright"
+        try:
+            with log_path.open("r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    match = _TOOL_CALL_LINE.match(line)
+                    if match and match.group(1) != EXPAND_TOOL_NAME:
+                        counts[service][category][match.group(1)] += 1
+        except OSError as e:
+            logger.warning(f"| Skipping unreadable {log_path}: {e}")
+
+    return {
+        service: {
+            category: dict(counter.most_common()) for category, counter in sorted(categories.items())
+        }
+        for service, categories in sorted(counts.items())
+    }
+
+
+def load_tool_profiles(path: Union[str, Path, None] = None) -> ToolProfiles:
+    """Read a profile file (default: ``$MCPMARK_TOOL_PROFILES``); empty if unset or unreadable."""
+    path = path or os.getenv(PROFILES_ENV)
+    if not path:
+        return {}
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"| Ignoring tool profiles {path}: {e}")
+        return {}
+
+
+class ToolSelector:
+    """Current tool subset of one agent execution, expandable on demand.
+
+    Works on converted tools of any provider flavor; *name_of* extracts a
+    tool's name and *make_tool* builds a tool definition in the same flavor
+    from ``(name, description, json_schema)``.
+    """
+
+    def __init__(
+        self,
+        tools: List[Dict[str, Any]],
+        selected: Iterable[str],
+        name_of: Callable[[Dict[str, Any]], str],
+        make_tool: Callable[[str, str, Dict[str, Any]], Dict[str, Any]],
+    ):
+        self._tools = tools
+        self._name_of = name_of
+        self._make_tool = make_tool
+        self._names = [name_of(tool) for tool in tools]
+        known = set(self._names)
+        self._enabled = {name for name in selected if name in known}
+        self._current: Optional[CachedTools] = None
+
+    @property
+    def hidden(self) -> List[str]:
+        return [name for name in self._names if name not in self._enabled]
+
+    @property
+    def enabled_count(self) -> int:
+        return len(self._enabled)
+
+    def is_hidden(self, name: str) -> bool:
+        return name in self._names and name not in self._enabled
+
+    def current(self) -> CachedTools:
+        """Tools to send with the next request (rebuilt only after the subset changes)."""
+        if self._current is None:
+            tools = [tool for tool in self._tools if self._name_of(tool) in self._enabled]
+            hidden = self.hidden
+            if hidden:
+                tools.append(self._expand_tool(hidden))
+            self._current = CachedTools(tools=tools, tools_json=json.dumps(tools, ensure_ascii=False))
+        return self._current
+
+    def enable(self, names: Iterable[str]) -> List[str]:
+        """Add the known tools among *names* to the subset; returns the newly enabled ones."""
+        added = [name for name in dict.fromkeys(names) if self.is_hidden(name)]
+        if added:
+            self._enabled.update(added)
+            self._current = None
+            logger.info(f"| Enabled tools: {', '.join(added)}")
+        return added
+
+    def handle_expand_call(self, arguments: Dict[str, Any]) -> str:
+        """Result text of an ``enable_tools`` call."""
+        requested = arguments.get("names") or []
+        if isinstance(requested, str):
+            requested = [requested]
+        added = self.enable(requested)
+        unknown = [name for name in requested if name not in self._names]
+        parts = [f"Enabled: {', '.join(added)}" if added else "No new tools enabled."]
+        if unknown:
+            parts.append(f"Unknown tools: {', '.join(unknown)}")
+        return " ".join(parts)
+
+    def _expand_tool(self, hidden: List[str]) -> Dict[str, Any]:
+        description = (
+            "Make more tools available for the following turns. "
+            f"Currently unavailable tools: {', '.join(hidden)}"
+        )
+        schema = {
+            "type": "object",
+            "properties": {
+                "names": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Names of the tools to enable",
+                }
+            },
+            "required": ["names"],
+        }
+        return self._make_tool(EXPAND_TOOL_NAME, description, schema)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-category tool profiles from execution logs")
+    parser.add_argument("results_dir", type=Path, help="Root results directory (e.g. ./results)")
+    parser.add_argument(
+        "--out", type=Path, default=Path("tool_profiles.json"), help="Output file (default: tool_profiles.json)"
+    )
+    args = parser.parse_args()
+
+    if not args.results_dir.exists():
+        print(f"❌ Results directory {args.results_dir} does not exist")
+        return 1
+
+    profiles = build_tool_profiles(args.results_dir)
+    args.out.write_text(json.dumps(profiles, indent=2), encoding="utf-8")
+    categories = sum(len(categories) for categories in profiles.values())
+    print(f"📊 Wrote tool profiles for {categories} categories to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
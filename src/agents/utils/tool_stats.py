@@ -0,0 +1,139 @@
+"""
+Per-Tool Call Statistics
+========================
+
+Latency, payload-size and failure counters for each MCP tool an agent calls
+during one task. ``get_stats()`` is written to ``meta.json`` under
+``tool_stats``; :func:`merge_tool_stats` rolls those dicts up across tasks
+for the aggregator.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+# Rough chars-per-token ratio used to attribute context growth to tools
+CHARS_PER_TOKEN = 4
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class ToolStatsTracker:
+    """Collect per-tool call statistics for a single agent execution."""
+
+    def __init__(self):
+        """Initialize tool stats tracker."""
+        self.reset()
+
+    def reset(self):
+        """Forget all recorded calls."""
+        self._latencies: Dict[str, List[float]] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def record(
+        self,
+        name: str,
+        latency: float,
+        result_bytes: int = 0,
+        error: bool = False,
+        timeout: bool = False,
+    ):
+        """
+        Record one tool call.
+
+        Args:
+            name: Tool name
+            latency: Wall time of the call in seconds
+            result_bytes: Size of the serialized result appended to the context
+            error: Whether the call raised
+            timeout: Whether the call hit the tool-call timeout
+        """
+        self._latencies.setdefault(name, []).append(latency)
+        counters = self._tool_counters(name)
+        counters["calls"] += 1
+        counters["errors"] += int(error)
+        counters["timeouts"] += int(timeout)
+        counters["result_bytes"] += result_bytes
+
+    def record_rejected(self, name: str):
+        """Record a call rejected before dispatch (invalid arguments)."""
+        self._latencies.setdefault(name, [])
+        self._tool_counters(name)["rejected"] += 1
+
+    def _tool_counters(self, name: str) -> Dict[str, int]:
+        return self._counters.setdefault(
+            name, {"calls": 0, "errors": 0, "timeouts": 0, "rejected": 0, "result_bytes": 0}
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-tool statistics.
+
+        Returns:
+            Dictionary mapping tool name to calls, errors, timeouts, rejected
+            calls, latency percentiles (seconds), bytes returned and estimated tokens
+        """
+        stats = {}
+        for name, counters in self._counters.items():
+            latencies = sorted(self._latencies[name])
+            stats[name] = {
+                **counters,
+                "result_tokens_est": counters["result_bytes"] // CHARS_PER_TOKEN,
+                "total_latency_s": round(sum(latencies), 4),
+                "p50_latency_s": round(_percentile(latencies, 0.5), 4),
+                "p95_latency_s": round(_percentile(latencies, 0.95), 4),
+                "max_latency_s": round(latencies[-1], 4) if latencies else 0.0,
+            }
+        return stats
+
+
+def merge_tool_stats(per_task_stats: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Roll up ``tool_stats`` dicts of several tasks.
+
+    Counters are summed. Exact percentiles cannot be recovered from per-task
+    summaries, so the rollup reports the call-weighted mean of the per-task
+    p50/p95 and the overall maximum; tools are ordered by total latency.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for task_stats in per_task_stats:
+        for name, s in (task_stats or {}).items():
+            calls = int(s.get("calls", 0) or 0)
+            if not calls and not s.get("rejected"):
+                continue
+            m = merged.setdefault(name, {
+                "calls": 0, "errors": 0, "timeouts": 0, "rejected": 0, "result_bytes": 0, "result_tokens_est": 0,
+                "total_latency_s": 0.0, "_p50_weighted": 0.0, "_p95_weighted": 0.0, "max_latency_s": 0.0,
+            })
+            m["calls"] += calls
+            for key in ("errors", "timeouts", "rejected", "result_bytes", "result_tokens_est"):
+                m[key] += int(s.get(key, 0) or 0)
+            m["total_latency_s"] += float(s.get("total_latency_s", 0.0) or 0.0)
+            m["_p50_weighted"] += calls * float(s.get("p50_latency_s", 0.0) or 0.0)
+            m["_p95_weighted"] += calls * float(s.get("p95_latency_s", 0.0) or 0.0)
+            m["max_latency_s"] = max(m["max_latency_s"], float(s.get("max_latency_s", 0.0) or 0.0))
+
+    rollup = {}
+    for name, m in sorted(merged.items(), key=lambda kv: kv[1]["total_latency_s"], reverse=True):
+        calls = m["calls"]
+        per_call = max(calls, 1)
+        rollup[name] = {
+            "calls": calls,
+            "errors": m["errors"],
+            "timeouts": m["timeouts"],
+            "rejected": m["rejected"],
+            "error_rate": round(m["errors"] / per_call, 4),
+            "total_latency_s": round(m["total_latency_s"], 4),
+            "avg_latency_s": round(m["total_latency_s"] / per_call, 4),
+            "avg_p50_latency_s": round(m["_p50_weighted"] / per_call, 4),
+            "avg_p95_latency_s": round(m["_p95_weighted"] / per_call, 4),
+            "max_latency_s": round(m["max_latency_s"], 4),
+            "result_bytes": m["result_bytes"],
+            "avg_result_bytes": round(m["result_bytes"] / per_call, 1),
+            "result_tokens_est": m["result_tokens_est"],
+        }
+    return rollup
@@ -0,0 +1,148 @@
+"""
+Streaming Trajectory Writer
+===========================
+
+Append-only JSONL sink for agent conversations. The agent loop appends each
+message as soon as it is produced; serialization and disk writes happen on a
+background thread so they stay off the agent's critical path. If the process
+dies mid-task, the file still holds everything up to the last completed turn.
+
+File layout: the first line is a header ``{"trajectory_format": <format>}``
+naming the message dialect of the loop ("openai" or "anthropic"); every
+following line is one message.
+
+Checkpoints queued with :meth:`TrajectoryWriter.checkpoint` are written by
+the same thread once the preceding messages are flushed. When resuming, the
+messages restored from the checkpoint are written up front (atomically), so
+the file matches the checkpoint even if the run fails before its first turn.
+"""
+
+import json
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class _Checkpoint:
+    __slots__ = ("path", "checkpoint")
+
+    def __init__(self, path: Path, checkpoint: Any):
+        self.path = path
+        self.checkpoint = checkpoint
+
+
+class TrajectoryWriter:
+    """Background-thread JSONL writer for conversation messages."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        trajectory_format: str,
+        resumed_messages: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """
+        Args:
+            path: Trajectory file, replaced by this writer
+            trajectory_format: Message dialect written to the header line
+            resumed_messages: Messages restored from a checkpoint; the file
+                starts with them, and appending continues after them
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: "queue.Queue" = queue.Queue()
+        # Write the header and resumed prefix to a temp file first: the old file
+        # is only replaced once the new one holds everything the checkpoint needs
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            f.write(json.dumps({"trajectory_format": trajectory_format}) + "\n")
+            for message in resumed_messages or []:
+                f.write(json.dumps(message, ensure_ascii=False, default=str) + "\n")
+        os.replace(tmp_path, self.path)
+        self._file = self.path.open("a", encoding="utf-8")
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"trajectory-{self.path.parent.name}", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, message: Dict[str, Any]) -> None:
+        """Queue one message for writing (never blocks on I/O)."""
+        if not self._closed:
+            self._queue.put(message)
+
+    def extend(self, messages: List[Dict[str, Any]]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def checkpoint(self, path: Union[str, Path], checkpoint: Any) -> None:
+        """Queue ``checkpoint.save(path)`` to run after all messages appended so far are on disk."""
+        if not self._closed:
+            self._queue.put(_Checkpoint(Path(path), checkpoint))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            try:
+                if isinstance(item, _Checkpoint):
+                    self._file.flush()
+                    item.checkpoint.save(item.path)
+                    continue
+                self._file.write(json.dumps(item, ensure_ascii=False, default=str))
+                self._file.write("\n")
+                # Flush once the backlog is drained so a crash loses at most the current turn
+                if self._queue.empty():
+                    self._file.flush()
+            except Exception as e:
+                logger.warning(f"| Failed to write trajectory message: {e}")
+        self._file.flush()
+
+    def close(self) -> None:
+        """Drain pending messages and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_trajectory(path: Union[str, Path]) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """Read a trajectory file written by :class:`TrajectoryWriter`.
+
+    A truncated last line (process killed mid-write) is ignored.
+
+    Returns:
+        Tuple of (trajectory format, messages)
+    """
+    trajectory_format = None
+    messages: List[Dict[str, Any]] = []
+    with Path(path).open("r", encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"| Ignoring truncated trajectory line {index + 1} in {path}")
+                break
+            if index == 0 and isinstance(item, dict) and "trajectory_format" in item:
+                trajectory_format = item["trajectory_format"]
+                continue
+            messages.append(item)
+    return trajectory_format, messages
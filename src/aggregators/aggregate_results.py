@@ -11,13 +11,14 @@ import subprocess
 import shutil
 import tempfile
 from pathlib import Path
-from collections import defaultdict
 from typing import Dict, List, Any, Tuple, Optional
-from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from src.errors import is_retryable_error
-from src.aggregators.pricing import compute_cost_usd
+from src.aggregators.meta_loader import load_experiment_metas
+from src.aggregators.metrics import calculate_metrics_vectorized
+from src.early_stopping import untracked_metrics
+from src.results_store import ResultsStore
 
 
 def discover_tasks() -> Dict[str, List[str]]:
@@ -58,37 +59,42 @@ def discover_tasks() -> Dict[str, List[str]]:
     return all_tasks
 
 
-def collect_results(exp_dir: Path, k: int) -> Dict[str, Dict[str, Any]]:
+def collect_results(
+    exp_dir: Path, k: int, workers: Optional[int] = None, use_processes: bool = False
+) -> Dict[str, Dict[str, Any]]:
     """Collect all results from experiment directory."""
-    results = defaultdict(lambda: defaultdict(lambda: defaultdict(dict)))
-    
     # Current layout: results/<exp>/<model>__<service>/run-N/<category>__<task>/
-    for model_service_dir in exp_dir.iterdir():
-        if not model_service_dir.is_dir() or "__" not in model_service_dir.name:
-            continue
-        
-        model, service = model_service_dir.name.split("__", 1)
-        # Normalize service name: treat playwright_webarena as playwright
-        if service == "playwright_webarena":
-            service = "playwright"
-        
-        for run_idx in range(1, k + 1):
-            run_dir = model_service_dir / f"run-{run_idx}"
-            if not run_dir.exists():
+    report = load_experiment_metas(exp_dir, k, workers=workers, use_processes=use_processes)
+    if report.skipped:
+        print(f"  ⚠️  Skipped {len(report.skipped)} unreadable meta.json files:")
+        for path, reason in report.skipped:
+            print(f"    - {path}: {reason}")
+    return report.results
+
+
+def collect_results_from_store(exp_dir: Path, k: int, reindex: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Collect all results from the experiment's indexed results store.
+
+    Runs that exist on disk but have no rows yet (e.g. copied in from another
+    machine) are imported first; ``reindex`` re-imports every run directory.
+    """
+    store = ResultsStore.for_experiment(exp_dir)
+    try:
+        if reindex:
+            store.clear(exp_dir.name)
+        for model_service_dir in exp_dir.iterdir():
+            if not model_service_dir.is_dir() or "__" not in model_service_dir.name:
                 continue
-            
-            for task_dir in run_dir.iterdir():
-                if not task_dir.is_dir() or "__" not in task_dir.name:
+            model, service = model_service_dir.name.split("__", 1)
+            for run_idx in range(1, k + 1):
+                run_dir = model_service_dir / f"run-{run_idx}"
+                if not run_dir.exists():
                     continue
-                
-                meta_path = task_dir / "meta.json"
-                if meta_path.exists():
-                    with open(meta_path) as f:
-                        meta = json.load(f)
-                        task_name = task_dir.name
-                        results[model][service][f"run-{run_idx}"][task_name] = meta
-    
-    return results
+                if store.count(exp_dir.name, model, service, run_dir.name) == 0:
+                    store.import_run_dir(exp_dir.name, model, service, run_dir)
+        return store.collect_results(exp_dir.name, k)
+    finally:
+        store.close()
 
 
 def check_completeness_and_validity(
@@ -154,293 +160,12 @@ def check_completeness_and_validity(
 
 
 def calculate_metrics(complete_models: Dict, all_tasks: Dict, k: int, single_run_models: List[str]) -> Dict:
-    """Calculate rich metrics (totals, averages, per-run aggregates, pass@k) for complete models."""
-    summary = {
-        "generated_at": datetime.now().isoformat(),
-        "k": k,
-        "overall": {},
-    }
-
-    # Initialize per-service sections mirroring overall structure
-    for service in all_tasks.keys():
-        summary[service] = {}
-
-    # Helper to safely extract token usage numbers
-    def get_token_counts(meta: Dict[str, Any]) -> Tuple[int, int, int]:
-        tu = meta.get("token_usage", {}) or {}
-        input_tokens = int(tu.get("input_tokens", 0) or 0)
-        output_tokens = int(tu.get("output_tokens", 0) or 0)
-        total_tokens = int(tu.get("total_tokens", input_tokens + output_tokens) or (input_tokens + output_tokens))
-        return input_tokens, output_tokens, total_tokens
-
-    for model, model_results in complete_models.items():
-        is_single_run = any(srm in model for srm in single_run_models)
-        runs_count = 1 if is_single_run else k
-
-        total_tasks = sum(len(tasks) for tasks in all_tasks.values())
-
-        # Aggregates across all services and runs
-        total_agent_execution_time = 0.0
-        total_input_tokens = 0
-        total_output_tokens = 0
-        total_tokens = 0
-        total_turns = 0
-        # For optional fields
-        actual_model_name: Optional[str] = None
-        # If cost info is not present in metas, leave as None
-        per_run_cost: Optional[float] = None
-        # Model-level flags (to be inferred from meta.json)
-        is_open_source_model: Optional[bool] = None
-        is_reasoning_model: Optional[bool] = None
-
-        # For pass@1 per-run statistics across all services
-        pass1_rates_per_run_overall: List[float] = []
-
-        # For pass@k and pass^k across all services
-        pass_k_task_success_any = 0
-        pass_power_k_task_success_all = 0
-
-        # Precompute successes per task across runs for overall
-        # Also accumulate totals for tokens/time/turns
-        for run_idx in range(1, runs_count + 1):
-            run_name = f"run-{run_idx}"
-            successes_this_run = 0
-
-            for service, service_tasks in all_tasks.items():
-                # service-level aggregates for this model (will compute fully below)
-                for task in service_tasks:
-                    meta = (
-                        model_results
-                        .get(service, {})
-                        .get(run_name, {})
-                        .get(task)
-                    )
-
-                    # In complete_models, meta should exist; still guard
-                    if not meta:
-                        continue
-
-                    success = bool(meta.get("execution_result", {}).get("success", False))
-                    if success:
-                        successes_this_run += 1
-
-                    # totals accumulation
-                    total_agent_execution_time += float(meta.get("agent_execution_time", 0.0) or 0.0)
-                    in_tok, out_tok, ttl_tok = get_token_counts(meta)
-                    total_input_tokens += in_tok
-                    total_output_tokens += out_tok
-                    total_tokens += ttl_tok
-                    total_turns += int(meta.get("turn_count", 0) or 0)
-
-                    # capture actual model name if present
-                    if actual_model_name is None:
-                        actual_model_name = meta.get("actual_model_name") or None
-
-                    # capture cost if present in any meta as per-run cost token (rare)
-                    if per_run_cost is None:
-                        # A few possible fields people use; if none present, stays None
-                        possible_cost = meta.get("per_run_cost") or meta.get("run_cost") or meta.get("cost")
-                        if isinstance(possible_cost, (int, float)):
-                            per_run_cost = float(possible_cost)
-
-                    # capture model flags if present
-                    if is_open_source_model is None and "is_open_source_model" in meta:
-                        is_open_source_model = bool(meta.get("is_open_source_model"))
-                    if is_reasoning_model is None and "is_reasoning_model" in meta:
-                        is_reasoning_model = bool(meta.get("is_reasoning_model"))
-
-            pass1_rates_per_run_overall.append(round(successes_this_run / total_tasks, 6))
-
-        # Compute pass@k and pass^k across tasks (overall)
-        if not is_single_run:
-            for service, service_tasks in all_tasks.items():
-                for task in service_tasks:
-                    successes = []
-                    for run_idx in range(1, runs_count + 1):
-                        run_name = f"run-{run_idx}"
-                        meta = (
-                            model_results
-                            .get(service, {})
-                            .get(run_name, {})
-                            .get(task)
-                        )
-                        success = bool(meta.get("execution_result", {}).get("success", False)) if meta else False
-                        successes.append(success)
-                    if any(successes):
-                        pass_k_task_success_any += 1
-                    if all(successes):
-                        pass_power_k_task_success_all += 1
-
-        # Build overall metrics entry
-        denom = total_tasks * runs_count if total_tasks > 0 else 1
-        avg_agent_execution_time = total_agent_execution_time / denom
-        avg_input_tokens = total_input_tokens / denom
-        avg_output_tokens = total_output_tokens / denom
-        avg_total_tokens = total_tokens / denom
-        avg_turns = total_turns / denom
-
-        # pass@1 stats across runs
-        if pass1_rates_per_run_overall:
-            avg_pass1 = sum(pass1_rates_per_run_overall) / len(pass1_rates_per_run_overall)
-            mean = avg_pass1
-            variance = (
-                sum((r - mean) ** 2 for r in pass1_rates_per_run_overall) / len(pass1_rates_per_run_overall)
-            )
-            std_pass1 = variance ** 0.5
-        else:
-            avg_pass1 = 0.0
-            std_pass1 = 0.0
-
-        # Compute per-run tokens and cost
-        per_run_input_tokens = total_input_tokens / runs_count if runs_count else 0
-        per_run_output_tokens = total_output_tokens / runs_count if runs_count else 0
-        model_for_pricing = actual_model_name or model
-        computed_per_run_cost = compute_cost_usd(model_for_pricing, per_run_input_tokens, per_run_output_tokens)
-
-        overall_metrics = {
-            "total_tasks": total_tasks,
-            "total_agent_execution_time": total_agent_execution_time,
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_tokens": total_tokens,
-            "total_turns": total_turns,
-            "avg_agent_execution_time": round(avg_agent_execution_time, 4),
-            "avg_input_tokens": round(avg_input_tokens, 4),
-            "avg_output_tokens": round(avg_output_tokens, 4),
-            "avg_total_tokens": round(avg_total_tokens, 4),
-            "avg_turns": round(avg_turns, 4),
-            "per_run_input_tokens": per_run_input_tokens,
-            "per_run_output_tokens": per_run_output_tokens,
-            "per_run_cost": computed_per_run_cost if computed_per_run_cost is not None else (per_run_cost if per_run_cost is not None else None),
-            "actual_model_name": actual_model_name or "",
-            "is_open_source_model": (is_open_source_model if is_open_source_model is not None else False),
-            "is_reasoning_model": (is_reasoning_model if is_reasoning_model is not None else False),
-            "pass@1": {
-                "avg": round(avg_pass1, 4),
-                "std": round(std_pass1, 4),
-            },
-        }
-        if not is_single_run:
-            overall_metrics[f"pass@{k}"] = round(pass_k_task_success_any / total_tasks, 4)
-            overall_metrics[f"pass^{k}"] = round(pass_power_k_task_success_all / total_tasks, 4)
-
-        summary["overall"][model] = overall_metrics
-
-        # Per-service detailed metrics mirroring overall
-        for service, service_tasks in all_tasks.items():
-            service_total_tasks = len(service_tasks)
-            if service_total_tasks == 0:
-                continue
-
-            s_total_agent_execution_time = 0.0
-            s_total_input_tokens = 0
-            s_total_output_tokens = 0
-            s_total_tokens = 0
-            s_total_turns = 0
+    """Calculate rich metrics (totals, averages, per-run aggregates, pass@k) for complete models.
 
-            # per-run pass@1 for this service
-            s_pass1_rates_per_run: List[float] = []
-
-            # pass@k for this service
-            s_pass_k_task_success_any = 0
-            s_pass_power_k_task_success_all = 0
-
-            for run_idx in range(1, runs_count + 1):
-                run_name = f"run-{run_idx}"
-                s_successes_this_run = 0
-
-                for task in service_tasks:
-                    meta = (
-                        model_results
-                        .get(service, {})
-                        .get(run_name, {})
-                        .get(task)
-                    )
-                    if not meta:
-                        continue
-
-                    success = bool(meta.get("execution_result", {}).get("success", False))
-                    if success:
-                        s_successes_this_run += 1
-
-                    s_total_agent_execution_time += float(meta.get("agent_execution_time", 0.0) or 0.0)
-                    in_tok, out_tok, ttl_tok = get_token_counts(meta)
-                    s_total_input_tokens += in_tok
-                    s_total_output_tokens += out_tok
-                    s_total_tokens += ttl_tok
-                    s_total_turns += int(meta.get("turn_count", 0) or 0)
-
-                s_pass1_rates_per_run.append(round(s_successes_this_run / service_total_tasks, 6))
-
-            if not is_single_run:
-                for task in service_tasks:
-                    successes = []
-                    for run_idx in range(1, runs_count + 1):
-                        run_name = f"run-{run_idx}"
-                        meta = (
-                            model_results
-                            .get(service, {})
-                            .get(run_name, {})
-                            .get(task)
-                        )
-                        success = bool(meta.get("execution_result", {}).get("success", False)) if meta else False
-                        successes.append(success)
-                    if any(successes):
-                        s_pass_k_task_success_any += 1
-                    if all(successes):
-                        s_pass_power_k_task_success_all += 1
-
-            s_denom = service_total_tasks * runs_count if service_total_tasks > 0 else 1
-            s_avg_agent_execution_time = s_total_agent_execution_time / s_denom
-            s_avg_input_tokens = s_total_input_tokens / s_denom
-            s_avg_output_tokens = s_total_output_tokens / s_denom
-            s_avg_total_tokens = s_total_tokens / s_denom
-            s_avg_turns = s_total_turns / s_denom
-
-            if s_pass1_rates_per_run:
-                s_mean = sum(s_pass1_rates_per_run) / len(s_pass1_rates_per_run)
-                s_var = sum((r - s_mean) ** 2 for r in s_pass1_rates_per_run) / len(s_pass1_rates_per_run)
-                s_std = s_var ** 0.5
-            else:
-                s_mean = 0.0
-                s_std = 0.0
-
-            # Compute per-run tokens and cost for this service
-            s_per_run_input_tokens = s_total_input_tokens / runs_count if runs_count else 0
-            s_per_run_output_tokens = s_total_output_tokens / runs_count if runs_count else 0
-            s_computed_per_run_cost = compute_cost_usd(model_for_pricing, s_per_run_input_tokens, s_per_run_output_tokens)
-
-            service_metrics = {
-                "total_tasks": service_total_tasks,
-                "total_agent_execution_time": s_total_agent_execution_time,
-                "total_input_tokens": s_total_input_tokens,
-                "total_output_tokens": s_total_output_tokens,
-                "total_tokens": s_total_tokens,
-                "total_turns": s_total_turns,
-                "avg_agent_execution_time": round(s_avg_agent_execution_time, 4),
-                "avg_input_tokens": round(s_avg_input_tokens, 4),
-                "avg_output_tokens": round(s_avg_output_tokens, 4),
-                "avg_total_tokens": round(s_avg_total_tokens, 4),
-                "avg_turns": round(s_avg_turns, 4),
-                "per_run_input_tokens": s_per_run_input_tokens,
-                "per_run_output_tokens": s_per_run_output_tokens,
-                "per_run_cost": s_computed_per_run_cost if s_computed_per_run_cost is not None else (per_run_cost if per_run_cost is not None else None),
-                "actual_model_name": actual_model_name or "",
-                "is_open_source_model": (is_open_source_model if is_open_source_model is not None else False),
-                "is_reasoning_model": (is_reasoning_model if is_reasoning_model is not None else False),
-                "pass@1": {
-                    "avg": round(s_mean, 4),
-                    "std": round(s_std, 4),
-                },
-            }
-
-            if not is_single_run:
-                service_metrics[f"pass@{k}"] = round(s_pass_k_task_success_any / service_total_tasks, 4)
-                service_metrics[f"pass^{k}"] = round(s_pass_power_k_task_success_all / service_total_tasks, 4)
-
-            summary[service][model] = service_metrics
-
-    return summary
+    Results are materialized once into dense arrays (see ``metrics.py``); pass@1
+    additionally carries a 95% bootstrap confidence interval over tasks.
+    """
+    return calculate_metrics_vectorized(complete_models, all_tasks, k, single_run_models)
 
 
 def generate_model_results(exp_dir: Path, complete_models: Dict, all_tasks: Dict):
@@ -514,14 +239,17 @@ def generate_task_results(exp_dir: Path, complete_models: Dict, all_tasks: Dict)
                         token_usage = meta.get("token_usage", {}) or {}
                         turn_count = int(meta.get("turn_count", 0) or 0)
                         success = bool(meta.get("execution_result", {}).get("success", False))
-                        model_task_data["runs"].append({
+                        run_entry = {
                             "run": run_name,
                             "success": success,
                             "execution_time": agent_time,
                             "agent_execution_time": agent_time,
                             "token_usage": token_usage,
                             "turn_count": turn_count,
-                        })
+                        }
+                        if meta.get("early_stopped"):
+                            run_entry["untracked_metrics"] = untracked_metrics(meta)
+                        model_task_data["runs"].append(run_entry)
                 
                 if model_task_data["runs"]:
                     # Compute per-model summary across runs for this task
@@ -566,9 +294,13 @@ def generate_task_results(exp_dir: Path, complete_models: Dict, all_tasks: Dict)
                     }
 
                     # Include pass@k and pass^k only for multi-run models
+                    # (omitting a metric that early-stopped runs did not track)
                     if runs_count > 1:
-                        summary_obj[f"pass@{runs_count}"] = 1.0 if successful_runs > 0 else 0.0
-                        summary_obj[f"pass^{runs_count}"] = 1.0 if successful_runs == runs_count else 0.0
+                        untracked = {m for r in runs_list for m in r.get("untracked_metrics", [])}
+                        if "pass@k" not in untracked:
+                            summary_obj[f"pass@{runs_count}"] = 1.0 if successful_runs > 0 else 0.0
+                        if "pass^k" not in untracked:
+                            summary_obj[f"pass^{runs_count}"] = 1.0 if successful_runs == runs_count else 0.0
 
                     model_task_data["summary"] = summary_obj
                     task_data["models"][model] = model_task_data
@@ -636,11 +368,10 @@ def generate_readme(exp_name: str, summary: Dict, k: int) -> str:
                 f"{pass1_avg * 100:.1f}% ± {pass1_std * 100:.1f}% |"
             )
             if include_k:
-                if f"pass@{k}" in metrics and f"pass^{k}" in metrics:
-                    row += f" {metrics[f'pass@{k}'] * 100:.1f}% | {metrics[f'pass^{k}'] * 100:.1f}% |"
-                else:
-                    # Single-run models do not have pass@k or pass^k; show placeholders
-                    row += " / | / |"
+                # Single-run models do not have pass@k or pass^k, and early-stopped
+                # sweeps lack the metric they did not track; show placeholders
+                for key in (f"pass@{k}", f"pass^{k}"):
+                    row += f" {metrics[key] * 100:.1f}% |" if key in metrics else " / |"
             # Append cost and avg agent time at the end
             row += f" {cost_str} |"
             row += f" {avg_time:.1f} |"
@@ -874,6 +605,26 @@ def main():
         help="Comma-separated list of models that only need run-1"
     )
     parser.add_argument("--push", action="store_true", help="Push to GitHub (default to main)")
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="Read meta.json files directly instead of the results index",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Parallel meta.json readers for --scan (default: 32 threads)",
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="With --scan, parse meta.json files in a process pool instead of threads",
+    )
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rebuild the results index from meta.json files before aggregating",
+    )
     
     args = parser.parse_args()
     
@@ -898,7 +649,10 @@ def main():
     print(f"  Found {total_tasks} tasks across {len(all_tasks)} services")
     
     print("📥 Collecting results...")
-    results = collect_results(exp_dir, args.k)
+    if args.scan:
+        results = collect_results(exp_dir, args.k, workers=args.workers, use_processes=args.processes)
+    else:
+        results = collect_results_from_store(exp_dir, args.k, reindex=args.reindex)
     print(f"  Found results for {len(results)} models")
     
     # Check completeness and validity
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Parallel meta.json Loader for the MCPMark Aggregators
+Discovers result files in one pass and parses them across a worker pool.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # orjson is optional; it parses meta.json several times faster
+    import orjson
+
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+except ImportError:  # pragma: no cover - depends on environment
+
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+# Fields read by calculate_metrics / generate_model_results / generate_task_results.
+# Large fields such as verification_output are dropped when projecting.
+METRIC_FIELDS: Dict[str, Optional[Sequence[str]]] = {
+    "task_name": None,
+    "early_stopped": None,
+    "model_name": None,
+    "litellm_run_model_name": None,
+    "actual_model_name": None,
+    "agent_execution_time": None,
+    "task_execution_time": None,
+    "token_usage": None,
+    "turn_count": None,
+    "per_run_cost": None,
+    "run_cost": None,
+    "cost": None,
+    "is_open_source_model": None,
+    "is_reasoning_model": None,
+    "tool_stats": None,
+    "execution_result": ("success", "error_message"),
+}
+
+# (model, service, run, task, path)
+MetaFile = Tuple[str, str, str, str, str]
+
+
+@dataclass
+class MetaLoadReport:
+    """Loaded metas plus the files that could not be parsed."""
+
+    results: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]
+    loaded: int = 0
+    skipped: List[Tuple[str, str]] = field(default_factory=list)  # (path, reason)
+
+
+def _project(meta: Dict[str, Any], fields: Dict[str, Optional[Sequence[str]]]) -> Dict[str, Any]:
+    projected = {}
+    for key, sub_fields in fields.items():
+        if key not in meta:
+            continue
+        value = meta[key]
+        if sub_fields is not None and isinstance(value, dict):
+            value = {sub: value[sub] for sub in sub_fields if sub in value}
+        projected[key] = value
+    return projected
+
+
+def _load_one(
+    path: str, fields: Optional[Dict[str, Optional[Sequence[str]]]]
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Parse one meta.json. Returns (meta, None) or (None, reason); missing files yield (None, None)."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        # Task directory without meta.json (task still running or crashed)
+        return None, None
+    except OSError as exc:
+        return None, f"read error: {exc}"
+
+    try:
+        meta = _loads(data)
+    except ValueError as exc:
+        return None, f"invalid JSON: {exc}"
+    if not isinstance(meta, dict):
+        return None, "not a JSON object"
+
+    return (_project(meta, fields) if fields else meta), None
+
+
+def _load_chunk(
+    paths: Sequence[str], fields: Optional[Dict[str, Optional[Sequence[str]]]]
+) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    return [_load_one(path, fields) for path in paths]
+
+
+def _subdirs(path: str) -> Iterable[os.DirEntry]:
+    try:
+        with os.scandir(path) as it:
+            return [entry for entry in it if entry.is_dir()]
+    except FileNotFoundError:
+        return []
+
+
+def discover_meta_files(exp_dir: Path, runs: Optional[Sequence[str]] = None) -> List[MetaFile]:
+    """List candidate ``<model>__<service>/<run>/<task>/meta.json`` files.
+
+    A single ``os.scandir`` pass per directory level; file existence is not
+    checked here, missing files are skipped while loading.
+    """
+    wanted_runs = set(runs) if runs is not None else None
+    files: List[MetaFile] = []
+    for model_service in _subdirs(str(exp_dir)):
+        if "__" not in model_service.name:
+            continue
+        model, service = model_service.name.split("__", 1)
+        for run in _subdirs(model_service.path):
+            if wanted_runs is not None and run.name not in wanted_runs:
+                continue
+            for task in _subdirs(run.path):
+                if "__" not in task.name:
+                    continue
+                files.append(
+                    (model, service, run.name, task.name, os.path.join(task.path, "meta.json"))
+                )
+    return files
+
+
+def load_meta_files(
+    files: Sequence[MetaFile],
+    fields: Optional[Dict[str, Optional[Sequence[str]]]] = METRIC_FIELDS,
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+    normalize_services: bool = True,
+) -> MetaLoadReport:
+    """Parse *files* in parallel into ``model -> service -> run -> task -> meta``.
+
+    Args:
+        files: Output of :func:`discover_meta_files`
+        fields: Fields to keep per meta (``None`` keeps the whole document)
+        workers: Pool size (default: 32 threads, or one process per CPU)
+        use_processes: Parse in a process pool instead of threads; worth it
+            for very large local trees where JSON decoding dominates
+        normalize_services: Report ``playwright_webarena`` as ``playwright``
+    """
+    report = MetaLoadReport(results={})
+    if not files:
+        return report
+
+    paths = [f[4] for f in files]
+    if use_processes:
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, min(256, len(paths) // (workers * 4) or 1))
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            loaded = [
+                item
+                for chunk in executor.map(_load_chunk, chunks, [fields] * len(chunks))
+                for item in chunk
+            ]
+    else:
+        # Threads hide per-file latency on network filesystems
+        with ThreadPoolExecutor(max_workers=workers or 32) as executor:
+            loaded = list(executor.map(lambda p: _load_one(p, fields), paths))
+
+    results: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+    for (model, service, run, task, path), (meta, reason) in zip(files, loaded):
+        if meta is None:
+            if reason is not None:
+                report.skipped.append((path, reason))
+            continue
+        if normalize_services and service == "playwright_webarena":
+            service = "playwright"
+        results.setdefault(model, {}).setdefault(service, {}).setdefault(run, {})[task] = meta
+        report.loaded += 1
+
+    report.results = results
+    return report
+
+
+def load_experiment_metas(
+    exp_dir: Path,
+    k: Optional[int] = None,
+    fields: Optional[Dict[str, Optional[Sequence[str]]]] = METRIC_FIELDS,
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+) -> MetaLoadReport:
+    """Discover and load all metas of an experiment (``run-1`` .. ``run-k`` if *k* is given)."""
+    runs = [f"run-{idx}" for idx in range(1, k + 1)] if k is not None else None
+    return load_meta_files(
+        discover_meta_files(exp_dir, runs),
+        fields=fields,
+        workers=workers,
+        use_processes=use_processes,
+    )
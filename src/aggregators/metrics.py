@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Vectorized Metrics for the MCPMark Results Aggregator
+Materializes results once into dense arrays and computes pass@k and usage
+statistics with NumPy reductions.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.agents.utils.tool_stats import merge_tool_stats
+from src.aggregators.pricing import compute_cost_usd
+from src.early_stopping import SUPPORTED_METRICS, untracked_metrics
+
+BOOTSTRAP_SAMPLES = 1000
+BOOTSTRAP_SEED = 0
+
+
+@dataclass
+class ResultsTensor:
+    """Dense (model × task × run) view of a set of results.
+
+    Tasks of all services are laid out back to back; ``service_slices`` gives
+    each service's range on the task axis. Missing results are failures that
+    contribute no tokens, time or turns, matching the original dict loops.
+    Runs skipped by early stopping (see ``src.early_stopping``) count with
+    their recorded outcome for pass@k / pass^k only; pass@1 and the per-run
+    averages are over executed runs. ``untracked`` marks stubs per metric they
+    were not planned for; such a metric is not reported for the slice.
+    """
+
+    models: List[str]
+    services: List[str]
+    service_slices: Dict[str, slice]
+    runs_count: np.ndarray  # (M,) runs evaluated per model (1 for single-run models)
+    single_run: np.ndarray  # (M,) bool
+    success: np.ndarray  # (M, T, K) bool
+    agent_time: np.ndarray  # (M, T, K) float64
+    input_tokens: np.ndarray  # (M, T, K) int64
+    output_tokens: np.ndarray  # (M, T, K) int64
+    total_tokens: np.ndarray  # (M, T, K) int64
+    turns: np.ndarray  # (M, T, K) int64
+    early_stopped: np.ndarray  # (M, T, K) bool
+    untracked: Dict[str, np.ndarray]  # metric ("pass@k" / "pass^k") -> (M, T, K) bool
+    model_info: List[Dict[str, Any]]  # first-seen optional fields per model
+    tool_stats: List[Dict[str, List[Dict[str, Any]]]]  # per model: service -> per-task tool_stats
+
+    @property
+    def num_tasks(self) -> int:
+        return self.success.shape[1]
+
+
+def _token_counts(meta: Dict[str, Any]) -> Tuple[int, int, int]:
+    tu = meta.get("token_usage", {}) or {}
+    input_tokens = int(tu.get("input_tokens", 0) or 0)
+    output_tokens = int(tu.get("output_tokens", 0) or 0)
+    total_tokens = int(tu.get("total_tokens", input_tokens + output_tokens) or (input_tokens + output_tokens))
+    return input_tokens, output_tokens, total_tokens
+
+
+def build_results_tensor(
+    complete_models: Dict, all_tasks: Dict, k: int, single_run_models: List[str]
+) -> ResultsTensor:
+    """Materialize ``model -> service -> run -> task -> meta`` into dense arrays."""
+    models = list(complete_models.keys())
+    services = list(all_tasks.keys())
+
+    service_slices: Dict[str, slice] = {}
+    offset = 0
+    for service in services:
+        service_slices[service] = slice(offset, offset + len(all_tasks[service]))
+        offset += len(all_tasks[service])
+
+    shape = (len(models), offset, max(k, 1))
+    success = np.zeros(shape, dtype=bool)
+    agent_time = np.zeros(shape, dtype=np.float64)
+    input_tokens = np.zeros(shape, dtype=np.int64)
+    output_tokens = np.zeros(shape, dtype=np.int64)
+    total_tokens = np.zeros(shape, dtype=np.int64)
+    turns = np.zeros(shape, dtype=np.int64)
+    early_stopped = np.zeros(shape, dtype=bool)
+    untracked = {metric: np.zeros(shape, dtype=bool) for metric in SUPPORTED_METRICS}
+    runs_count = np.zeros(len(models), dtype=np.int64)
+    single_run = np.zeros(len(models), dtype=bool)
+    model_info: List[Dict[str, Any]] = []
+    tool_stats: List[Dict[str, List[Dict[str, Any]]]] = []
+
+    for m, model in enumerate(models):
+        model_results = complete_models[model]
+        is_single_run = any(srm in model for srm in single_run_models)
+        single_run[m] = is_single_run
+        runs_count[m] = 1 if is_single_run else k
+        info: Dict[str, Any] = {
+            "actual_model_name": None,
+            "per_run_cost": None,
+            "is_open_source_model": None,
+            "is_reasoning_model": None,
+        }
+        model_tool_stats: Dict[str, List[Dict[str, Any]]] = {service: [] for service in services}
+
+        # Iterate run -> service -> task so "first seen" optional fields match
+        # the order the metrics were historically accumulated in
+        for r in range(int(runs_count[m])):
+            run_name = f"run-{r + 1}"
+            for service in services:
+                run_results = model_results.get(service, {}).get(run_name, {})
+                base = service_slices[service].start
+                for t, task in enumerate(all_tasks[service], start=base):
+                    meta = run_results.get(task)
+                    if not meta:
+                        continue
+
+                    success[m, t, r] = bool(meta.get("execution_result", {}).get("success", False))
+                    early_stopped[m, t, r] = bool(meta.get("early_stopped"))
+                    for metric in untracked_metrics(meta):
+                        untracked[metric][m, t, r] = True
+                    agent_time[m, t, r] = float(meta.get("agent_execution_time", 0.0) or 0.0)
+                    input_tokens[m, t, r], output_tokens[m, t, r], total_tokens[m, t, r] = _token_counts(meta)
+                    turns[m, t, r] = int(meta.get("turn_count", 0) or 0)
+                    if meta.get("tool_stats"):
+                        model_tool_stats[service].append(meta["tool_stats"])
+
+                    if info["actual_model_name"] is None:
+                        info["actual_model_name"] = meta.get("actual_model_name") or None
+                    if info["per_run_cost"] is None:
+                        possible_cost = meta.get("per_run_cost") or meta.get("run_cost") or meta.get("cost")
+                        if isinstance(possible_cost, (int, float)):
+                            info["per_run_cost"] = float(possible_cost)
+                    for flag in ("is_open_source_model", "is_reasoning_model"):
+                        if info[flag] is None and flag in meta:
+                            info[flag] = bool(meta.get(flag))
+
+        model_info.append(info)
+        tool_stats.append(model_tool_stats)
+
+    return ResultsTensor(
+        models=models,
+        services=services,
+        service_slices=service_slices,
+        runs_count=runs_count,
+        single_run=single_run,
+        success=success,
+        agent_time=agent_time,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=total_tokens,
+        turns=turns,
+        early_stopped=early_stopped,
+        untracked=untracked,
+        model_info=model_info,
+        tool_stats=tool_stats,
+    )
+
+
+def bootstrap_pass1_ci(
+    success: np.ndarray,
+    samples: int = BOOTSTRAP_SAMPLES,
+    seed: int = BOOTSTRAP_SEED,
+    executed: Optional[np.ndarray] = None,
+) -> Tuple[float, float]:
+    """95% bootstrap CI of pass@1 for a (task × run) success matrix, resampling tasks.
+
+    With an *executed* mask, each task's rate is taken over its executed runs only.
+    """
+    num_tasks = success.shape[0]
+    if num_tasks == 0 or success.shape[1] == 0:
+        return 0.0, 0.0
+    per_task = _per_task_pass1(success, executed)
+    rng = np.random.default_rng(seed)
+    resampled = per_task[rng.integers(0, num_tasks, size=(samples, num_tasks))].mean(axis=1)
+    low, high = np.percentile(resampled, [2.5, 97.5])
+    return float(low), float(high)
+
+
+def _per_task_pass1(success: np.ndarray, executed: Optional[np.ndarray]) -> np.ndarray:
+    """Per-task success rate, over the executed runs if a mask is given."""
+    if executed is None:
+        return success.mean(axis=1)
+    counts = executed.sum(axis=1)
+    return (success & executed).sum(axis=1) / np.maximum(counts, 1)
+
+
+def _metrics_for_slice(
+    tensor: ResultsTensor,
+    m: int,
+    task_slice: slice,
+    k: int,
+    model_for_pricing: str,
+) -> Dict[str, Any]:
+    runs = int(tensor.runs_count[m])
+    is_single_run = bool(tensor.single_run[m])
+    success = tensor.success[m, task_slice, :runs]
+    num_tasks = success.shape[0]
+    info = tensor.model_info[m]
+
+    total_agent_execution_time = float(tensor.agent_time[m, task_slice, :runs].sum())
+    total_input_tokens = int(tensor.input_tokens[m, task_slice, :runs].sum())
+    total_output_tokens = int(tensor.output_tokens[m, task_slice, :runs].sum())
+    total_tokens = int(tensor.total_tokens[m, task_slice, :runs].sum())
+    total_turns = int(tensor.turns[m, task_slice, :runs].sum())
+
+    # Averages are per executed run; early-stopped runs did not use tokens or time
+    skipped_runs = int(tensor.early_stopped[m, task_slice, :runs].sum())
+    denom = num_tasks * runs - skipped_runs if num_tasks * runs > skipped_runs else 1
+
+    # pass@1 per run, rounded like the per-run rates have always been. Early-stopped
+    # runs are stubs repeating an earlier outcome, so they are left out: each run's
+    # rate is over its executed tasks, and the average over each task's executed runs.
+    executed = ~tensor.early_stopped[m, task_slice, :runs] if skipped_runs else None
+    if runs and num_tasks:
+        if executed is None:
+            pass1_rates = [round(int(n) / num_tasks, 6) for n in success.sum(axis=0)]
+            avg_pass1 = sum(pass1_rates) / len(pass1_rates)
+        else:
+            pass1_rates = [
+                round(int(n) / int(c), 6)
+                for n, c in zip((success & executed).sum(axis=0), executed.sum(axis=0))
+                if c
+            ]
+            avg_pass1 = float(_per_task_pass1(success, executed).mean())
+        std_pass1 = (sum((r - avg_pass1) ** 2 for r in pass1_rates) / len(pass1_rates)) ** 0.5 if pass1_rates else 0.0
+    else:
+        avg_pass1 = 0.0
+        std_pass1 = 0.0
+    ci_low, ci_high = bootstrap_pass1_ci(success, executed=executed)
+
+    per_run_input_tokens = total_input_tokens / runs if runs else 0
+    per_run_output_tokens = total_output_tokens / runs if runs else 0
+    computed_per_run_cost = compute_cost_usd(model_for_pricing, per_run_input_tokens, per_run_output_tokens)
+    per_run_cost = info["per_run_cost"]
+
+    metrics = {
+        "total_tasks": num_tasks,
+        "total_agent_execution_time": total_agent_execution_time,
+        "total_input_tokens": total_input_tokens,
+        "total_output_tokens": total_output_tokens,
+        "total_tokens": total_tokens,
+        "total_turns": total_turns,
+        "avg_agent_execution_time": round(total_agent_execution_time / denom, 4),
+        "avg_input_tokens": round(total_input_tokens / denom, 4),
+        "avg_output_tokens": round(total_output_tokens / denom, 4),
+        "avg_total_tokens": round(total_tokens / denom, 4),
+        "avg_turns": round(total_turns / denom, 4),
+        "per_run_input_tokens": per_run_input_tokens,
+        "per_run_output_tokens": per_run_output_tokens,
+        "per_run_cost": computed_per_run_cost if computed_per_run_cost is not None else per_run_cost,
+        "actual_model_name": info["actual_model_name"] or "",
+        "is_open_source_model": bool(info["is_open_source_model"]),
+        "is_reasoning_model": bool(info["is_reasoning_model"]),
+        "pass@1": {
+            "avg": round(avg_pass1, 4),
+            "std": round(std_pass1, 4),
+            "ci95": [round(ci_low, 4), round(ci_high, 4)],
+        },
+    }
+    if skipped_runs:
+        metrics["early_stopped_runs"] = skipped_runs
+    if not is_single_run and num_tasks:
+        # Stubs repeat an outcome only for the metrics they were planned for
+        untracked = [
+            metric for metric in SUPPORTED_METRICS if tensor.untracked[metric][m, task_slice, :runs].any()
+        ]
+        if "pass@k" not in untracked:
+            metrics[f"pass@{k}"] = round(float(success.any(axis=1).mean()), 4)
+        if "pass^k" not in untracked:
+            metrics[f"pass^{k}"] = round(float(success.all(axis=1).mean()), 4)
+        if untracked:
+            metrics["early_stopping_untracked"] = untracked
+    return metrics
+
+
+def calculate_metrics_vectorized(
+    complete_models: Dict, all_tasks: Dict, k: int, single_run_models: List[str]
+) -> Dict:
+    """Compute the summary produced by ``aggregate_results.calculate_metrics``."""
+    summary: Dict[str, Any] = {
+        "generated_at": datetime.now().isoformat(),
+        "k": k,
+        "overall": {},
+    }
+    for service in all_tasks.keys():
+        summary[service] = {}
+
+    tensor = build_results_tensor(complete_models, all_tasks, k, single_run_models)
+
+    for m, model in enumerate(tensor.models):
+        model_for_pricing = tensor.model_info[m]["actual_model_name"] or model
+        summary["overall"][model] = _metrics_for_slice(
+            tensor, m, slice(0, tensor.num_tasks), k, model_for_pricing
+        )
+        summary["overall"][model]["tool_stats"] = merge_tool_stats(
+            stats for service_stats in tensor.tool_stats[m].values() for stats in service_stats
+        )
+        for service in tensor.services:
+            task_slice = tensor.service_slices[service]
+            if task_slice.stop == task_slice.start:
+                continue
+            summary[service][model] = _metrics_for_slice(
+                tensor, m, task_slice, k, model_for_pricing
+            )
+            summary[service][model]["tool_stats"] = merge_tool_stats(tensor.tool_stats[m][service])
+
+    return summary
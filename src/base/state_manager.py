@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 from src.logger import get_logger
+from src.rate_limiter import RateLimiter
 from .task_manager import BaseTask
 
 # Initialize logger
@@ -27,10 +28,12 @@ class BaseStateManager(ABC):
     while allowing service-specific implementations through template methods.
     """
 
-    def __init__(self, service_name: str):
+    def __init__(self, service_name: str, rate_limiter: Optional[RateLimiter] = None):
         self.service_name = service_name
         # Simple resource tracking for cleanup
         self.tracked_resources: List[Dict[str, Any]] = []
+        # Optional per-shard limiter shared with the agent bound to this manager
+        self.rate_limiter = rate_limiter
 
     # Note: Initialization is now handled in service-specific constructors
 
@@ -123,6 +126,27 @@ class BaseStateManager(ABC):
         self.tracked_resources.append(resource)
         logger.debug(f"Tracked {resource_type} resource: {identifier}")
 
+    def get_resume_state(self, task: BaseTask) -> Dict[str, Any]:
+        """State needed to reattach to *task*'s initial state in a later process.
+
+        Stored in the agent's per-turn checkpoints. Services that support
+        resuming interrupted runs override this together with :meth:`resume`;
+        the default (empty) means runs always start from a fresh set-up.
+        """
+        return {}
+
+    def resume(self, task: BaseTask, state: Dict[str, Any]) -> bool:
+        """Reattach *task* to the initial state described by *state*.
+
+        Args:
+            task: The task being resumed
+            state: Value previously returned by :meth:`get_resume_state`
+
+        Returns:
+            True if the task can continue on that state, False to set up afresh
+        """
+        return False
+
     def get_service_config_for_agent(self) -> dict:
         """
         Get service-specific configuration for agent execution.
@@ -135,6 +159,23 @@ class BaseStateManager(ABC):
         """
         return {}
 
+    def get_verification_environment(self, messages_path: str = None) -> Dict[str, str]:
+        """
+        Get environment variables needed for verification scripts.
+
+        Args:
+            messages_path: Optional path to messages.json file for verification
+
+        This method can be overridden by service implementations that need
+        to pass specific environment variables to their verification scripts
+        (e.g. the credentials of the shard the task ran on). The default
+        implementation sets MCP_MESSAGES if provided.
+        """
+        env = {}
+        if messages_path:
+            env["MCP_MESSAGES"] = str(messages_path)
+        return env
+
     def set_verification_environment(self, messages_path: str = None) -> None:
         """
         Set environment variables needed for verification scripts.
@@ -142,13 +183,20 @@ class BaseStateManager(ABC):
         Args:
             messages_path: Optional path to messages.json file for verification
 
-        This method can be overridden by service implementations that need
-        to set specific environment variables for their verification scripts.
-        The default implementation sets MCP_MESSAGES if provided.
+        Prefer passing :meth:`get_verification_environment` to the verifier
+        directly; mutating ``os.environ`` is not safe when shards run concurrently.
         """
         import os
-        if messages_path:
-            os.environ["MCP_MESSAGES"] = str(messages_path)
+        os.environ.update(self.get_verification_environment(messages_path))
+
+    def collect_api_usage(self) -> Dict[str, Any]:
+        """
+        Get the service API usage of the current task and reset the counters.
+
+        Services that account their REST traffic override this; the result is
+        stored in meta.json as ``api_usage`` (stage -> endpoint -> counters).
+        """
+        return {}
 
     def _cleanup_tracked_resources(self) -> bool:
         """Clean up all tracked resources."""
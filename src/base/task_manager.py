@@ -8,6 +8,7 @@ common task discovery patterns while maintaining flexibility for service-specifi
 """
 
 import json
+import os
 import subprocess
 import sys
 from abc import ABC
@@ -170,8 +171,19 @@ class BaseTaskManager(ABC):
         base_instruction = self._read_task_instruction(task)
         return self._format_task_instruction(base_instruction)
 
-    def execute_task(self, task: BaseTask, agent_result: Dict[str, Any]) -> TaskResult:
-        """Execute task verification (template method)."""
+    def execute_task(
+        self,
+        task: BaseTask,
+        agent_result: Dict[str, Any],
+        env: Optional[Dict[str, str]] = None,
+    ) -> TaskResult:
+        """Execute task verification (template method).
+
+        Args:
+            task: The task to verify
+            agent_result: Result dictionary returned by the agent
+            env: Extra environment variables for the verification script
+        """
         logger.info(f"| Verifying task ({self.mcp_service.title()}): {task.name}")
 
         # Track agent success separately
@@ -193,7 +205,7 @@ class BaseTaskManager(ABC):
 
         try:
             # Always run verification regardless of agent success
-            verify_result = self.run_verification(task)
+            verify_result = self.run_verification(task, env=env)
 
             # Process verification results
             verification_success = verify_result.returncode == 0
@@ -242,10 +254,13 @@ class BaseTaskManager(ABC):
                 turn_count=agent_result.get("turn_count", 0),
             )
 
-    def run_verification(self, task: BaseTask) -> subprocess.CompletedProcess:
+    def run_verification(
+        self, task: BaseTask, env: Optional[Dict[str, str]] = None
+    ) -> subprocess.CompletedProcess:
         """Run the verification script for a task (can be overridden).
 
-        Default implementation runs the verification command.
+        Default implementation runs the verification command, with ``env``
+        layered on top of the current process environment.
         Services can override this to add environment variables or custom logic.
         """
         return subprocess.run(
@@ -253,6 +268,7 @@ class BaseTaskManager(ABC):
             capture_output=True,  # Capture stdout and stderr for logging
             text=True,
             timeout=300,
+            env={**os.environ, **env} if env else None,
         )
 
     # =========================================================================
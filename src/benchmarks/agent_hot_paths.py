@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Agent Hot-Path Micro-Benchmarks for MCPMark
+Times the pure-CPU helpers the agent runs every turn (format conversion, schema
+simplification, progress recording, tool-result encoding) on synthetic but
+realistic fixtures, and compares against a saved baseline
+(agent_hot_paths_baseline.json next to this file by default).
+
+Usage:
+    python -m src.benchmarks.agent_hot_paths                       # measure and compare
+    python -m src.benchmarks.agent_hot_paths --save src/benchmarks/agent_hot_paths_baseline.json
+    python -m src.benchmarks.agent_hot_paths --baseline other.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+from src.agents.mcpmark_agent import MCPMarkAgent
+
+TURNS = 100
+SEED = 0
+DEFAULT_BASELINE = Path(__file__).with_name("agent_hot_paths_baseline.json")
+
+
+# ----------------------------------------------------------------------
+# Fixtures
+# ----------------------------------------------------------------------
+
+
+def _rich_text_schema() -> Dict[str, Any]:
+    return {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "type": {"type": "string", "enum": ["text", "mention", "equation"]},
+                "text": {
+                    "type": "object",
+                    "properties": {
+                        "content": {"type": "string"},
+                        "link": {"type": ["object", "null"], "properties": {"url": {"type": "string"}}},
+                    },
+                    "required": ["content"],
+                },
+                "annotations": {
+                    "type": "object",
+                    "properties": {
+                        flag: {"type": "boolean"}
+                        for flag in ("bold", "italic", "strikethrough", "underline", "code")
+                    },
+                },
+            },
+        },
+    }
+
+
+def _block_schema() -> Dict[str, Any]:
+    block_types = ["paragraph", "heading_1", "heading_2", "heading_3", "bulleted_list_item",
+                   "numbered_list_item", "to_do", "toggle", "quote", "callout", "code"]
+    return {
+        "type": "object",
+        "properties": {
+            "type": {"type": "string", "enum": block_types},
+            **{
+                block_type: {
+                    "type": "object",
+                    "properties": {
+                        "rich_text": _rich_text_schema(),
+                        "color": {"type": "string"},
+                        "children": {"type": "array", "items": {"type": "object"}},
+                    },
+                }
+                for block_type in block_types
+            },
+        },
+        "anyOf": [{"required": [block_type]} for block_type in block_types],
+    }
+
+
+def notion_tools() -> List[Dict[str, Any]]:
+    """Tool list shaped like the Notion MCP server's (names, nesting, sizes)."""
+    id_param = lambda name: {name: {"type": "string", "description": f"Identifier for a Notion {name.split('_')[0]}"}}
+    paging = {
+        "start_cursor": {"type": "string", "description": "Cursor returned by a previous request"},
+        "page_size": {"type": "integer", "description": "Number of items to return (max 100)"},
+    }
+    filter_schema = {
+        "type": "object",
+        "properties": {
+            "or": {"type": "array", "items": {"type": "object", "additionalProperties": True}},
+            "and": {"type": "array", "items": {"type": "object", "additionalProperties": True}},
+            "property": {"type": "string"},
+        },
+    }
+    properties_schema = {
+        "type": "object",
+        "additionalProperties": {
+            "type": "object",
+            "properties": {
+                "title": _rich_text_schema(),
+                "rich_text": _rich_text_schema(),
+                "number": {"type": ["number", "null"]},
+                "select": {"type": ["object", "null"], "properties": {"name": {"type": "string"}}},
+                "multi_select": {"type": "array", "items": {"type": "object", "properties": {"name": {"type": "string"}}}},
+                "checkbox": {"type": "boolean"},
+                "date": {"type": ["object", "null"], "properties": {"start": {"type": "string"}, "end": {"type": ["string", "null"]}}},
+            },
+        },
+    }
+    specs = [
+        ("API-get-user", id_param("user_id"), ["user_id"]),
+        ("API-get-users", dict(paging), []),
+        ("API-get-self", {}, []),
+        ("API-post-database-query", {**id_param("database_id"), "filter": filter_schema,
+                                     "sorts": {"type": "array", "items": {"type": "object"}}, **paging}, ["database_id"]),
+        ("API-post-search", {"query": {"type": "string"}, "filter": filter_schema,
+                             "sort": {"type": "object", "properties": {"direction": {"type": "string"}}}, **paging}, []),
+        ("API-get-block-children", {**id_param("block_id"), **paging}, ["block_id"]),
+        ("API-patch-block-children", {**id_param("block_id"), "children": {"type": "array", "items": _block_schema()},
+                                      "after": {"type": "string"}}, ["block_id", "children"]),
+        ("API-retrieve-a-block", id_param("block_id"), ["block_id"]),
+        ("API-update-a-block", {**id_param("block_id"), **_block_schema()["properties"],
+                                "archived": {"type": "boolean"}}, ["block_id"]),
+        ("API-delete-a-block", id_param("block_id"), ["block_id"]),
+        ("API-retrieve-a-page", {**id_param("page_id"), "filter_properties": {"type": "array", "items": {"type": "string"}}}, ["page_id"]),
+        ("API-patch-page", {**id_param("page_id"), "properties": properties_schema, "archived": {"type": "boolean"},
+                            "icon": {"type": ["object", "null"]}, "cover": {"type": ["object", "null"]}}, ["page_id"]),
+        ("API-post-page", {"parent": {"type": "object", "properties": {**id_param("page_id"), **id_param("database_id")}},
+                           "properties": properties_schema, "children": {"type": "array", "items": _block_schema()}}, ["parent", "properties"]),
+        ("API-create-a-database", {"parent": {"type": "object"}, "title": _rich_text_schema(), "properties": properties_schema}, ["parent", "properties"]),
+        ("API-update-a-database", {**id_param("database_id"), "title": _rich_text_schema(), "description": _rich_text_schema(),
+                                   "properties": properties_schema}, ["database_id"]),
+        ("API-retrieve-a-database", id_param("database_id"), ["database_id"]),
+        ("API-retrieve-a-page-property", {**id_param("page_id"), **id_param("property_id"), **paging}, ["page_id", "property_id"]),
+        ("API-retrieve-a-comment", {**id_param("block_id"), **paging}, ["block_id"]),
+        ("API-create-a-comment", {"parent": {"type": "object", "properties": id_param("page_id")},
+                                  "rich_text": _rich_text_schema()}, ["parent", "rich_text"]),
+    ]
+    return [
+        {
+            "name": name,
+            "description": f"Notion | {name.removeprefix('API-').replace('-', ' ').capitalize()}. "
+                           "Returns the raw Notion API response object.",
+            "inputSchema": {"type": "object", "properties": properties, "required": required},
+        }
+        for name, properties, required in specs
+    ]
+
+
+def notion_payload(rng: random.Random, blocks: int = 40) -> Dict[str, Any]:
+    """A ``blocks.children.list`` response of roughly 20-30 KB."""
+    results = []
+    for _ in range(blocks):
+        text = " ".join(rng.choice(["plan", "itinerary", "budget", "Tokyo", "packing", "notes", "status"])
+                        for _ in range(rng.randint(8, 30)))
+        results.append({
+            "object": "block",
+            "id": f"{rng.getrandbits(128):032x}",
+            "parent": {"type": "page_id", "page_id": f"{rng.getrandbits(128):032x}"},
+            "created_time": "2025-01-01T00:00:00.000Z",
+            "last_edited_time": "2025-01-02T00:00:00.000Z",
+            "has_children": rng.random() < 0.2,
+            "archived": False,
+            "type": "paragraph",
+            "paragraph": {
+                "rich_text": [{
+                    "type": "text",
+                    "text": {"content": text, "link": None},
+                    "annotations": {"bold": False, "italic": False, "strikethrough": False,
+                                    "underline": False, "code": False, "color": "default"},
+                    "plain_text": text,
+                    "href": None,
+                }],
+                "color": "default",
+            },
+        })
+    return {"object": "list", "results": results, "next_cursor": None, "has_more": False}
+
+
+def tool_result(rng: random.Random) -> Dict[str, Any]:
+    """MCP ``call_tool`` result as returned by the stdio server."""
+    return {"content": [{"type": "text", "text": json.dumps(notion_payload(rng))}], "isError": False}
+
+
+def openai_trajectory(turns: int = TURNS, seed: int = SEED) -> List[Dict[str, Any]]:
+    """LiteLLM-loop messages: one tool call with a large Notion result per turn."""
+    rng = random.Random(seed)
+    tools = [t["name"] for t in notion_tools()]
+    messages: List[Dict[str, Any]] = [{"role": "user", "content": "Update the packing list in the travel planner."}]
+    for turn in range(turns):
+        call_id = f"call_{turn}"
+        messages.append({
+            "role": "assistant",
+            "content": "Checking the page structure." if turn % 3 == 0 else None,
+            "tool_calls": [{
+                "id": call_id,
+                "type": "function",
+                "function": {"name": rng.choice(tools), "arguments": json.dumps({"block_id": f"{rng.getrandbits(128):032x}"})},
+            }],
+        })
+        messages.append({"role": "tool", "tool_call_id": call_id, "content": json.dumps(tool_result(rng))})
+    messages.append({"role": "assistant", "content": "Done."})
+    return messages
+
+
+def anthropic_trajectory(turns: int = TURNS, seed: int = SEED) -> List[Dict[str, Any]]:
+    """Claude-native-loop messages with thinking, tool_use and tool_result blocks."""
+    rng = random.Random(seed)
+    tools = [t["name"] for t in notion_tools()]
+    messages: List[Dict[str, Any]] = [{"role": "user", "content": "Update the packing list in the travel planner."}]
+    for turn in range(turns):
+        tool_use_id = f"toolu_{turn}"
+        messages.append({
+            "role": "assistant",
+            "content": [
+                {"type": "thinking", "thinking": "I should inspect the children of the page first.", "signature": "sig"},
+                {"type": "text", "text": "Checking the page structure."},
+                {"type": "tool_use", "id": tool_use_id, "name": rng.choice(tools),
+                 "input": {"block_id": f"{rng.getrandbits(128):032x}"}},
+            ],
+        })
+        messages.append({
+            "role": "user",
+            "content": [{"type": "tool_result", "tool_use_id": tool_use_id,
+                         "content": [{"type": "text", "text": json.dumps(tool_result(rng))}]}],
+        })
+    messages.append({"role": "assistant", "content": [{"type": "text", "text": "Done."}]})
+    return messages
+
+
+# ----------------------------------------------------------------------
+# Harness
+# ----------------------------------------------------------------------
+
+
+@dataclass
+class Case:
+    name: str
+    func: Callable[[], Any]
+    number: int  # calls per timing sample
+
+
+def build_cases() -> List[Case]:
+    agent = MCPMarkAgent("gpt-4.1", "benchmark", None, "notion")
+    gemini_agent = MCPMarkAgent("gemini-2.5-pro", "benchmark", None, "notion")
+    tools = notion_tools()
+    openai_messages = openai_trajectory()
+    anthropic_messages = anthropic_trajectory()
+    usage = {"input_tokens": 1000, "output_tokens": 100, "total_tokens": 1100, "reasoning_tokens": 0}
+    result = tool_result(random.Random(SEED))
+    # Stand-in for a started MCP server; only its reported identity is used
+    server = SimpleNamespace(server_info={"name": "notion-mcp-server", "version": "benchmark"})
+
+    return [
+        Case("convert_to_sdk_format[openai]", lambda: MCPMarkAgent._convert_to_sdk_format(openai_messages), 20),
+        Case("convert_to_sdk_format[anthropic]", lambda: MCPMarkAgent._convert_to_sdk_format(anthropic_messages), 20),
+        Case("convert_to_openai_format", lambda: agent._convert_to_openai_format(tools), 200),
+        Case("convert_to_openai_format[gemini]", lambda: gemini_agent._convert_to_openai_format(tools), 50),
+        Case("get_converted_tools[gemini,cached]",
+             lambda: gemini_agent._get_converted_tools(tools, server, "openai-gemini"), 200),
+        Case("simplify_schema_for_gemini", lambda: [gemini_agent._simplify_schema_for_gemini(t["inputSchema"]) for t in tools], 50),
+        Case("update_progress", lambda: agent._update_progress(openai_messages, usage, TURNS), 200),
+        Case("encode_tool_result", lambda: json.dumps(result), 200),
+    ]
+
+
+def measure(case: Case, repeat: int) -> Dict[str, float]:
+    """Best-of-*repeat* time per call (µs) and peak traced allocation per call (KiB)."""
+    case.func()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(case.number):
+            case.func()
+        best = min(best, (time.perf_counter() - start) / case.number)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        case.func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"time_us": round(best * 1e6, 2), "peak_kib": round((peak - before) / 1024, 1)}
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], max_regression: float
+) -> bool:
+    """Print a comparison table; return False if any case regressed too much."""
+    ok = True
+    print("\n📊 Compared to baseline:")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            print(f"  {name}: n/a")
+            continue
+        for metric, unit in (("time_us", "µs"), ("peak_kib", "KiB")):
+            before, after = previous.get(metric), current[metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            marker = "✓"
+            if change > max_regression:
+                marker = "✗"
+                ok = False
+            print(f"  {marker} {name} {metric}: {before:.1f} → {after:.1f} {unit} ({change:+.0%})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent's per-turn CPU hot paths")
+    parser.add_argument("--cases", type=str, help="Comma-separated case name prefixes to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing samples per case, best is kept (default: 5)")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help=f"Baseline JSON to compare against (default: {DEFAULT_BASELINE.name})",
+    )
+    parser.add_argument("--no-baseline", action="store_true", help="Only measure, skip the comparison")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown / allocation growth vs. baseline before failing (default: 0.25 = 25%%)",
+    )
+    parser.add_argument("--save", type=Path, help="Write the measurements as a new baseline")
+    args = parser.parse_args()
+
+    # Per-call info logs (e.g. Gemini schema conversion) would swamp the output
+    logging.getLogger("src.agents.mcpmark_agent").setLevel(logging.WARNING)
+    # Keep the tool schema cache in memory only
+    os.environ.setdefault("MCPMARK_TOOL_CACHE_DIR", "")
+
+    baseline = None
+    if not args.no_baseline:
+        # Read before measuring so --save can overwrite the same file
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    cases = build_cases()
+    if args.cases:
+        prefixes = [p.strip() for p in args.cases.split(",")]
+        cases = [c for c in cases if any(c.name.startswith(p) for p in prefixes)]
+
+    print(f"⏱️  Running {len(cases)} hot-path benchmarks ({TURNS}-turn trajectories, {args.repeat} samples each)...")
+    results: Dict[str, Dict[str, float]] = {}
+    for case in cases:
+        results[case.name] = measure(case, args.repeat)
+        print(f"  {case.name:<36} {results[case.name]['time_us']:>12.1f} µs/call {results[case.name]['peak_kib']:>10.1f} KiB peak")
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Saved baseline to {args.save}")
+
+    if baseline is not None:
+        if not compare_to_baseline(results, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark for MCPMark
+Measures CLI / worker start-up cost with ``python -X importtime`` and compares
+it against a saved baseline.
+
+Usage:
+    python -m src.benchmarks.import_time                       # measure
+    python -m src.benchmarks.import_time --save baseline.json  # record baseline
+    python -m src.benchmarks.import_time --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Entry points whose start-up cost matters: CLI commands and evaluation workers
+DEFAULT_MODULES = [
+    "src.factory",
+    "src.evaluator",
+    "src.agents.mcpmark_agent",
+    "src.mcp_services.notion.notion_state_manager",
+    "src.aggregators.aggregate_results",
+    "src.results_store",
+]
+
+
+def measure_import(module: str) -> Tuple[Optional[float], List[Tuple[float, str]]]:
+    """Import *module* in a fresh interpreter.
+
+    Returns:
+        Tuple of (cumulative import time in ms or None if the import failed,
+        [(self time in ms, module name)] for every module imported)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        return None, []
+
+    total_ms: Optional[float] = None
+    self_times: List[Tuple[float, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        name = name.strip()
+        self_times.append((int(self_us) / 1000, name))
+        if name == module:
+            total_ms = int(cumulative_us) / 1000
+    return total_ms, self_times
+
+
+def run_benchmark(modules: List[str], repeat: int, top: int) -> Dict[str, Optional[float]]:
+    """Best-of-*repeat* cumulative import time per module, in ms."""
+    results: Dict[str, Optional[float]] = {}
+    for module in modules:
+        samples = []
+        heaviest: List[Tuple[float, str]] = []
+        for _ in range(repeat):
+            total_ms, self_times = measure_import(module)
+            if total_ms is None:
+                break
+            samples.append(total_ms)
+            heaviest = sorted(self_times, reverse=True)[:top]
+
+        if not samples:
+            print(f"  ✗ {module}: import failed (missing dependency?)")
+            results[module] = None
+            continue
+
+        results[module] = min(samples)
+        print(f"  {module}: {results[module]:.1f} ms")
+        for self_ms, name in heaviest:
+            print(f"      {self_ms:8.1f} ms  {name}")
+    return results
+
+
+def compare_to_baseline(
+    results: Dict[str, Optional[float]], baseline: Dict[str, float], max_regression: float
+) -> bool:
+    """Print a comparison table; return False if any module regressed too much."""
+    ok = True
+    print("\n📊 Compared to baseline:")
+    for module, current in results.items():
+        previous = baseline.get(module)
+        if current is None or previous is None:
+            print(f"  {module}: n/a")
+            continue
+        change = (current - previous) / previous if previous else 0.0
+        marker = "✓"
+        if change > max_regression:
+            marker = "✗"
+            ok = False
+        print(f"  {marker} {module}: {previous:.1f} → {current:.1f} ms ({change:+.0%})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MCPMark import times")
+    parser.add_argument(
+        "--modules",
+        type=str,
+        help="Comma-separated modules to import (default: CLI and worker entry points)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module, best is kept (default: 3)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list per module (default: 5)")
+    parser.add_argument("--baseline", type=Path, help="Baseline JSON to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown vs. baseline before failing (default: 0.2 = 20%%)",
+    )
+    parser.add_argument("--save", type=Path, help="Write the measured times as a new baseline")
+    args = parser.parse_args()
+
+    modules = [m.strip() for m in args.modules.split(",")] if args.modules else DEFAULT_MODULES
+
+    print(f"⏱️  Measuring import time ({args.repeat} runs each)...")
+    results = run_benchmark(modules, args.repeat, args.top)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({m: t for m, t in results.items() if t is not None}, f, indent=2)
+        print(f"\n📄 Saved baseline to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare_to_baseline(results, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
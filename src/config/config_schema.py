@@ -170,6 +170,12 @@ class GenericConfigSchema(ConfigSchema):
                 transform = lambda x: Path(x) if x else None
             elif transform_str == "list":
                 transform = lambda x: [t.strip() for t in x.split(",")] if x else []
+            elif transform_str == "tuple_list":
+                transform = lambda x: [
+                    tuple(field.strip() for field in entry.split(","))
+                    for entry in x.split(";")
+                    if entry.strip()
+                ] if x else []
 
             # Handle validator strings
             validator = None
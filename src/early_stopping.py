@@ -0,0 +1,160 @@
+"""
+Sequential Early Stopping for pass@k Sweeps
+===========================================
+
+A pass@k sweep runs every task ``k`` times (``run-1`` .. ``run-k``). Many of
+those runs cannot change the reported numbers: once a task has passed,
+its pass@k is 1, and once it has failed, its pass^k is 0. A task with both
+outcomes is settled for both metrics.
+
+Before run ``j``, :class:`EarlyStoppingPolicy` looks at the outcomes of
+runs ``1 .. j-1`` and skips:
+
+- every task whose tracked metrics are already settled (exact), and
+- with ``tolerance > 0``, the unsettled tasks least likely to change
+  outcome. They are ranked by Laplace's rule of succession, and at most
+  ``tolerance * num_tasks`` of them are skipped over the whole sweep, so
+  each tracked metric moves by at most ``tolerance``.
+
+A skipped run is recorded as a stub ``meta.json`` with an ``early_stopped``
+entry. The stub repeats the task's last executed outcome, which leaves pass@k
+and pass^k of settled tasks unchanged. It reports no tokens or time. The
+aggregator counts stubs for pass@k and pass^k only; pass@1 and the per-run
+averages are computed over executed runs, since a repeated outcome is not
+an observation. A stub is only evidence for the metrics it tracked: with
+``metrics=("pass@k",)`` a task that passed once is settled and its stubs
+repeat the success, which says nothing about pass^k. The aggregator omits a
+metric that any stub of the slice did not track (:func:`untracked_metrics`).
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+SUPPORTED_METRICS = ("pass@k", "pass^k")
+REASON_SETTLED = "settled"
+REASON_TOLERANCE = "tolerance"
+
+_RUN_NAME = re.compile(r"^run-(\d+)$")
+
+
+def untracked_metrics(meta: Dict) -> List[str]:
+    """Metrics a stub ``meta.json`` does not stand for ([] for executed runs)."""
+    early_stopped = meta.get("early_stopped")
+    if not early_stopped:
+        return []
+    tracked = early_stopped.get("tracked_metrics") or SUPPORTED_METRICS
+    return [metric for metric in SUPPORTED_METRICS if metric not in tracked]
+
+
+def run_index(run_name: str) -> Optional[int]:
+    """1-based index of a ``run-N`` experiment name, None for other names."""
+    match = _RUN_NAME.match(run_name)
+    return int(match.group(1)) if match else None
+
+
+@dataclass
+class EarlyStoppingPolicy:
+    """Which runs of a k-run sweep can be skipped without moving the tracked metrics.
+
+    Attributes:
+        k: Runs per task in the sweep
+        metrics: Metrics that must stay exact (up to *tolerance*): "pass@k", "pass^k"
+        tolerance: Largest change of a tracked metric allowed from skipping unsettled tasks
+    """
+
+    k: int
+    metrics: Sequence[str] = SUPPORTED_METRICS
+    tolerance: float = 0.0
+
+    def __post_init__(self):
+        unknown = [metric for metric in self.metrics if metric not in SUPPORTED_METRICS]
+        if unknown or not self.metrics:
+            raise ValueError(f"Early stopping tracks {', '.join(SUPPORTED_METRICS)}; got {list(self.metrics)}")
+        if not 0.0 <= self.tolerance < 1.0:
+            raise ValueError("tolerance must be in [0, 1)")
+
+    def is_settled(self, outcomes: Sequence[bool]) -> bool:
+        """Whether further runs cannot change any tracked metric of a task."""
+        if not outcomes:
+            return False
+        settled = {"pass@k": any(outcomes), "pass^k": not all(outcomes)}
+        return all(settled[metric] for metric in self.metrics)
+
+    def flip_probability(self, outcomes: Sequence[bool], run: int) -> float:
+        """Chance that runs ``run .. k`` change the outcome of a task (Laplace's rule).
+
+        Unsettled tasks have had one outcome only, ``n`` times. The chance that
+        the next ``r`` runs all repeat it is ``(n + 1) / (n + 1 + r)``.
+        """
+        remaining = self.k - run + 1
+        if remaining <= 0:
+            return 0.0
+        return remaining / (len(outcomes) + 1 + remaining)
+
+    def plan(
+        self,
+        run: int,
+        histories: Dict[str, List[bool]],
+        skipped_before: Dict[str, str],
+    ) -> Dict[str, Tuple[str, float]]:
+        """Tasks to skip in run *run*.
+
+        Args:
+            run: 1-based index of the run about to start
+            histories: Outcomes of the executed earlier runs, per task; every task of the
+                sweep, including those already done in this run, as the budget is a share of them
+            skipped_before: Tasks skipped in an earlier run -> reason
+
+        Returns:
+            Task -> (reason, flip probability)
+        """
+        if run <= 1 or run > self.k:
+            return {}
+
+        skip: Dict[str, Tuple[str, float]] = {}
+        candidates = []
+        for task, outcomes in histories.items():
+            if self.is_settled(outcomes):
+                skip[task] = (REASON_SETTLED, 0.0)
+            elif skipped_before.get(task) == REASON_TOLERANCE:
+                # Already spent from the budget; stays skipped for the rest of the sweep
+                skip[task] = (REASON_TOLERANCE, self.flip_probability(outcomes, run))
+            elif outcomes:
+                candidates.append((self.flip_probability(outcomes, run), task))
+
+        budget = math.floor(self.tolerance * len(histories) + 1e-9)
+        budget -= sum(1 for reason in skipped_before.values() if reason == REASON_TOLERANCE)
+        for probability, task in sorted(candidates)[: max(budget, 0)]:
+            skip[task] = (REASON_TOLERANCE, probability)
+        return skip
+
+    def stub_meta(self, last_meta: Dict, run: int, reason: str, probability: float) -> Dict:
+        """``meta.json`` of a skipped run, repeating the task's last executed outcome."""
+        execution_result = last_meta.get("execution_result", {}) or {}
+        return {
+            "task_name": last_meta.get("task_name"),
+            "model_name": last_meta.get("model_name"),
+            "litellm_run_model_name": last_meta.get("litellm_run_model_name"),
+            "early_stopped": {
+                "run": run,
+                "reason": reason,
+                "flip_probability": round(probability, 4),
+                "tracked_metrics": list(self.metrics),
+            },
+            "execution_result": {
+                "success": bool(execution_result.get("success", False)),
+                "error_message": None,
+                "verification_error": None,
+                "verification_output": None,
+            },
+            "token_usage": {},
+            "turn_count": 0,
+            "agent_execution_time": 0.0,
+            "task_execution_time": 0.0,
+        }
@@ -0,0 +1,10 @@
+"""
+Environments
+============
+
+Hosting of evaluation environments outside the evaluator (e.g. for RL rollouts).
+"""
+
+from .vector_server import Environment, VectorServer
+
+__all__ = ["Environment", "VectorServer"]
@@ -0,0 +1,406 @@
+"""
+Environment Service
+===================
+
+HTTP / WebSocket front end for a :class:`VectorServer`, so trainers on other
+machines can drive environments without paying the Node / Playwright start-up
+and credential set-up themselves. A client session is bound to one task and
+leases one of the pooled environments (and its already running MCP server and
+Notion clients) until it is closed or idles out.
+
+HTTP (JSON bodies and responses)::
+
+    GET    /health                      pool and session counters
+    GET    /tasks                       task ids accepted by POST /sessions
+    POST   /sessions {"task_id"}        -> {"session_id", "instruction", "tools"}
+    POST   /sessions/{id}/call {"name", "arguments"} -> {"content", "is_error"}
+    POST   /sessions/{id}/verify        -> {"success", "output", "error"}
+    DELETE /sessions/{id}
+
+WebSocket ``/ws``: messages ``{"id", "op": "create"|"call"|"verify"|"close", ...}``
+with the same fields, answered by ``{"id", "ok", "result"|"error"}``. Sessions
+created on a connection are closed when it disconnects.
+
+Backpressure: when every environment is leased, session creation waits up to
+``acquire_timeout`` seconds and at most ``max_pending`` creations wait at a time;
+beyond that the service answers 503. When ``MCPMARK_SERVICE_TOKEN`` is set,
+requests must carry ``Authorization: Bearer <token>``.
+
+Usage::
+
+    python -m src.environments.service --envs 16 --port 8765
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from src.logger import get_logger
+from .vector_server import VectorServer
+
+logger = get_logger(__name__)
+
+TOKEN_ENV = "MCPMARK_SERVICE_TOKEN"
+
+
+class SessionError(Exception):
+    """Request failure with the HTTP status to report."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Session:
+    """A client's lease of one environment for one task."""
+
+    session_id: str
+    env_id: int
+    task_id: str
+    created_at: float = field(default_factory=time.monotonic)
+    last_active: float = field(default_factory=time.monotonic)
+    # Calls of one session run one at a time; sessions run concurrently
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Set under the lock on close; calls that were waiting for the lock must not
+    # touch the environment, which may already be leased to another session
+    closed: bool = False
+
+    def touch(self) -> None:
+        self.last_active = time.monotonic()
+
+
+class EnvironmentService:
+    """Leases pooled environments of a :class:`VectorServer` to client sessions."""
+
+    def __init__(
+        self,
+        server: VectorServer,
+        idle_timeout: float = 600.0,
+        acquire_timeout: float = 30.0,
+        call_timeout: float = 180.0,
+        max_pending: int = 64,
+    ):
+        """
+        Args:
+            server: Pool of environments to lease
+            idle_timeout: Close sessions without a request for this many seconds
+            acquire_timeout: Longest wait for a free environment when creating a session
+            call_timeout: Longest tool call or verification
+            max_pending: Session creations allowed to wait for an environment at once
+        """
+        self.server = server
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.call_timeout = call_timeout
+        self.max_pending = max_pending
+        self.sessions: Dict[str, Session] = {}
+        self._free: Optional[asyncio.Queue] = None
+        self._pending = 0
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._free = asyncio.Queue()
+        for env in self.server.envs:
+            self._free.put_nowait(env.env_id)
+        self._reaper = asyncio.create_task(self._reap_idle_sessions())
+
+    async def stop(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for session_id in list(self.sessions):
+            await self.close_session(session_id)
+        await self.server.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "envs": len(self.server.envs),
+            "free_envs": self._free.qsize() if self._free else 0,
+            "sessions": len(self.sessions),
+            "pending": self._pending,
+        }
+
+    # ------------------------------------------------------------------
+    # Session operations
+    # ------------------------------------------------------------------
+
+    async def create_session(self, task_id: str) -> Dict[str, Any]:
+        if task_id not in self.server.tasks:
+            raise SessionError(404, f"Unknown task id: {task_id}")
+        if self._pending >= self.max_pending:
+            raise SessionError(503, "Too many sessions waiting for an environment")
+
+        self._pending += 1
+        try:
+            env_id = await asyncio.wait_for(self._free.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise SessionError(503, "No environment became free in time")
+        finally:
+            self._pending -= 1
+
+        try:
+            observation = (await self.server.reset([task_id], [env_id]))[0]
+        except BaseException:
+            self._free.put_nowait(env_id)
+            raise
+        if "error" in observation:
+            self._free.put_nowait(env_id)
+            raise SessionError(502, f"Environment set-up failed: {observation['error']}")
+
+        session = Session(session_id=uuid.uuid4().hex, env_id=env_id, task_id=task_id)
+        self.sessions[session.session_id] = session
+        logger.info(f"| Session {session.session_id[:8]} started {task_id} on env {env_id}")
+        return {
+            "session_id": session.session_id,
+            "task_id": task_id,
+            "instruction": observation["instruction"],
+            "tools": observation["tools"],
+        }
+
+    async def call_tool(self, session_id: str, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._get_session(session_id)
+        async with session.lock:
+            self._check_open(session)
+            session.touch()
+            result = await self._with_timeout(
+                self.server.step([session.env_id], [(name, arguments or {})]), "Tool call"
+            )
+            session.touch()
+        return {"content": result[0]["content"], "is_error": result[0]["is_error"]}
+
+    async def verify(self, session_id: str) -> Dict[str, Any]:
+        session = self._get_session(session_id)
+        async with session.lock:
+            self._check_open(session)
+            session.touch()
+            result = await self._with_timeout(self.server.score([session.env_id]), "Verification")
+            session.touch()
+        return {"success": result[0]["success"], "output": result[0]["output"], "error": result[0]["error"]}
+
+    async def close_session(self, session_id: str) -> None:
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            raise SessionError(404, f"Unknown session: {session_id}")
+        async with session.lock:
+            session.closed = True
+            try:
+                await self.server.release([session.env_id])
+            finally:
+                self._free.put_nowait(session.env_id)
+        logger.info(f"| Session {session_id[:8]} closed (env {session.env_id})")
+
+    def _get_session(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise SessionError(404, f"Unknown session: {session_id}")
+        return session
+
+    @staticmethod
+    def _check_open(session: Session) -> None:
+        if session.closed:
+            raise SessionError(404, f"Unknown session: {session.session_id}")
+
+    async def _with_timeout(self, coroutine, what: str) -> List[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(coroutine, timeout=self.call_timeout)
+        except asyncio.TimeoutError:
+            raise SessionError(504, f"{what} timed out after {self.call_timeout:.0f}s")
+
+    async def _reap_idle_sessions(self) -> None:
+        interval = max(1.0, min(30.0, self.idle_timeout / 4))
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for session in list(self.sessions.values()):
+                if now - session.last_active > self.idle_timeout and not session.lock.locked():
+                    logger.info(f"| Session {session.session_id[:8]} idle; closing")
+                    try:
+                        await self.close_session(session.session_id)
+                    except SessionError:
+                        pass  # closed concurrently
+                    except Exception as e:
+                        logger.warning(f"| Failed to close idle session {session.session_id[:8]}: {e}")
+
+
+# ----------------------------------------------------------------------
+# HTTP / WebSocket application
+# ----------------------------------------------------------------------
+
+
+def _error(status: int, message: str) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status)
+
+
+def create_app(service: EnvironmentService, token: Optional[str] = None) -> Starlette:
+    """Starlette application serving *service*; *token* enables bearer authentication."""
+
+    def _authorized(headers) -> bool:
+        return not token or headers.get("authorization") == f"Bearer {token}"
+
+    def _endpoint(handler):
+        async def _wrapped(request: Request) -> JSONResponse:
+            if not _authorized(request.headers):
+                return _error(401, "Unauthorized")
+            try:
+                return JSONResponse(await handler(request))
+            except SessionError as e:
+                return _error(e.status, str(e))
+            except KeyError as e:
+                return _error(400, f"Missing field {e}")
+            except ValueError as e:
+                return _error(400, f"Invalid request: {e}")
+
+        return _wrapped
+
+    async def health(request: Request) -> Dict[str, Any]:
+        return service.stats()
+
+    async def tasks(request: Request) -> Dict[str, Any]:
+        return {"tasks": service.server.task_ids}
+
+    async def create(request: Request) -> Dict[str, Any]:
+        body = await request.json()
+        return await service.create_session(body["task_id"])
+
+    async def call(request: Request) -> Dict[str, Any]:
+        body = await request.json()
+        return await service.call_tool(
+            request.path_params["session_id"], body["name"], body.get("arguments") or {}
+        )
+
+    async def verify(request: Request) -> Dict[str, Any]:
+        return await service.verify(request.path_params["session_id"])
+
+    async def close(request: Request) -> Dict[str, Any]:
+        await service.close_session(request.path_params["session_id"])
+        return {"closed": True}
+
+    async def websocket(ws: WebSocket) -> None:
+        if not _authorized(ws.headers):
+            await ws.close(code=4401)
+            return
+        await ws.accept()
+        owned: Set[str] = set()
+        in_flight: Set[asyncio.Task] = set()
+
+        async def _handle(message: Any) -> None:
+            reply: Dict[str, Any] = {"id": message.get("id") if isinstance(message, dict) else None}
+            try:
+                if not isinstance(message, dict):
+                    raise SessionError(400, "Message must be a JSON object")
+                op = message.get("op")
+                if op == "create":
+                    result = await service.create_session(message["task_id"])
+                    owned.add(result["session_id"])
+                elif op == "call":
+                    result = await service.call_tool(
+                        message["session_id"], message["name"], message.get("arguments") or {}
+                    )
+                elif op == "verify":
+                    result = await service.verify(message["session_id"])
+                elif op == "close":
+                    await service.close_session(message["session_id"])
+                    owned.discard(message["session_id"])
+                    result = {"closed": True}
+                else:
+                    raise SessionError(400, f"Unknown op: {op}")
+                reply.update(ok=True, result=result)
+            except SessionError as e:
+                reply.update(ok=False, error=str(e), status=e.status)
+            except KeyError as e:
+                reply.update(ok=False, error=f"Missing field {e}", status=400)
+            except ValueError as e:
+                reply.update(ok=False, error=f"Invalid request: {e}", status=400)
+            except Exception as e:
+                # Every request gets a reply; the client would otherwise wait forever
+                logger.warning(f"| WebSocket request failed: {e}")
+                reply.update(ok=False, error=f"Internal error: {e}", status=500)
+            await ws.send_json(reply)
+
+        try:
+            while True:
+                message = await ws.receive_json()
+                # Requests of one connection run concurrently; each session serializes its own
+                task = asyncio.create_task(_handle(message))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in list(in_flight):
+                task.cancel()
+            for session_id in owned:
+                if session_id in service.sessions:
+                    await service.close_session(session_id)
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        await service.start()
+        try:
+            yield
+        finally:
+            await service.stop()
+
+    return Starlette(
+        routes=[
+            Route("/health", _endpoint(health), methods=["GET"]),
+            Route("/tasks", _endpoint(tasks), methods=["GET"]),
+            Route("/sessions", _endpoint(create), methods=["POST"]),
+            Route("/sessions/{session_id}/call", _endpoint(call), methods=["POST"]),
+            Route("/sessions/{session_id}/verify", _endpoint(verify), methods=["POST"]),
+            Route("/sessions/{session_id}", _endpoint(close), methods=["DELETE"]),
+            WebSocketRoute("/ws", websocket),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve pooled MCPMark environments over HTTP / WebSocket")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--envs", type=int, default=8, help="Pooled environments (default: 8)")
+    parser.add_argument(
+        "--idle-timeout", type=float, default=600.0, help="Close idle sessions after N seconds (default: 600)"
+    )
+    parser.add_argument(
+        "--acquire-timeout",
+        type=float,
+        default=30.0,
+        help="Longest wait for a free environment (default: 30)",
+    )
+    parser.add_argument(
+        "--call-timeout", type=float, default=180.0, help="Longest tool call / verification (default: 180)"
+    )
+    args = parser.parse_args()
+
+    import uvicorn
+
+    token = os.environ.get(TOKEN_ENV)
+    if args.host not in ("127.0.0.1", "localhost") and not token:
+        print(f"⚠️  Serving on {args.host} without {TOKEN_ENV}; anyone who can connect can use the environments")
+
+    service = EnvironmentService(
+        VectorServer(num_envs=args.envs),
+        idle_timeout=args.idle_timeout,
+        acquire_timeout=args.acquire_timeout,
+        call_timeout=args.call_timeout,
+    )
+    uvicorn.run(create_app(service, token), host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
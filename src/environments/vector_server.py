@@ -0,0 +1,297 @@
+"""
+Vectorized Environment Server
+=============================
+
+Batched counterpart of ``main.Server`` for RL rollouts: one process hosts
+``num_envs`` independent Notion environments. Each environment has its own
+state manager (round-robin over the configured shards, sharing each shard's
+integration and rate limiter), its own copy of the task with its own
+duplicated initial state, and its own MCP session.
+
+    async with VectorServer(num_envs=64) as server:
+        observations = await server.reset(task_ids)           # one task per env
+        results = await server.step(env_ids, tool_calls)       # one call per env
+        scores = await server.score(env_ids)
+
+Every batched call runs its environments concurrently and reports failures
+per environment (``"error"``) instead of failing the whole batch. The MCP
+session of an environment stays open across resets (the Notion MCP server
+holds no task state), so only the first reset pays the server start-up.
+With ``MCPMARK_NOTION_MCP_BACKEND=python`` the sessions run in-process
+instead of one Node subprocess per environment.
+"""
+
+import asyncio
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+from src.base.state_manager import BaseStateManager
+from src.base.task_manager import BaseTask
+from src.factory import MCPServiceFactory
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+ToolCall = Tuple[str, Dict[str, Any]]
+
+
+@dataclass
+class Environment:
+    """One rollout slot: a state manager, the task it runs and its MCP session."""
+
+    env_id: int
+    state_manager: BaseStateManager
+    task: Optional[BaseTask] = None
+    mcp_server: Any = None
+    steps: int = 0
+    tools: List[Dict[str, Any]] = field(default_factory=list)
+    # The MCP client's task groups must be entered and exited by the same
+    # asyncio task, so each session lives in a task of its own
+    session_task: Optional["asyncio.Task"] = None
+    session_stop: Optional[asyncio.Event] = None
+
+
+def _create_notion_mcp_server(notion_key: str, timeout: int):
+    """Notion MCP server configured like the agent's (see MCPMarkAgent._create_mcp_server)."""
+    from src.agents.mcp import MCPInProcessServer, MCPStdioServer
+    from src.mcp_services.notion.mcp_server import NotionMCPServer, notion_mcp_backend
+
+    if notion_mcp_backend() == "python":
+        # In-process sessions of all environments share one pooled Notion client per key
+        notion = NotionMCPServer(notion_key)
+        return MCPInProcessServer(notion.server, context=notion, timeout=timeout)
+
+    return MCPStdioServer(
+        command="npx",
+        args=["-y", "@notionhq/notion-mcp-server"],
+        env={
+            "OPENAPI_MCP_HEADERS": (
+                '{"Authorization": "Bearer ' + notion_key + '", '
+                '"Notion-Version": "2022-06-28"}'
+            )
+        },
+        timeout=timeout,
+    )
+
+
+def _result_text(result: Dict[str, Any]) -> str:
+    """Concatenated text content of an MCP ``call_tool`` result."""
+    return "\n".join(
+        item.get("text", "") for item in result.get("content") or [] if item.get("type") == "text"
+    )
+
+
+class VectorServer:
+    """N independent Notion environments with batched ``reset`` / ``step`` / ``score``."""
+
+    def __init__(self, num_envs: int, mcp_service: str = "notion", tool_timeout: int = 120):
+        """
+        Args:
+            num_envs: Number of environments hosted by this process
+            mcp_service: MCP service of the environments (only "notion" is supported)
+            tool_timeout: Timeout in seconds of MCP initialization and tool calls
+        """
+        if mcp_service != "notion":
+            raise ValueError(f"VectorServer supports the notion service only, got '{mcp_service}'")
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1")
+        load_dotenv(dotenv_path=".mcp_env", override=False)
+
+        self.mcp_service = mcp_service
+        self.tool_timeout = tool_timeout
+        self.task_manager = MCPServiceFactory.create_task_manager(mcp_service)
+        self.tasks: Dict[str, BaseTask] = {
+            task.name: task for task in self.task_manager.discover_all_tasks()
+        }
+        # Environments share eval hubs, so a set-up must not archive its neighbours' pages
+        state_managers = MCPServiceFactory.create_environment_state_managers(
+            mcp_service, num_envs, cleanup_orphans=False
+        )
+        self.envs = [Environment(index, manager) for index, manager in enumerate(state_managers)]
+        logger.info(f"VectorServer hosting {num_envs} {mcp_service} environments")
+
+    @property
+    def task_ids(self) -> List[str]:
+        """Names (``category__task``) accepted by :meth:`reset`."""
+        return list(self.tasks)
+
+    # ------------------------------------------------------------------
+    # Batched API
+    # ------------------------------------------------------------------
+
+    async def reset(
+        self, task_ids: Sequence[str], env_ids: Optional[Sequence[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Start environments *env_ids* (default: the first ``len(task_ids)``) on *task_ids*.
+
+        An environment that already runs a task is cleaned up first; its MCP
+        session is reused.
+
+        Returns:
+            Per environment: ``env_id``, ``task_id``, ``instruction``, ``tools`` or ``error``
+        """
+        env_ids = list(range(len(task_ids))) if env_ids is None else list(env_ids)
+        if len(env_ids) != len(task_ids):
+            raise ValueError("reset needs one task id per environment")
+        unknown = [task_id for task_id in task_ids if task_id not in self.tasks]
+        if unknown:
+            raise KeyError(f"Unknown task ids: {', '.join(unknown)}")
+
+        return await asyncio.gather(
+            *(
+                self._reset_env(self.envs[env_id], task_id)
+                for env_id, task_id in zip(env_ids, task_ids)
+            )
+        )
+
+    async def step(
+        self, env_ids: Sequence[int], tool_calls: Sequence[ToolCall]
+    ) -> List[Dict[str, Any]]:
+        """Run one ``(tool_name, arguments)`` call in each of *env_ids*.
+
+        Returns:
+            Per environment: ``env_id``, ``content`` (tool result text), ``is_error``
+        """
+        if len(env_ids) != len(tool_calls):
+            raise ValueError("step needs one tool call per environment")
+        return await asyncio.gather(
+            *(
+                self._step_env(self.envs[env_id], name, arguments)
+                for env_id, (name, arguments) in zip(env_ids, tool_calls)
+            )
+        )
+
+    async def score(self, env_ids: Sequence[int]) -> List[Dict[str, Any]]:
+        """Run the task verification of each of *env_ids* against its current state.
+
+        Returns:
+            Per environment: ``env_id``, ``success``, ``output`` and ``error``
+        """
+        return await asyncio.gather(*(self._score_env(self.envs[env_id]) for env_id in env_ids))
+
+    async def release(self, env_ids: Sequence[int]) -> None:
+        """Clean up the tasks of *env_ids*, keeping their MCP sessions for the next reset.
+
+        Clean-up failures are logged per environment; the environments are free either way.
+        """
+        results = await asyncio.gather(
+            *(self._release_task(self.envs[env_id]) for env_id in env_ids), return_exceptions=True
+        )
+        for env_id, result in zip(env_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"| [env {env_id}] Clean-up failed: {result}")
+
+    async def close(self, env_ids: Optional[Sequence[int]] = None) -> None:
+        """Clean up the tasks and MCP sessions of *env_ids* (default: all)."""
+        envs = self.envs if env_ids is None else [self.envs[env_id] for env_id in env_ids]
+        await asyncio.gather(*(self._close_env(env) for env in envs))
+
+    async def __aenter__(self) -> "VectorServer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # Per-environment operations
+    # ------------------------------------------------------------------
+
+    async def _reset_env(self, env: Environment, task_id: str) -> Dict[str, Any]:
+        # Set-up stores the duplicated state on the task, so every environment needs its own copy
+        task = copy.copy(self.tasks[task_id])
+        try:
+            await self._release_task(env)
+            if env.session_task is not None and env.session_task.done():
+                await self._close_env(env)  # the MCP server exited; start a new one
+            if not await asyncio.to_thread(env.state_manager.set_up, task):
+                return {"env_id": env.env_id, "task_id": task_id, "error": "State Duplication Error"}
+            env.task = task
+
+            if env.mcp_server is None:
+                config = env.state_manager.get_service_config_for_agent()
+                await self._open_session(
+                    env, _create_notion_mcp_server(config["notion_key"], self.tool_timeout)
+                )
+                env.tools = await env.mcp_server.list_tools()
+        except Exception as e:
+            logger.error(f"| ✗ [env {env.env_id}] Reset to {task_id} failed: {e}")
+            await self._close_env(env)
+            return {"env_id": env.env_id, "task_id": task_id, "error": str(e)}
+
+        return {
+            "env_id": env.env_id,
+            "task_id": task_id,
+            "instruction": self.task_manager.get_task_instruction(task),
+            "tools": env.tools,
+        }
+
+    async def _step_env(self, env: Environment, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        if env.mcp_server is None:
+            return {"env_id": env.env_id, "content": "Error: environment is not reset", "is_error": True}
+        env.steps += 1
+        try:
+            result = await env.mcp_server.call_tool(name, arguments or {})
+        except Exception as e:
+            return {"env_id": env.env_id, "content": f"Error: {e}", "is_error": True}
+        return {
+            "env_id": env.env_id,
+            "content": _result_text(result),
+            "is_error": bool(result.get("isError")),
+        }
+
+    async def _score_env(self, env: Environment) -> Dict[str, Any]:
+        if env.task is None:
+            return {"env_id": env.env_id, "success": False, "output": None, "error": "environment is not reset"}
+        try:
+            env_vars = env.state_manager.get_verification_environment()
+            completed = await asyncio.to_thread(self.task_manager.run_verification, env.task, env_vars)
+        except Exception as e:
+            return {"env_id": env.env_id, "success": False, "output": None, "error": str(e)}
+        success = completed.returncode == 0
+        return {
+            "env_id": env.env_id,
+            "success": success,
+            "output": completed.stdout,
+            "error": None if success else (completed.stderr or "Verification failed with no error message"),
+        }
+
+    async def _open_session(self, env: Environment, mcp_server: Any) -> None:
+        """Start *mcp_server* in a dedicated task that keeps it open until the env is closed."""
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+
+        async def _hold_session() -> None:
+            try:
+                async with mcp_server:
+                    ready.set_result(None)
+                    await stop.wait()
+            except Exception as e:
+                if not ready.done():
+                    ready.set_exception(e)
+                else:
+                    logger.warning(f"| [env {env.env_id}] MCP session ended with error: {e}")
+
+        env.session_stop = stop
+        env.session_task = asyncio.create_task(_hold_session())
+        env.mcp_server = mcp_server
+        await ready
+
+    async def _close_env(self, env: Environment) -> None:
+        if env.session_task is not None:
+            env.session_stop.set()
+            await env.session_task
+            env.session_task = None
+            env.session_stop = None
+        env.mcp_server = None
+        env.tools = []
+        await self._release_task(env)
+
+    async def _release_task(self, env: Environment) -> None:
+        """Clean up the current task; the environment is free afterwards even if that fails."""
+        task, env.task = env.task, None
+        env.steps = 0
+        if task is not None:
+            await asyncio.to_thread(env.state_manager.clean_up, task)
@@ -1,22 +1,50 @@
+import asyncio
 import time
-import json
 import shutil
 
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
+from src.admission import get_admission_controller
+from src.early_stopping import REASON_SETTLED, REASON_TOLERANCE, EarlyStoppingPolicy, run_index
 from src.logger import get_logger
 from src.factory import MCPServiceFactory
 from src.model_config import ModelConfig
-from src.results_reporter import EvaluationReport, ResultsReporter, TaskResult
+from src.mcp_services.notion.mcp_server import notion_mcp_backend_label
+from src.results_reporter import EvaluationReport, ResultsReporter, TaskResult, TaskResultRecord
+from src.results_store import ResultsStore
+from src.scheduling import TaskDurationEstimator, schedule_longest_first
+from src.tracing import Tracer, trace_span, use_tracer
 from src.errors import is_retryable_error
 from src.agents import MCPMarkAgent
+from src.agents.utils import (
+    CHECKPOINT_FILENAME,
+    AgentCheckpoint,
+    load_tool_profiles,
+    minification_enabled,
+    minifier_settings,
+)
+from src.base.state_manager import BaseStateManager
 
 # Initialize logger
 logger = get_logger(__name__)
 
 
+@dataclass
+class EvaluationShard:
+    """A state manager and agent bound to the same service credentials.
+
+    The MCP server, state manager and verifier of a task all use the shard
+    the task was scheduled on.
+    """
+
+    index: int
+    state_manager: BaseStateManager
+    agent: MCPMarkAgent
+
+
 class MCPEvaluator:
     def __init__(
         self,
@@ -26,10 +54,20 @@ class MCPEvaluator:
         exp_name: str = "test-run",
         output_dir: Path = None,
         reasoning_effort: str = "default",
+        resume_from_checkpoints: bool = False,
+        early_stopping: Optional[EarlyStoppingPolicy] = None,
     ):
         # Main configuration
         self.mcp_service = mcp_service
         self.timeout = timeout
+        # Continue interrupted agent runs from their last per-turn checkpoint
+        # instead of re-running them from scratch
+        self.resume_from_checkpoints = resume_from_checkpoints
+        # Skip runs of a run-N sweep that cannot change pass@k / pass^k (see src.early_stopping)
+        self.early_stopping = early_stopping
+        if early_stopping is not None and run_index(exp_name) is None:
+            logger.warning("Early stopping needs a run-N experiment name, got '%s'; disabled", exp_name)
+            self.early_stopping = None
         
         # Initialize model configuration
         self.reasoning_effort = reasoning_effort
@@ -39,32 +77,45 @@ class MCPEvaluator:
         self.api_key = model_config.api_key
         self.base_url = model_config.base_url
         self.litellm_input_model_name = model_config.litellm_input_model_name
+
+        # All shards (and other evaluators in this process) on the same provider
+        # account share one request / token budget
+        self.admission = get_admission_controller(
+            model_config.provider, model_config.base_url, rpm=model_config.rpm, tpm=model_config.tpm
+        )
         
         # Track the actual model name from LiteLLM responses
         self.litellm_run_model_name = None
 
-        # Initialize managers using the factory pattern (simplified)
+        # MCP server implementation and tool surface, recorded with every result
+        # (the Notion backends list different schemas; see notion mcp_server)
+        self.mcp_backend = notion_mcp_backend_label() if mcp_service == "notion" else None
+        # Minified tool schemas change what the model sees; record the settings
+        self.tool_schema_minifier = minifier_settings() if minification_enabled() else None
+
+        # Optional per-category tool subsets ($MCPMARK_TOOL_PROFILES), keyed like the results dirs
+        profile_service = "playwright" if mcp_service == "playwright_webarena" else mcp_service
+        self.tool_profiles = load_tool_profiles().get(profile_service, {})
+
+        # Initialize managers using the factory pattern (simplified). Services
+        # configured with several shards get one state manager per shard.
         self.task_manager = MCPServiceFactory.create_task_manager(mcp_service)
-        self.state_manager = MCPServiceFactory.create_state_manager(mcp_service)
+        self.shards = [
+            EvaluationShard(index, state_manager, self._create_agent(state_manager))
+            for index, state_manager in enumerate(
+                MCPServiceFactory.create_shard_state_managers(mcp_service)
+            )
+        ]
+        if len(self.shards) > 1:
+            logger.info("Sharding evaluation across %d %s shards", len(self.shards), mcp_service)
+
+        # The first shard doubles as the default (unsharded) state manager and agent
+        self.state_manager = self.shards[0].state_manager
+        self.agent = self.shards[0].agent
 
         # Obtain static service configuration from state manager (e.g., notion_key)
         self.service_config = self.state_manager.get_service_config_for_agent()
 
-        # Initialize agent for LLM and MCP server management. The agent will
-        # automatically refresh its service configuration from the state
-        # manager before each execution, so per-task manual updates are no
-        # longer needed.
-        self.agent = MCPMarkAgent(
-            litellm_input_model_name=self.litellm_input_model_name,  # Use the original model name for detection
-            api_key=self.api_key,
-            base_url=self.base_url,
-            mcp_service=mcp_service,
-            timeout=timeout,
-            service_config=self.service_config,
-            service_config_provider=self.state_manager.get_service_config_for_agent,
-            reasoning_effort=self.reasoning_effort,
-        )
-
         # Initialize results reporter
         self.results_reporter = ResultsReporter()
 
@@ -78,6 +129,36 @@ class MCPEvaluator:
         self.base_experiment_dir = output_dir / f"{model_slug}__{service_for_dir}" / exp_name
         self.base_experiment_dir.mkdir(parents=True, exist_ok=True)
 
+        # Indexed results store shared by all models/services of the experiment.
+        # Rows are keyed like the directory layout: <exp>/<model>__<service>/<run>.
+        self.results_store = ResultsStore.for_experiment(output_dir)
+        self._store_key = (output_dir.name, model_slug, service_for_dir, exp_name)
+        self._import_existing_results()
+
+        # Spans of every stage, LLM request and tool call of this run
+        self.trace_path = self.base_experiment_dir / "trace.jsonl"
+
+    def _create_agent(self, state_manager: BaseStateManager) -> MCPMarkAgent:
+        """Create an agent bound to *state_manager*'s credentials and rate limit.
+
+        The agent automatically refreshes its service configuration from the
+        state manager before each execution, so per-task manual updates are
+        not needed.
+        """
+        return MCPMarkAgent(
+            litellm_input_model_name=self.litellm_input_model_name,  # Use the original model name for detection
+            api_key=self.api_key,
+            base_url=self.base_url,
+            mcp_service=self.mcp_service,
+            timeout=self.timeout,
+            service_config=state_manager.get_service_config_for_agent(),
+            service_config_provider=state_manager.get_service_config_for_agent,
+            reasoning_effort=self.reasoning_effort,
+            rate_limiter=state_manager.rate_limiter,
+            admission=self.admission,
+            tool_profiles=self.tool_profiles,
+        )
+
     def _format_duration(self, seconds: float) -> str:
         """Format duration: <1s as ms, otherwise seconds."""
         return f"{(seconds * 1000):.2f}ms" if seconds < 1 else f"{seconds:.2f}s"
@@ -94,81 +175,184 @@ class MCPEvaluator:
     # Resuming helpers
     # ------------------------------------------------------------------
 
-    def _load_latest_task_result(self, task) -> Optional[TaskResult]:
-        """Return the most recent TaskResult for *task* if it has been run before."""
-        task_dir = self._get_task_output_dir(task)
-        if not task_dir.exists():
-            return None
+    def _task_result_from_meta(self, meta_data: dict, category_id, task_id) -> TaskResultRecord:
+        """Handle of a result saved as meta.json content; the trajectory stays on disk."""
+        task_dir = self.base_experiment_dir / f"{category_id}__{task_id}"
+        return TaskResultRecord.from_meta(meta_data, task_dir, category_id, task_id)
+
+    def _import_existing_results(self) -> None:
+        """One-shot import of results written before the store existed."""
+        if self.results_store.count(*self._store_key):
+            return
+        if not any(self.base_experiment_dir.iterdir()):
+            return
+        exp, model, service, _ = self._store_key
+        imported, skipped = self.results_store.import_run_dir(
+            exp, model, service, self.base_experiment_dir
+        )
+        if imported or skipped:
+            logger.info(
+                "Indexed %d existing results from %s (%d unreadable)",
+                imported,
+                self.base_experiment_dir,
+                len(skipped),
+            )
 
-        meta_path = task_dir / "meta.json"
-        if not meta_path.exists():
+    def _load_checkpoint(self, task) -> Optional[AgentCheckpoint]:
+        """Return the last per-turn checkpoint of an interrupted run of *task*, if resumable."""
+        if not self.resume_from_checkpoints:
             return None
+        task_output_dir = self._get_task_output_dir(task)
+        checkpoint = AgentCheckpoint.load(
+            task_output_dir / CHECKPOINT_FILENAME, task_output_dir / "trajectory.jsonl"
+        )
+        if checkpoint is None or not checkpoint.service_state:
+            return None
+        return checkpoint
 
+    def _clear_task_output(self, task) -> None:
+        """Remove a previous run's artifacts, keeping what a checkpoint resume needs."""
+        task_output_dir = self._get_task_output_dir(task)
+        if not task_output_dir.exists():
+            return
+        if self._load_checkpoint(task) is None:
+            shutil.rmtree(task_output_dir)
+            return
+        for name in ("meta.json", "messages.json"):
+            (task_output_dir / name).unlink(missing_ok=True)
+
+    def _load_latest_task_result(self, task) -> Optional[TaskResultRecord]:
+        """Return the most recent result of *task* if it has been run before."""
+        task_dir_name = self._get_task_output_dir(task).name
         try:
-            with meta_path.open("r", encoding="utf-8") as f:
-                meta_data = json.load(f)
-
-            return TaskResult(
-                task_name=meta_data["task_name"],
-                success=meta_data["execution_result"]["success"],
-                error_message=meta_data["execution_result"].get("error_message"),
-                verification_error=meta_data["execution_result"].get("verification_error"),
-                verification_output=meta_data["execution_result"].get("verification_output"),
-                category_id=task.category_id,
-                task_id=task.task_id,
-                model_output=None,
-                token_usage=meta_data.get("token_usage", {}),
-                turn_count=meta_data.get("turn_count"),
-                agent_execution_time=meta_data.get("agent_execution_time", 0.0),
-                task_execution_time=meta_data.get("task_execution_time", 0.0),
-            )
+            meta_data = self.results_store.get_meta(*self._store_key, task_dir_name)
+            if meta_data is None:
+                return None
+            return self._task_result_from_meta(meta_data, task.category_id, task.task_id)
         except Exception as exc:
             logger.warning("Failed to load existing result for %s: %s", task.name, exc)
         return None
 
-    def _gather_all_task_results(self) -> List[TaskResult]:
-        """Scan *all* task sub-directories and collect the latest TaskResult from each."""
-        results: list[TaskResult] = []
-        if not self.base_experiment_dir.exists():
-            return results
-
-        for task_dir in self.base_experiment_dir.iterdir():
-            if not task_dir.is_dir():
-                continue
-            meta_path = task_dir / "meta.json"
-            if not meta_path.exists():
-                continue
+    def _gather_all_task_results(self) -> List[TaskResultRecord]:
+        """Collect the latest result of every task of this run from the store."""
+        results: list[TaskResultRecord] = []
+        for task_dir_name, meta_data in self.results_store.get_run_metas(*self._store_key).items():
             try:
-                with meta_path.open("r", encoding="utf-8") as f:
-                    meta_data = json.load(f)
-
-                category_id, task_id = task_dir.name.split("__", 1)
-
-                result = TaskResult(
-                    task_name=meta_data["task_name"],
-                    success=meta_data["execution_result"]["success"],
-                    error_message=meta_data["execution_result"].get("error_message"),
-                    verification_error=meta_data["execution_result"].get("verification_error"),
-                    verification_output=meta_data["execution_result"].get("verification_output"),
-                    category_id=category_id,
-                    task_id=task_id,
-                    model_output=None,
-                    token_usage=meta_data.get("token_usage", {}),
-                    turn_count=meta_data.get("turn_count"),
-                    agent_execution_time=meta_data.get("agent_execution_time", 0.0),
-                    task_execution_time=meta_data.get("task_execution_time", 0.0),
-                )
-                results.append(result)
+                category_id, task_id = task_dir_name.split("__", 1)
+                results.append(self._task_result_from_meta(meta_data, category_id, task_id))
             except Exception as exc:
                 logger.warning(
-                    "Failed to parse existing report in %s: %s", task_dir, exc
+                    "Failed to parse existing report for %s: %s", task_dir_name, exc
                 )
         return results
 
-    def _run_single_task(self, task) -> TaskResult:
+    def _plan_early_stopping(self, tasks, pending_tasks) -> dict:
+        """Skip decisions of this run for *pending_tasks*, from the results of the earlier runs.
+
+        Args:
+            tasks: Every task of the sweep; the tolerance budget is a share of these
+            pending_tasks: Tasks of this run that have no result yet
+
+        Returns:
+            Task directory name -> (task, (reason, flip probability), last executed meta)
+        """
+        exp, model, service, run_name = self._store_key
+        run = run_index(run_name)
+        task_dirs = {self._get_task_output_dir(task).name: task for task in tasks}
+        pending_dirs = {self._get_task_output_dir(task).name for task in pending_tasks}
+        histories = {task_dir: [] for task_dir in task_dirs}
+        last_metas = {}
+        skipped_before = {}
+
+        # Tolerance skips already recorded in this run (before a resume) spend the budget too
+        for task_dir, meta in self.results_store.get_run_metas(*self._store_key).items():
+            if task_dir in histories and (meta.get("early_stopped") or {}).get("reason") == REASON_TOLERANCE:
+                skipped_before[task_dir] = REASON_TOLERANCE
+
+        for earlier in range(1, run):
+            earlier_name = f"run-{earlier}"
+            earlier_dir = self.base_experiment_dir.parent / earlier_name
+            if earlier_dir.exists() and not self.results_store.count(exp, model, service, earlier_name):
+                self.results_store.import_run_dir(exp, model, service, earlier_dir)
+            for task_dir, meta in self.results_store.get_run_metas(exp, model, service, earlier_name).items():
+                if task_dir not in histories:
+                    continue
+                if meta.get("early_stopped"):
+                    skipped_before[task_dir] = meta["early_stopped"].get("reason")
+                    continue
+                execution_result = meta.get("execution_result", {}) or {}
+                success = bool(execution_result.get("success", False))
+                if not success and is_retryable_error(execution_result.get("error_message")):
+                    continue  # pipeline error, not an outcome
+                histories[task_dir].append(success)
+                last_metas[task_dir] = meta
+
+        plan = self.early_stopping.plan(run, histories, skipped_before)
+        return {
+            task_dir: (task_dirs[task_dir], decision, last_metas[task_dir])
+            for task_dir, decision in plan.items()
+            if task_dir in pending_dirs and task_dir in last_metas
+        }
+
+    def _record_early_stop(self, task, decision, last_meta: dict) -> TaskResultRecord:
+        """Persist the stub result of a skipped run of *task*."""
+        reason, probability = decision
+        run = run_index(self._store_key[3])
+        meta_data = self.early_stopping.stub_meta(last_meta, run, reason, probability)
+        meta_data["task_name"] = task.name
+        task_result = self._task_result_from_meta(meta_data, task.category_id, task.task_id)
+        task_output_dir = self._get_task_output_dir(task)
+        now = datetime.now()
+        self.results_reporter.save_meta_json(
+            task_result, {}, now, now, task_output_dir / "meta.json", meta_data=meta_data
+        )
+        self.results_store.upsert(*self._store_key, task_output_dir.name, meta_data)
+        return task_result
+
+    def _schedule_tasks(self, tasks) -> tuple:
+        """Order *tasks* longest first by their durations in earlier experiments.
+
+        Returns:
+            Tuple of (tasks in execution order, predicted makespan in seconds or None
+            without history). With a single shard the order is kept.
+        """
+        _, model, service, _ = self._store_key
+        try:
+            # <results>/<exp>/<model>__<service>/<run>
+            estimator = TaskDurationEstimator.from_results(
+                self.base_experiment_dir.parents[2], service, model=model
+            )
+        except OSError as exc:
+            logger.warning("Could not read task duration history: %s", exc)
+            return tasks, None
+        if not estimator:
+            return tasks, None
+
+        key = lambda task: self._get_task_output_dir(task).name
+        estimates = estimator.estimate_all(key(task) for task in tasks)
+        ordered, makespan = schedule_longest_first(tasks, estimates, key, len(self.shards))
+        if len(self.shards) == 1:
+            ordered = tasks
+        else:
+            logger.info(
+                "Scheduling %d tasks longest-first on %d shards (longest: %s, ~%s)",
+                len(tasks), len(self.shards), ordered[0].name, self._format_duration(estimates[key(ordered[0])]),
+            )
+        return ordered, makespan
+
+    async def _run_single_task(self, task, shard: Optional[EvaluationShard] = None) -> TaskResult:
         """
         Runs a single task, including setup, agent execution, verification, and cleanup.
+
+        All stages use the state manager and agent of *shard* (default: first shard).
+        Blocking stages (setup, verification, cleanup) run in worker threads so
+        the shared event loop keeps serving other shards' agents.
         """
+        shard = shard or self.shards[0]
+        state_manager = shard.state_manager
+        if len(self.shards) > 1:
+            logger.info(f"\n[shard {shard.index}] Running task: {task.name}")
+
         # Track overall task start time
         task_start_time = time.time()
 
@@ -179,7 +363,17 @@ class MCPEvaluator:
         logger.info(
             "\n┌─ Stage 1: Setup ─────────────────────────────────────────────────────"
         )
-        setup_success = self.state_manager.set_up(task)
+        checkpoint = self._load_checkpoint(task)
+        with trace_span("setup") as span:
+            if checkpoint is not None and await asyncio.to_thread(
+                state_manager.resume, task, checkpoint.service_state
+            ):
+                setup_success = True
+                span.set_attribute("resumed_turn", checkpoint.turn_count)
+            else:
+                checkpoint = None
+                setup_success = await asyncio.to_thread(state_manager.set_up, task)
+            span.set_attribute("success", setup_success)
         setup_time = time.time() - setup_start_time
 
         if not setup_success:
@@ -195,6 +389,7 @@ class MCPEvaluator:
                 task_id=task.task_id,
                 agent_execution_time=0.0,
                 task_execution_time=task_total_time,
+                api_usage=state_manager.collect_api_usage(),
             )
         display_time = self._format_duration(setup_time)
         logger.info(f"└─ Completed in {display_time}\n")
@@ -215,15 +410,31 @@ class MCPEvaluator:
         task_output_dir = self._get_task_output_dir(task)
         task_output_dir.mkdir(parents=True, exist_ok=True)
         execution_log_path = task_output_dir / "execution.log"
+        trajectory_path = task_output_dir / "trajectory.jsonl"
 
-        # Remove existing execution.log to ensure clean start
-        if execution_log_path.exists():
+        # Remove existing execution.log to ensure clean start (a resumed run appends)
+        if execution_log_path.exists() and checkpoint is None:
             execution_log_path.unlink()
 
-        # Execute with agent
-        agent_result = self.agent.execute_sync(
-            task_instruction, str(execution_log_path)
-        )
+        # Execute with agent; messages are streamed to trajectory.jsonl and
+        # checkpointed after every complete turn
+        with trace_span("agent") as span:
+            agent_result = await shard.agent.execute(
+                task_instruction,
+                str(execution_log_path),
+                str(trajectory_path),
+                checkpoint_file=str(task_output_dir / CHECKPOINT_FILENAME),
+                checkpoint_state=state_manager.get_resume_state(task),
+                resume_from=checkpoint,
+                task_category=task.category_id,
+            )
+            span.set_attributes(
+                success=agent_result.get("success", False),
+                turns=agent_result.get("turn_count", 0),
+                **(agent_result.get("token_usage") or {}),
+            )
+            if agent_result.get("error"):
+                span.set_error(str(agent_result["error"]))
 
         agent_execution_time = time.time() - agent_execution_start_time
         
@@ -231,14 +442,16 @@ class MCPEvaluator:
         if agent_result.get("litellm_run_model_name"):
             self.litellm_run_model_name = agent_result["litellm_run_model_name"]
 
-        # Write messages.json to task_output_dir
+        # Write messages.json to task_output_dir (the only write of this file)
         messages_path = task_output_dir / "messages.json"
-        self.results_reporter.save_messages_json(
-            agent_result.get("output", []), messages_path
+        await asyncio.to_thread(
+            self.results_reporter.save_messages_json,
+            agent_result.get("output", []),
+            messages_path,
         )
 
-        # Set service-specific environment variables for verification scripts
-        self.state_manager.set_verification_environment(str(messages_path))
+        # Service-specific environment variables for verification scripts
+        verification_env = state_manager.get_verification_environment(str(messages_path))
         logger.info(f"└─ Completed in {self._format_duration(agent_execution_time)}\n")
 
         # ------------------------------------------------------------------
@@ -248,15 +461,11 @@ class MCPEvaluator:
             "┌─ Stage 3: Verify ────────────────────────────────────────────────────"
         )
         verify_start_time = time.time()
-        try:
-            result = self.task_manager.execute_task(task, agent_result)
-        finally:
-            # Clean up environment variables
-            import os
-
-            os.environ.pop("MCP_MESSAGES", None)
-            os.environ.pop("MCP_GITHUB_TOKEN", None)
-            
+        with trace_span("verify") as span:
+            result = await asyncio.to_thread(
+                self.task_manager.execute_task, task, agent_result, env=verification_env
+            )
+            span.set_attribute("success", result.success)
         verify_time = time.time() - verify_start_time
         logger.info(f"└─ Completed in {self._format_duration(verify_time)}\n")
 
@@ -267,7 +476,8 @@ class MCPEvaluator:
             "┌─ Stage 4: Cleanup ───────────────────────────────────────────────────"
         )
         cleanup_start_time = time.time()
-        self.state_manager.clean_up(task)
+        with trace_span("cleanup"):
+            await asyncio.to_thread(state_manager.clean_up, task)
         cleanup_time = time.time() - cleanup_start_time
         logger.info(f"└─ Completed in {self._format_duration(cleanup_time)}\n")
 
@@ -277,16 +487,127 @@ class MCPEvaluator:
         # Add timing information to the result
         result.agent_execution_time = agent_execution_time
         result.task_execution_time = task_total_time
+        result.tool_stats = agent_result.get("tool_stats")
+        result.api_usage = state_manager.collect_api_usage()
 
         return result
 
+    async def _execute_and_persist_task(self, task, shard: EvaluationShard) -> TaskResultRecord:
+        """Run *task* on *shard*, save its messages.json and meta.json, and return a handle to them."""
+        with trace_span("task", task=task.name, shard=shard.index) as span:
+            task_start = time.time()
+            task_result = await self._run_single_task(task, shard)
+            task_end = time.time()
+            span.set_attributes(success=task_result.success, error=task_result.error_message)
+
+            with trace_span("persist"):
+                await asyncio.to_thread(
+                    self._persist_task_result, task, task_result, task_start, task_end
+                )
+        # Keep only the compact handle; trajectory and verification output stay on disk
+        return TaskResultRecord.from_result(task_result, self._get_task_output_dir(task))
+
+    def _persist_task_result(
+        self, task, task_result: TaskResult, task_start: float, task_end: float
+    ) -> None:
+        """Save messages.json (if not written yet) and meta.json, and index the result."""
+        # Prepare directory & save
+        task_output_dir = self._get_task_output_dir(task)
+        task_output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Save messages.json (conversation trajectory)
+        messages_path = task_output_dir / "messages.json"
+
+        if not messages_path.exists():  # 已经写过就跳过
+            trajectory_path = task_output_dir / "trajectory.jsonl"
+            if getattr(task_result, "model_output", None):
+                messages = task_result.model_output
+            elif trajectory_path.exists():
+                messages = MCPMarkAgent.load_trajectory_messages(str(trajectory_path))
+            else:
+                messages = []
+            self.results_reporter.save_messages_json(messages, messages_path)
+
+        # The trajectory is on disk now; don't keep it alive for the whole run
+        task_result.model_output = None
+
+        # Save meta.json (all other metadata)
+        meta_path = task_output_dir / "meta.json"
+        model_config = {
+            "mcp_service": self.mcp_service,
+            "model_name": self.model_name,
+            "litellm_run_model_name": self.litellm_run_model_name,
+            "reasoning_effort": self.reasoning_effort,
+            "timeout": self.timeout,
+            "mcp_backend": self.mcp_backend,
+            "tool_schema_minifier": self.tool_schema_minifier,
+        }
+        meta_data = self.results_reporter.build_meta_data(
+            task_result,
+            model_config,
+            datetime.fromtimestamp(task_start),
+            datetime.fromtimestamp(task_end),
+        )
+        self.results_reporter.save_meta_json(
+            task_result,
+            model_config,
+            datetime.fromtimestamp(task_start),
+            datetime.fromtimestamp(task_end),
+            meta_path,
+            meta_data=meta_data,
+        )
+
+        # Index the result so resume checks and aggregation skip directory scans
+        self.results_store.upsert(*self._store_key, task_output_dir.name, meta_data)
+
+    async def _run_sharded(self, tasks) -> List[TaskResultRecord]:
+        """Run *tasks* concurrently, one worker coroutine per shard.
+
+        Workers pull from a shared queue, so a shard that finishes early picks
+        up the next task instead of idling behind a slow one.
+        """
+        task_queue: "asyncio.Queue" = asyncio.Queue()
+        for task in tasks:
+            task_queue.put_nowait(task)
+
+        results: List[TaskResultRecord] = []
+
+        async def _worker(shard: EvaluationShard) -> None:
+            while True:
+                try:
+                    task = task_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results.append(await self._execute_and_persist_task(task, shard))
+
+        await asyncio.gather(*(_worker(shard) for shard in self.shards))
+        return results
+
     def run_evaluation(self, task_filter: str) -> EvaluationReport:
         """
         Runs the full evaluation for the specified tasks.
+
+        Synchronous entry point; all tasks run on one event loop.
+        """
+        return asyncio.run(self.run_evaluation_async(task_filter))
+
+    async def run_evaluation_async(self, task_filter: str) -> EvaluationReport:
+        """
+        Runs the full evaluation for the specified tasks on the running event loop.
         """
+        # This evaluator's own tracer; other evaluators in the process keep theirs
+        tracer = Tracer(self.trace_path)
+        try:
+            with use_tracer(tracer):
+                return await self._run_evaluation(task_filter)
+        finally:
+            tracer.close()
+
+    async def _run_evaluation(self, task_filter: str) -> EvaluationReport:
         tasks = self.task_manager.filter_tasks(task_filter)
 
         results = []
+        pending_tasks = []
 
         for task in tasks:
             # --------------------------------------------------------------
@@ -310,55 +631,54 @@ class MCPEvaluator:
                 continue
 
             if retry_due_to_error:
-                # Clean previous artifacts so that new results fully replace them.
-                task_output_dir = self._get_task_output_dir(task)
-                if task_output_dir.exists():
-                    shutil.rmtree(task_output_dir)
+                # Clean previous artifacts so that new results fully replace them
+                # (a resumable checkpoint and its trajectory are kept).
+                self._clear_task_output(task)
+                self.results_store.delete(*self._store_key, self._get_task_output_dir(task).name)
                 logger.info(
                     "🔄 Retrying task due to pipeline error (%s): %s",
                     existing_result.error_message,
                     task.name,
                 )
 
-            # --------------------------------------------------------------
-            # Execute new task
-            # --------------------------------------------------------------
-            task_start = time.time()
-            task_result = self._run_single_task(task)
-            task_end = time.time()
+            pending_tasks.append(task)
 
-            results.append(task_result)
-            
-            # Prepare directory & save
-            task_output_dir = self._get_task_output_dir(task)
-            task_output_dir.mkdir(parents=True, exist_ok=True)
-
-            # Save messages.json (conversation trajectory)
-            messages_path = task_output_dir / "messages.json"
-
-            if not messages_path.exists():  # 已经写过就跳过
-                messages = (
-                    task_result.model_output
-                    if getattr(task_result, "model_output", None)
-                    else []
+        # --------------------------------------------------------------
+        # Early stopping: skip runs that cannot change the sweep's metrics
+        # --------------------------------------------------------------
+        if self.early_stopping is not None and pending_tasks:
+            early_stops = self._plan_early_stopping(tasks, pending_tasks)
+            for task, decision, last_meta in early_stops.values():
+                results.append(self._record_early_stop(task, decision, last_meta))
+            pending_tasks = [
+                task for task in pending_tasks if self._get_task_output_dir(task).name not in early_stops
+            ]
+            if early_stops:
+                settled = sum(1 for _, decision, _ in early_stops.values() if decision[0] == REASON_SETTLED)
+                logger.info(
+                    "⏭  Early stopping: skipping %d tasks in %s (%d settled, %d within tolerance)",
+                    len(early_stops), self._store_key[3], settled, len(early_stops) - settled,
                 )
-                self.results_reporter.save_messages_json(messages, messages_path)
+                if not pending_tasks:
+                    logger.info("⏭  Every remaining run is settled; nothing to execute")
 
-            # Save meta.json (all other metadata)
-            meta_path = task_output_dir / "meta.json"
-            model_config = {
-                "mcp_service": self.mcp_service,
-                "model_name": self.model_name,
-                "litellm_run_model_name": self.litellm_run_model_name,
-                "reasoning_effort": self.reasoning_effort,
-                "timeout": self.timeout,
-            }
-            self.results_reporter.save_meta_json(
-                task_result,
-                model_config,
-                datetime.fromtimestamp(task_start),
-                datetime.fromtimestamp(task_end),
-                meta_path,
+        # --------------------------------------------------------------
+        # Execute new tasks, one worker per shard, longest tasks first
+        # --------------------------------------------------------------
+        predicted_makespan = None
+        if pending_tasks:
+            pending_tasks, predicted_makespan = self._schedule_tasks(pending_tasks)
+        execution_start = time.time()
+        if len(self.shards) == 1:
+            for task in pending_tasks:
+                results.append(await self._execute_and_persist_task(task, self.shards[0]))
+        else:
+            results.extend(await self._run_sharded(pending_tasks))
+        if predicted_makespan is not None:
+            logger.info(
+                "⏱ Makespan: predicted %s, actual %s",
+                self._format_duration(predicted_makespan),
+                self._format_duration(time.time() - execution_start),
             )
 
         # --------------------------------------------------------------
@@ -367,7 +687,7 @@ class MCPEvaluator:
         # --------------------------------------------------------------
 
         # Helper: determine if a TaskResult matches the filter string
-        def _matches_filter(tr: TaskResult, flt: str) -> bool:
+        def _matches_filter(tr: TaskResultRecord, flt: str) -> bool:
             if flt.lower() == "all":
                 return True
             if "/" in flt:
@@ -385,7 +705,7 @@ class MCPEvaluator:
         ]
 
         # Merge, giving preference to fresh `results` (avoids duplicates)
-        merged: dict[str, TaskResult] = {r.task_name: r for r in existing_results}
+        merged: dict[str, TaskResultRecord] = {r.task_name: r for r in existing_results}
         merged.update({r.task_name: r for r in results})  # overwrite with latest run
 
         final_results = list(merged.values())
@@ -398,6 +718,8 @@ class MCPEvaluator:
                 "litellm_run_model_name": self.litellm_run_model_name,
                 "reasoning_effort": self.reasoning_effort,
                 "timeout": self.timeout,
+                "mcp_backend": self.mcp_backend,
+                "tool_schema_minifier": self.tool_schema_minifier,
             },
             total_tasks=len(final_results),
             successful_tasks=sum(1 for r in final_results if r.success),
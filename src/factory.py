@@ -13,26 +13,49 @@ Features:
 """
 
 import importlib
+from collections import Counter
 from dataclasses import dataclass
-from typing import Dict, Type
+from functools import lru_cache
+from typing import Dict, List, Type
 
 from src.base.login_helper import BaseLoginHelper
 from src.base.state_manager import BaseStateManager
 from src.base.task_manager import BaseTaskManager
 from src.config.config_schema import ConfigRegistry
+from src.logger import get_logger
+from src.rate_limiter import RateLimiter
 from src.services import get_service_definition, get_supported_mcp_services
 
+logger = get_logger(__name__)
+
 
 @dataclass
 class ServiceComponents:
-    """All components required for an MCP service."""
+    """All components required for an MCP service.
+
+    Component classes are imported on first access, so e.g. listing tasks
+    never imports the state manager's browser automation stack.
+    """
 
-    task_manager_class: Type[BaseTaskManager]
-    state_manager_class: Type[BaseStateManager]
-    login_helper_class: Type[BaseLoginHelper]
+    task_manager_path: str
+    state_manager_path: str
+    login_helper_path: str
     config_mapping: Dict[str, Dict[str, str]]
 
+    @property
+    def task_manager_class(self) -> Type[BaseTaskManager]:
+        return import_class(self.task_manager_path)
+
+    @property
+    def state_manager_class(self) -> Type[BaseStateManager]:
+        return import_class(self.state_manager_path)
+
+    @property
+    def login_helper_class(self) -> Type[BaseLoginHelper]:
+        return import_class(self.login_helper_path)
+
 
+@lru_cache(maxsize=None)
 def import_class(module_path: str):
     """Dynamically import a class from module path string."""
     if not module_path:
@@ -68,11 +91,11 @@ class ServiceRegistry:
 
         definition = get_service_definition(service_name)
 
-        # Import classes dynamically
+        # Classes are imported lazily on first use
         components = ServiceComponents(
-            task_manager_class=import_class(definition["components"]["task_manager"]),
-            state_manager_class=import_class(definition["components"]["state_manager"]),
-            login_helper_class=import_class(definition["components"]["login_helper"]),
+            task_manager_path=definition["components"]["task_manager"],
+            state_manager_path=definition["components"]["state_manager"],
+            login_helper_path=definition["components"]["login_helper"],
             config_mapping=definition.get("config_mapping", {}),
         )
 
@@ -151,6 +174,85 @@ class MCPServiceFactory:
 
         return components.state_manager_class(**kwargs)
 
+    @classmethod
+    def _shard_state_manager_kwargs(cls, service_name: str) -> List[Dict]:
+        """Constructor kwargs of the state manager of each configured shard."""
+        components = ServiceRegistry.get_components(service_name)
+        definition = get_service_definition(service_name)
+        config = ConfigRegistry.get_config(service_name).get_all()
+
+        mapping = components.config_mapping.get("state_manager", {})
+        base_kwargs = apply_config_mapping(config, mapping)
+
+        sharding = definition.get("sharding") or {}
+        shards = config.get(sharding["shards"]) if sharding else None
+        if not shards:
+            return [base_kwargs]
+
+        fields = sharding["fields"]
+        requests_per_second = config.get(sharding.get("requests_per_second"))
+
+        shard_kwargs = []
+        for index, shard in enumerate(shards):
+            if len(shard) > len(fields):
+                raise ValueError(
+                    f"Shard #{index} for {service_name} has {len(shard)} fields, "
+                    f"expected at most {len(fields)}: {', '.join(fields)}"
+                )
+            # Empty or omitted fields fall back to the unsharded configuration
+            kwargs = dict(base_kwargs)
+            kwargs.update({field: value for field, value in zip(fields, shard) if value})
+            if requests_per_second:
+                kwargs["rate_limiter"] = RateLimiter(requests_per_second)
+            shard_kwargs.append(kwargs)
+
+        # Shards resolving to one hub would archive each other's pages in set-up
+        hub_field = sharding.get("hub_field")
+        cleanup_param = sharding.get("hub_cleanup_param")
+        if hub_field and cleanup_param and len(shard_kwargs) > 1:
+            hub_counts = Counter(kwargs.get(hub_field) for kwargs in shard_kwargs)
+            for index, kwargs in enumerate(shard_kwargs):
+                if hub_counts[kwargs.get(hub_field)] > 1:
+                    kwargs[cleanup_param] = False
+                    logger.warning(
+                        "| Shard #%d of %s shares hub %r with another shard; orphan clean-up disabled",
+                        index,
+                        service_name,
+                        kwargs.get(hub_field),
+                    )
+
+        return shard_kwargs
+
+    @classmethod
+    def create_shard_state_managers(cls, service_name: str) -> List[BaseStateManager]:
+        """Create one state manager per configured shard of the MCP service.
+
+        Services without a ``sharding`` definition, or without any shards
+        configured, get a single state manager built from the regular config.
+        """
+        components = ServiceRegistry.get_components(service_name)
+        return [
+            components.state_manager_class(**kwargs)
+            for kwargs in cls._shard_state_manager_kwargs(service_name)
+        ]
+
+    @classmethod
+    def create_environment_state_managers(
+        cls, service_name: str, count: int, **overrides
+    ) -> List[BaseStateManager]:
+        """Create *count* independent state managers spread round-robin over the shards.
+
+        Managers on the same shard share its integration and rate limiter, but
+        each tracks only its own task's resources, so they can host concurrent
+        environments. *overrides* are passed to every constructor.
+        """
+        components = ServiceRegistry.get_components(service_name)
+        shard_kwargs = cls._shard_state_manager_kwargs(service_name)
+        return [
+            components.state_manager_class(**{**shard_kwargs[index % len(shard_kwargs)], **overrides})
+            for index in range(count)
+        ]
+
     @classmethod
     def create_login_helper(cls, service_name: str, **kwargs) -> BaseLoginHelper:
         """Create login helper for the specified MCP service."""
@@ -1,8 +1,53 @@
 #!/usr/bin/env python3
-"""Logger configuration for MCPMark."""
+"""Logger configuration for MCPMark.
 
+Records are handed to a single background listener through a queue, so
+logging from the agent loops never blocks on terminal I/O; the listener
+writes them to stdout in order. Set ``MCPMARK_SYNC_LOGGING=1`` to write
+directly from the calling thread instead.
+"""
+
+import atexit
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_listener_running = False
+
+
+def _stdout_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def _get_queue_handler() -> QueueHandler:
+    """Process-wide queue handler backed by one stdout listener thread."""
+    global _queue_handler, _listener, _listener_running
+    if _queue_handler is None:
+        log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, _stdout_handler())
+        _listener.start()
+        _listener_running = True
+        atexit.register(flush_logs, restart=False)
+        _queue_handler = QueueHandler(log_queue)
+        _queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    return _queue_handler
+
+
+def flush_logs(restart: bool = True) -> None:
+    """Block until every queued record has been written (e.g. before printing a summary)."""
+    global _listener_running
+    if _listener is not None and _listener_running:
+        _listener.stop()
+        _listener_running = restart
+        if restart:
+            _listener.start()
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -10,9 +55,10 @@ def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
 
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter("%(message)s")
-        handler.setFormatter(formatter)
+        if os.getenv("MCPMARK_SYNC_LOGGING"):
+            handler = _stdout_handler()
+        else:
+            handler = _get_queue_handler()
         logger.addHandler(handler)
         logger.setLevel(logging.INFO)
 
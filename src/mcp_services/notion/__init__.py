@@ -3,6 +3,14 @@ Notion-specific modules for MCPMark.
 """
 
 from .notion_task_manager import NotionTaskManager, NotionTask
-from .notion_state_manager import NotionStateManager
 
 __all__ = ["NotionTaskManager", "NotionTask", "NotionStateManager"]
+
+
+def __getattr__(name):
+    # The state manager pulls in notion_client and Playwright; load it on demand
+    if name == "NotionStateManager":
+        from .notion_state_manager import NotionStateManager
+
+        return NotionStateManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
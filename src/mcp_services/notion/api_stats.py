@@ -0,0 +1,226 @@
+"""
+Notion API Accounting
+=====================
+
+Counting / timing middleware for the Notion REST clients used during an
+evaluation. Every request issued through :class:`CountingTransport` is
+recorded per stage (``setup``, ``verify``, ``cleanup``) and per endpoint
+(``GET /v1/blocks/{id}/children``): request count, errors, 429 responses,
+retries, time spent waiting (rate limiter and ``Retry-After`` backoff) and
+request latency.
+
+Verification runs in a subprocess; when ``NOTION_API_STATS_FILE`` is set,
+``tasks.utils.notion_utils.get_notion_client`` records into a file that the
+state manager merges into the task's usage afterwards.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+import httpx
+
+from src.logger import get_logger
+from src.rate_limiter import RateLimiter
+
+logger = get_logger(__name__)
+
+STATS_FILE_ENV = "NOTION_API_STATS_FILE"
+
+# Page / block / database IDs, with or without dashes
+_ID_SEGMENT = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+
+_COUNTERS = ("requests", "errors", "rate_limited", "retries")
+_TIMERS = ("wait_s", "latency_s")
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Normalize a request to ``METHOD /v1/pages/{id}`` so calls group by endpoint."""
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+def _empty_counters() -> Dict[str, Union[int, float]]:
+    return {**{name: 0 for name in _COUNTERS}, **{name: 0.0 for name in _TIMERS}}
+
+
+class NotionApiStats:
+    """Thread-safe ``stage -> endpoint -> counters`` accumulator."""
+
+    def __init__(self, default_stage: str = "other"):
+        self._lock = threading.Lock()
+        self._stage = default_stage
+        self._default_stage = default_stage
+        self._data: Dict[str, Dict[str, Dict[str, Union[int, float]]]] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Attribute requests issued inside the block to stage *name*."""
+        previous, self._stage = self._stage, name
+        try:
+            yield
+        finally:
+            self._stage = previous
+
+    def record(self, endpoint: str, **amounts: Union[int, float]) -> None:
+        """Add *amounts* (e.g. ``requests=1, latency_s=0.2``) to the current stage."""
+        with self._lock:
+            counters = self._data.setdefault(self._stage, {}).setdefault(endpoint, _empty_counters())
+            for key, amount in amounts.items():
+                counters[key] += amount
+
+    def merge(self, usage: Dict[str, Dict[str, Dict[str, Union[int, float]]]]) -> None:
+        """Add a snapshot (e.g. from the verification subprocess) to these stats."""
+        with self._lock:
+            for stage, endpoints in usage.items():
+                for endpoint, amounts in endpoints.items():
+                    counters = self._data.setdefault(stage, {}).setdefault(endpoint, _empty_counters())
+                    for key, amount in amounts.items():
+                        if key in counters:
+                            counters[key] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the stats with a per-stage ``total`` entry; timers rounded to ms."""
+        with self._lock:
+            usage: Dict[str, Any] = {}
+            for stage, endpoints in self._data.items():
+                total = _empty_counters()
+                stage_usage = {}
+                for endpoint, counters in sorted(endpoints.items()):
+                    stage_usage[endpoint] = {
+                        key: round(value, 3) if key in _TIMERS else value
+                        for key, value in counters.items()
+                    }
+                    for key, value in counters.items():
+                        total[key] += value
+                stage_usage["total"] = {
+                    key: round(value, 3) if key in _TIMERS else value for key, value in total.items()
+                }
+                usage[stage] = stage_usage
+            return usage
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._stage = self._default_stage
+
+    def dump(self, path: Union[str, Path]) -> None:
+        """Write the raw stats to *path* (used by the verification subprocess)."""
+        with self._lock:
+            data = json.dumps(self._data)
+        Path(path).write_text(data, encoding="utf-8")
+
+    def merge_file(self, path: Union[str, Path], remove: bool = True) -> None:
+        """Merge stats written by :meth:`dump`; a missing or broken file is ignored."""
+        path = Path(path)
+        if not path.exists():
+            return
+        try:
+            self.merge(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as e:
+            logger.warning(f"| Could not read Notion API stats from {path}: {e}")
+        if remove:
+            path.unlink(missing_ok=True)
+
+
+class CountingTransport(httpx.BaseTransport):
+    """httpx transport that rate limits, retries 429s and records every request."""
+
+    def __init__(
+        self,
+        stats: NotionApiStats,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 3,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        self.stats = stats
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self._transport = transport or httpx.HTTPTransport()
+
+    @staticmethod
+    def _retry_delay(response: httpx.Response, attempt: int) -> float:
+        try:
+            return max(0.0, float(response.headers.get("retry-after", "")))
+        except ValueError:
+            return min(30.0, 2.0 ** attempt)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = endpoint_name(request.method, request.url.path)
+        attempt = 0
+        while True:
+            wait = 0.0
+            if self.rate_limiter:
+                wait_start = time.perf_counter()
+                self.rate_limiter.acquire()
+                wait = time.perf_counter() - wait_start
+
+            start = time.perf_counter()
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.HTTPError:
+                self.stats.record(
+                    endpoint, requests=1, errors=1, wait_s=wait, latency_s=time.perf_counter() - start
+                )
+                raise
+            latency = time.perf_counter() - start
+            status = response.status_code
+
+            if status == 429 and attempt < self.max_retries:
+                delay = self._retry_delay(response, attempt)
+                response.close()
+                self.stats.record(
+                    endpoint, requests=1, rate_limited=1, retries=1, wait_s=wait + delay, latency_s=latency
+                )
+                logger.debug(f"| Notion rate limited on {endpoint}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.stats.record(
+                endpoint,
+                requests=1,
+                errors=int(status >= 400),
+                rate_limited=int(status == 429),
+                wait_s=wait,
+                latency_s=latency,
+            )
+            return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def create_counting_client(
+    auth: str,
+    stats: NotionApiStats,
+    rate_limiter: Optional[RateLimiter] = None,
+):
+    """Notion ``Client`` whose requests go through a :class:`CountingTransport`."""
+    from notion_client import Client
+
+    http_client = httpx.Client(transport=CountingTransport(stats, rate_limiter))
+    return Client(auth=auth, client=http_client)
+
+
+_environment_stats: Optional[NotionApiStats] = None
+
+
+def stats_from_environment() -> Optional[NotionApiStats]:
+    """Process-wide stats for a verification subprocess, dumped to ``$NOTION_API_STATS_FILE`` at exit."""
+    global _environment_stats
+    path = os.environ.get(STATS_FILE_ENV)
+    if not path:
+        return None
+
+    if _environment_stats is None:
+        import atexit
+
+        _environment_stats = NotionApiStats(default_stage="verify")
+        atexit.register(_environment_stats.dump, path)
+    return _environment_stats
@@ -0,0 +1,531 @@
+"""
+In-Process Notion MCP Server
+============================
+
+Python implementation of the tool surface of ``@notionhq/notion-mcp-server``
+(the ``API-*`` tools generated from Notion's OpenAPI spec), built on the MCP
+SDK's low-level ``Server``. The agent runs it in its own event loop over an
+in-memory transport (see ``src.agents.mcp.MCPInProcessServer``), so no Node
+process is started and tool calls skip stdio JSON-RPC framing.
+
+Requests go through one pooled ``notion_client.AsyncClient`` per integration
+key and event loop, shared by every session open in that loop (e.g. all
+environments of a ``VectorServer``). Results match the Node server: the
+Notion response as JSON text, and for API errors the error body with its
+HTTP ``status``.
+
+Select it with ``MCPMARK_NOTION_MCP_BACKEND=python`` (default: ``npx``).
+
+Tool schemas: the tool names match the Node server, but the built-in input
+schemas in :data:`NOTION_OPERATIONS` are hand-written and simpler than the
+ones the Node server derives from the OpenAPI spec. Models see a different
+tool surface, so scores from the two backends are not directly comparable.
+For comparable runs, snapshot the Node server's ``tools/list`` once::
+
+    python -m src.mcp_services.notion.mcp_server --snapshot-node-tools notion_tools.json
+
+and point ``MCPMARK_NOTION_MCP_TOOLS`` at the file: the server then lists the
+snapshot's names, descriptions and schemas verbatim, and routes calls
+through the same operations. The evaluator records the backend and tool
+surface (:func:`notion_mcp_backend_label`) in every ``meta.json``.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import os
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKEND_ENV = "MCPMARK_NOTION_MCP_BACKEND"
+TOOLS_SNAPSHOT_ENV = "MCPMARK_NOTION_MCP_TOOLS"
+SERVER_NAME = "Notion API"
+SERVER_VERSION = "1.0.0"
+# The tool surface targets the API version the Node server pins
+NOTION_VERSION = "2022-06-28"
+MAX_CONNECTIONS = 32
+
+
+def notion_mcp_backend() -> str:
+    """``"python"`` for the in-process server, ``"npx"`` for the Node server."""
+    backend = os.getenv(BACKEND_ENV, "npx").strip().lower()
+    if backend not in ("python", "npx"):
+        logger.warning(f"| Unknown {BACKEND_ENV}={backend!r}, using npx")
+        return "npx"
+    return backend
+
+
+def load_tools_snapshot(path: str) -> List[Dict[str, Any]]:
+    """Tools of a Node server ``tools/list`` snapshot that map onto :data:`NOTION_OPERATIONS`.
+
+    Raises:
+        ValueError: The file holds no tool list
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    tools = data.get("tools") if isinstance(data, dict) else data
+    if not isinstance(tools, list):
+        raise ValueError(f"{path} does not hold a tools/list snapshot")
+    known = [tool for tool in tools if tool.get("name") in OPERATIONS_BY_NAME]
+    unknown = sorted(tool.get("name") for tool in tools if tool.get("name") not in OPERATIONS_BY_NAME)
+    missing = sorted(set(OPERATIONS_BY_NAME) - {tool.get("name") for tool in known})
+    if unknown:
+        logger.warning(f"| Notion tool snapshot: no operation for {', '.join(unknown)}; not listed")
+    if missing:
+        logger.warning(f"| Notion tool snapshot lacks {', '.join(missing)}; not listed")
+    return known
+
+
+def _tools_snapshot_path() -> Optional[str]:
+    return os.getenv(TOOLS_SNAPSHOT_ENV) or None
+
+
+def notion_mcp_backend_label() -> str:
+    """Backend and tool surface, as recorded in run metadata.
+
+    ``"npx"``, ``"python"`` (built-in schemas) or ``"python+snapshot:<sha256 prefix>"``.
+    """
+    backend = notion_mcp_backend()
+    snapshot = _tools_snapshot_path()
+    if backend != "python" or not snapshot:
+        return backend
+    try:
+        with open(snapshot, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    except OSError:
+        return backend
+    return f"python+snapshot:{digest}"
+
+
+# =============================================================================
+# Tool surface
+# =============================================================================
+
+_OBJECT = {"type": "object"}
+_ARRAY = {"type": "array", "items": {"type": "object"}}
+_PAGING = {
+    "start_cursor": {"type": "string", "description": "Cursor returned by a previous response"},
+    "page_size": {"type": "integer", "description": "Number of items to return (max 100)"},
+}
+_RICH_TEXT = {"type": "array", "items": {"type": "object"}, "description": "Array of rich text objects"}
+_FILTER_PROPERTIES = {
+    "type": "array",
+    "items": {"type": "string"},
+    "description": "Limit the response to these property IDs",
+}
+
+
+def _id(kind: str) -> Dict[str, Any]:
+    return {"type": "string", "description": f"Identifier for a Notion {kind}"}
+
+
+@dataclass(frozen=True)
+class NotionOperation:
+    """One ``API-*`` tool: a Notion endpoint and where each argument goes."""
+
+    name: str
+    method: str
+    path: str  # relative to /v1, with {param} placeholders
+    summary: str
+    path_params: Dict[str, Any] = field(default_factory=dict)
+    query_params: Dict[str, Any] = field(default_factory=dict)
+    body_params: Dict[str, Any] = field(default_factory=dict)
+    required: Tuple[str, ...] = ()
+
+    def input_schema(self) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {**self.path_params, **self.query_params, **self.body_params},
+            "required": list(self.required),
+        }
+
+    def build_request(self, arguments: Dict[str, Any]) -> Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Split *arguments* into ``(path, query, body)``.
+
+        Like the Node server, every argument that is not a path or query
+        parameter goes into the body (e.g. a block type key for
+        ``API-update-a-block``).
+        """
+        missing = [name for name in self.required if name not in arguments]
+        if missing:
+            raise ValueError(f"Missing required parameter(s): {', '.join(missing)}")
+        path = self.path.format(**{name: arguments[name] for name in self.path_params})
+        query = {
+            name: arguments[name] for name in self.query_params if arguments.get(name) is not None
+        }
+        body = {
+            name: _decode_json_argument(value)
+            for name, value in arguments.items()
+            if name not in self.path_params and name not in self.query_params
+        }
+        return path, query, body if self.method != "GET" else None
+
+
+def _decode_json_argument(value: Any) -> Any:
+    """Models sometimes pass an object argument as a JSON string; send the decoded value."""
+    if isinstance(value, str) and value[:1] in ("{", "["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+NOTION_OPERATIONS: List[NotionOperation] = [
+    NotionOperation("API-get-user", "GET", "users/{user_id}", "Retrieve a user",
+                    path_params={"user_id": _id("user")}, required=("user_id",)),
+    NotionOperation("API-get-users", "GET", "users", "List all users", query_params=_PAGING),
+    NotionOperation("API-get-self", "GET", "users/me", "Retrieve your token's bot user"),
+    NotionOperation(
+        "API-post-database-query", "POST", "databases/{database_id}/query", "Query a database",
+        path_params={"database_id": _id("database")},
+        query_params={"filter_properties": _FILTER_PROPERTIES},
+        body_params={
+            "filter": {"type": "object", "description": "Filter conditions on database properties"},
+            "sorts": {"type": "array", "items": _OBJECT, "description": "Sort conditions"},
+            **_PAGING,
+            "archived": {"type": "boolean"},
+            "in_trash": {"type": "boolean"},
+        },
+        required=("database_id",),
+    ),
+    NotionOperation(
+        "API-post-search", "POST", "search", "Search by title",
+        body_params={
+            "query": {"type": "string", "description": "Text to match against page and database titles"},
+            "sort": {
+                "type": "object",
+                "properties": {
+                    "direction": {"type": "string", "enum": ["ascending", "descending"]},
+                    "timestamp": {"type": "string", "enum": ["last_edited_time"]},
+                },
+            },
+            "filter": {
+                "type": "object",
+                "properties": {
+                    "value": {"type": "string", "enum": ["page", "database"]},
+                    "property": {"type": "string", "enum": ["object"]},
+                },
+            },
+            **_PAGING,
+        },
+    ),
+    NotionOperation("API-get-block-children", "GET", "blocks/{block_id}/children", "Retrieve block children",
+                    path_params={"block_id": _id("block")}, query_params=_PAGING, required=("block_id",)),
+    NotionOperation(
+        "API-patch-block-children", "PATCH", "blocks/{block_id}/children", "Append block children",
+        path_params={"block_id": _id("block")},
+        body_params={
+            "children": {**_ARRAY, "description": "Block objects to append"},
+            "after": {"type": "string", "description": "ID of the existing block to append after"},
+        },
+        required=("block_id", "children"),
+    ),
+    NotionOperation("API-retrieve-a-block", "GET", "blocks/{block_id}", "Retrieve a block",
+                    path_params={"block_id": _id("block")}, required=("block_id",)),
+    NotionOperation(
+        "API-update-a-block", "PATCH", "blocks/{block_id}", "Update a block",
+        path_params={"block_id": _id("block")},
+        body_params={
+            "type": {"type": "object", "description": "Block type object with the values to update"},
+            "archived": {"type": "boolean"},
+        },
+        required=("block_id",),
+    ),
+    NotionOperation("API-delete-a-block", "DELETE", "blocks/{block_id}", "Delete a block",
+                    path_params={"block_id": _id("block")}, required=("block_id",)),
+    NotionOperation("API-retrieve-a-page", "GET", "pages/{page_id}", "Retrieve a page",
+                    path_params={"page_id": _id("page")}, query_params={"filter_properties": _FILTER_PROPERTIES},
+                    required=("page_id",)),
+    NotionOperation(
+        "API-patch-page", "PATCH", "pages/{page_id}", "Update page properties",
+        path_params={"page_id": _id("page")},
+        body_params={
+            "properties": {"type": "object", "description": "Property values to update"},
+            "in_trash": {"type": "boolean"},
+            "archived": {"type": "boolean"},
+            "icon": {"type": "object"},
+            "cover": {"type": "object"},
+        },
+        required=("page_id",),
+    ),
+    NotionOperation(
+        "API-post-page", "POST", "pages", "Create a page",
+        body_params={
+            "parent": {"type": "object", "description": "Parent page_id or database_id"},
+            "properties": {"type": "object", "description": "Property values of the new page"},
+            "children": {**_ARRAY, "description": "Page content as block objects"},
+            "icon": {"type": "object"},
+            "cover": {"type": "object"},
+        },
+        required=("parent", "properties"),
+    ),
+    NotionOperation(
+        "API-create-a-database", "POST", "databases", "Create a database",
+        body_params={
+            "parent": {"type": "object", "description": "Parent page_id"},
+            "properties": {"type": "object", "description": "Property schema of the database"},
+            "title": _RICH_TEXT,
+        },
+        required=("parent", "properties"),
+    ),
+    NotionOperation(
+        "API-update-a-database", "PATCH", "databases/{database_id}", "Update a database",
+        path_params={"database_id": _id("database")},
+        body_params={
+            "title": _RICH_TEXT,
+            "description": _RICH_TEXT,
+            "properties": {"type": "object", "description": "Property schema changes"},
+        },
+        required=("database_id",),
+    ),
+    NotionOperation("API-retrieve-a-database", "GET", "databases/{database_id}", "Retrieve a database",
+                    path_params={"database_id": _id("database")}, required=("database_id",)),
+    NotionOperation(
+        "API-retrieve-a-page-property", "GET", "pages/{page_id}/properties/{property_id}",
+        "Retrieve a page property item",
+        path_params={"page_id": _id("page"), "property_id": _id("page property")},
+        query_params=_PAGING,
+        required=("page_id", "property_id"),
+    ),
+    NotionOperation(
+        "API-retrieve-a-comment", "GET", "comments", "Retrieve comments",
+        query_params={"block_id": _id("block or page"), **_PAGING},
+        required=("block_id",),
+    ),
+    NotionOperation(
+        "API-create-a-comment", "POST", "comments", "Create comment",
+        body_params={
+            "parent": {"type": "object", "description": "Parent page_id"},
+            "rich_text": _RICH_TEXT,
+        },
+        required=("parent", "rich_text"),
+    ),
+]
+
+OPERATIONS_BY_NAME = {operation.name: operation for operation in NOTION_OPERATIONS}
+
+
+# =============================================================================
+# Pooled Notion client
+# =============================================================================
+
+# event loop -> integration key -> [client, open sessions]
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, list]]" = weakref.WeakKeyDictionary()
+
+
+def _acquire_client(notion_key: str):
+    """Pooled ``AsyncClient`` of *notion_key* in the running loop (release with :func:`_release_client`)."""
+    import httpx
+    from notion_client import AsyncClient
+
+    pool = _clients.setdefault(asyncio.get_running_loop(), {})
+    entry = pool.get(notion_key)
+    if entry is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
+        )
+        client = AsyncClient(
+            client=http_client,
+            auth=notion_key,
+            notion_version=NOTION_VERSION,
+            # API errors are returned to the model as tool results
+            log_level=logging.ERROR,
+        )
+        entry = pool[notion_key] = [client, 0]
+    entry[1] += 1
+    return entry[0]
+
+
+async def _release_client(notion_key: str) -> None:
+    """Close the pooled client of *notion_key* once no session of the running loop uses it."""
+    pool = _clients.get(asyncio.get_running_loop(), {})
+    entry = pool.get(notion_key)
+    if entry is None:
+        return
+    entry[1] -= 1
+    if entry[1] <= 0:
+        del pool[notion_key]
+        await entry[0].aclose()
+
+
+def _error_payload(error: Exception) -> Dict[str, Any]:
+    """Notion error body with the HTTP status, as the Node server reports it."""
+    try:
+        payload = json.loads(error.body) if isinstance(error.body, str) else dict(error.body or {})
+    except (AttributeError, TypeError, ValueError):
+        payload = {"object": "error", "code": str(getattr(error, "code", "")), "message": str(error)}
+    payload["status"] = getattr(error, "status", payload.get("status"))
+    return payload
+
+
+async def call_notion_operation(client: Any, name: str, arguments: Dict[str, Any]) -> str:
+    """Run tool *name* with *client*; returns the JSON response text.
+
+    Raises:
+        ValueError: Unknown tool or missing required arguments
+    """
+    from notion_client import APIResponseError
+
+    operation = OPERATIONS_BY_NAME.get(name)
+    if operation is None:
+        raise ValueError(f"Unknown tool: {name}")
+    path, query, body = operation.build_request(arguments or {})
+    try:
+        response = await client.request(path=path, method=operation.method, query=query or None, body=body)
+    except APIResponseError as e:
+        response = _error_payload(e)
+    return json.dumps(response, ensure_ascii=False)
+
+
+# =============================================================================
+# MCP server
+# =============================================================================
+
+
+class NotionMCPServer:
+    """Low-level MCP ``Server`` exposing :data:`NOTION_OPERATIONS` for one integration key.
+
+    ``async with`` borrows the pooled Notion client for the lifetime of a
+    session; ``server`` is what the in-memory transport runs.
+    """
+
+    def __init__(self, notion_key: str):
+        if not notion_key:
+            raise ValueError("Notion API key required")
+        self.notion_key = notion_key
+        self._client = None
+        self.server = self._build_server()
+
+    async def __aenter__(self) -> "NotionMCPServer":
+        self._client = _acquire_client(self.notion_key)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._client = None
+        await _release_client(self.notion_key)
+
+    def tools(self) -> List[Any]:
+        from mcp import types
+
+        snapshot = _tools_snapshot_path()
+        if snapshot:
+            return [
+                types.Tool(
+                    name=tool["name"],
+                    description=tool.get("description"),
+                    inputSchema=tool.get("inputSchema") or {"type": "object"},
+                )
+                for tool in load_tools_snapshot(snapshot)
+            ]
+        return [
+            types.Tool(
+                name=operation.name,
+                description=f"Notion | {operation.summary}",
+                inputSchema=operation.input_schema(),
+            )
+            for operation in NOTION_OPERATIONS
+        ]
+
+    async def call(self, name: str, arguments: Optional[Dict[str, Any]]) -> List[Any]:
+        from mcp import types
+
+        if self._client is None:
+            raise RuntimeError("Notion MCP server is not started")
+        text = await call_notion_operation(self._client, name, arguments or {})
+        return [types.TextContent(type="text", text=text)]
+
+    def _build_server(self) -> Any:
+        from mcp import types
+        from mcp.server.lowlevel import Server
+
+        tools = self.tools()
+        # mcp >= 2 registers handlers in the constructor, 1.x through decorators
+        if "on_call_tool" in inspect.signature(Server.__init__).parameters:
+
+            async def on_list_tools(ctx, params) -> "types.ListToolsResult":
+                return types.ListToolsResult(tools=tools)
+
+            async def on_call_tool(ctx, params) -> "types.CallToolResult":
+                try:
+                    content = await self.call(params.name, params.arguments)
+                except Exception as e:
+                    return types.CallToolResult(content=[types.TextContent(type="text", text=str(e))], isError=True)
+                return types.CallToolResult(content=content)
+
+            return Server(SERVER_NAME, version=SERVER_VERSION, on_list_tools=on_list_tools, on_call_tool=on_call_tool)
+
+        server = Server(SERVER_NAME, version=SERVER_VERSION)
+
+        @server.list_tools()
+        async def list_tools() -> List["types.Tool"]:
+            return tools
+
+        @server.call_tool()
+        async def call_tool(name: str, arguments: Dict[str, Any]) -> List["types.TextContent"]:
+            return await self.call(name, arguments)
+
+        return server
+
+
+# =============================================================================
+# Snapshot CLI
+# =============================================================================
+
+
+async def _snapshot_node_tools(notion_key: str, output_path: str) -> int:
+    from src.agents.mcp import MCPStdioServer
+
+    server = MCPStdioServer(
+        command="npx",
+        args=["-y", "@notionhq/notion-mcp-server"],
+        env={
+            "OPENAPI_MCP_HEADERS": json.dumps(
+                {"Authorization": f"Bearer {notion_key}", "Notion-Version": NOTION_VERSION}
+            )
+        },
+    )
+    async with server:
+        tools = await server.list_tools()
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"tools": tools}, f, indent=2, ensure_ascii=False)
+    return len(tools)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notion MCP tool surface utilities")
+    parser.add_argument(
+        "--snapshot-node-tools",
+        metavar="PATH",
+        required=True,
+        help=f"Write the Node server's tools/list to PATH (for {TOOLS_SNAPSHOT_ENV})",
+    )
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=".mcp_env", override=False)
+    notion_key = os.getenv("EVAL_NOTION_API_KEY")
+    if not notion_key:
+        print("❌ EVAL_NOTION_API_KEY is not set")
+        return 1
+    try:
+        count = asyncio.run(_snapshot_node_tools(notion_key, args.snapshot_node_tools))
+    except Exception as e:
+        print(f"❌ Could not list the Node server's tools: {e}")
+        return 1
+    print(f"✅ Saved {count} tools to {args.snapshot_node_tools}")
+    print(f"   Use them with {TOOLS_SNAPSHOT_ENV}={args.snapshot_node_tools} {BACKEND_ENV}=python")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -6,24 +6,26 @@ This module handles the duplication and management of Notion initial states
 Pages for consistent task evaluation using Playwright automation.
 """
 
+import threading
 import time
+from collections import defaultdict
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
-
-from notion_client import Client
-from playwright.sync_api import (
-    Browser,
-    Page,
-    TimeoutError as PlaywrightTimeoutError,
-    sync_playwright,
-)
+from typing import TYPE_CHECKING, Optional, Tuple, Dict, Any
 
 from src.base.state_manager import BaseStateManager, InitialStateInfo
 from src.base.task_manager import BaseTask
 from src.logger import get_logger
 from src.mcp_services.notion.notion_task_manager import NotionTask
+from src.rate_limiter import RateLimiter
+from src.tracing import current_span, traced
 import re
 
+# notion_client, httpx and playwright are imported on first use so that merely
+# importing this module (e.g. to list tasks) stays cheap
+if TYPE_CHECKING:
+    from notion_client import Client
+    from playwright.sync_api import Browser, Page
+
 # Initialize logger
 logger = get_logger(__name__)
 
@@ -36,6 +38,9 @@ MOVE_TO_SEARCH_INPUT_SELECTOR = (
     'input[placeholder*="Move page to"], textarea[placeholder*="Move page to"]'
 )
 
+# Shards may share one Playwright storage state file; serialize reads/writes of it
+_STATE_FILE_LOCKS: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
 
 class NotionStateManager(BaseStateManager):
     """
@@ -50,6 +55,9 @@ class NotionStateManager(BaseStateManager):
         browser: str = "firefox",
         eval_parent_page_title: str = "MCPMark Eval Hub",
         source_parent_page_title: str = "MCPMark Source Hub",
+        state_file: str = "notion_state.json",
+        rate_limiter: Optional[RateLimiter] = None,
+        cleanup_orphans: bool = True,
     ):
         """
         Initializes the Notion state manager.
@@ -60,8 +68,14 @@ class NotionStateManager(BaseStateManager):
             headless: Whether to run Playwright in headless mode.
             browser: The browser engine to use ('chromium' or 'firefox').
             eval_parent_page_title: Parent page title for evaluation workspace.
+            source_parent_page_title: Title of the source hub with initial states.
+            state_file: Playwright storage state used to log into Notion.
+            rate_limiter: Optional limiter applied to every Notion API request
+                issued with this manager's integrations (one per shard).
+            cleanup_orphans: Archive every page left in the eval hub before each
+                set-up. Disable when several managers share one hub concurrently.
         """
-        super().__init__(service_name="notion")
+        super().__init__(service_name="notion", rate_limiter=rate_limiter)
         supported_browsers = {"chromium", "firefox"}
         if browser not in supported_browsers:
             raise ValueError(
@@ -76,13 +90,20 @@ class NotionStateManager(BaseStateManager):
                 "Both source_notion_key and eval_notion_key must be provided to NotionStateManager."
             )
 
-        self.source_notion_client = Client(auth=source_notion_key)
-        self.eval_notion_client = Client(auth=eval_notion_key)
+        self.eval_notion_key = eval_notion_key
+        # Per-task Notion REST usage, split by stage and endpoint
+        from .api_stats import NotionApiStats
+
+        self.api_stats = NotionApiStats()
+        self._verification_stats_path: Optional[Path] = None
+        self.source_notion_client = self._create_notion_client(source_notion_key)
+        self.eval_notion_client = self._create_notion_client(eval_notion_key)
 
         self.headless = headless
-        self.state_file = Path("notion_state.json")
+        self.state_file = Path(state_file)
         # Parent page under which duplicated pages should be moved for evaluation
         self.eval_parent_page_title = eval_parent_page_title
+        self.cleanup_orphans = cleanup_orphans
         # Source hub page that contains all initial-state templates
         self.source_parent_page_title = source_parent_page_title
 
@@ -98,15 +119,22 @@ class NotionStateManager(BaseStateManager):
 
         if not self.state_file.exists():
             raise FileNotFoundError(
-                "Authentication state 'notion_state.json' not found. Run the Notion login helper first."
+                f"Authentication state '{self.state_file}' not found. Run the Notion login helper first."
             )
 
         logger.info("Notion state manager initialized successfully")
 
+    def _create_notion_client(self, auth: str) -> "Client":
+        """Create a Notion client whose requests are rate limited and counted."""
+        from .api_stats import create_counting_client
+
+        return create_counting_client(auth, self.api_stats, self.rate_limiter)
+
     # =========================================================================
     # Core Template Methods (Required by BaseStateManager)
     # =========================================================================
 
+    @traced("notion.cleanup_orphans")
     def _cleanup_eval_hub_orphans(self) -> None:
         """Clean up all pages in MCPMark Eval Hub before creating new task state."""
         try:
@@ -221,6 +249,7 @@ class NotionStateManager(BaseStateManager):
 
         return self._source_hub_page_id
 
+    @traced("notion.wait_database_ready")
     def _wait_for_database_ready(
         self,
         page_id: str,
@@ -281,7 +310,8 @@ class NotionStateManager(BaseStateManager):
             return None
 
         # Clean up any orphan pages in eval hub before creating new state
-        self._cleanup_eval_hub_orphans()
+        if self.cleanup_orphans:
+            self._cleanup_eval_hub_orphans()
 
         try:
             initial_state_title = self._category_to_initial_state_title(task.category_id)
@@ -349,6 +379,7 @@ class NotionStateManager(BaseStateManager):
             # Track the duplicated page for cleanup
             self.track_resource("page", state_info.state_id, state_info.metadata)
 
+    @traced("notion.archive")
     def _cleanup_task_initial_state(self, task: BaseTask) -> bool:
         """Clean up initial state for a specific Notion task."""
         if not isinstance(task, NotionTask):
@@ -401,6 +432,7 @@ class NotionStateManager(BaseStateManager):
     # Notion API Operations
     # =========================================================================
 
+    @traced("notion.rename")
     def _rename_initial_state_via_api(
         self, initial_state_id: str, new_title: str
     ) -> None:
@@ -421,8 +453,9 @@ class NotionStateManager(BaseStateManager):
     # Playwright Automation Methods
     # =========================================================================
 
+    @traced("notion.move")
     def _move_current_page_to_env(
-        self, page: Page, *, wait_timeout: int = 60_000
+        self, page: "Page", *, wait_timeout: int = 60_000
     ) -> None:
         """Moves the currently open page into the designated evaluation parent page.
 
@@ -436,6 +469,7 @@ class NotionStateManager(BaseStateManager):
            "Move page to"), type the target parent page title.
         4. Click the matching search result to complete the move.
         """
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
         logger.info(
             "| ○ Moving duplicated page to evaluation parent '%s'...",
@@ -526,6 +560,7 @@ class NotionStateManager(BaseStateManager):
         suffix = dup_base[len(orig_base) + 1 :]
         return suffix.isdigit()
 
+    @traced("notion.find_initial_state")
     def _find_initial_state_by_title(self, title: str) -> Optional[Tuple[str, str]]:
         """Find a child page under the source hub by exact title.
 
@@ -594,7 +629,7 @@ class NotionStateManager(BaseStateManager):
 
     def _duplicate_current_initial_state(
         self,
-        page: Page,
+        page: "Page",
         new_title: Optional[str] = None,
         *,
         original_initial_state_id: str,
@@ -602,6 +637,8 @@ class NotionStateManager(BaseStateManager):
         wait_timeout: int = 180_000,
     ) -> str:
         """Duplicates the currently open Notion initial state using Playwright."""
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
         try:
             logger.info("| ○ Opening page menu...")
             page.wait_for_selector(
@@ -850,6 +887,7 @@ class NotionStateManager(BaseStateManager):
             )
             return False
 
+    @traced("notion.duplicate")
     def _duplicate_initial_state_for_task(
         self,
         initial_state_url: str,
@@ -860,27 +898,33 @@ class NotionStateManager(BaseStateManager):
         initial_wait_ms: int = 180_000,
     ) -> Tuple[str, str]:
         """Duplicates an initial state for a task, with retries for reliability."""
+        from playwright.sync_api import sync_playwright
+
         if not self.state_file.exists():
             raise FileNotFoundError(
-                "Authentication state 'notion_state.json' not found. "
+                f"Authentication state '{self.state_file}' not found. "
                 "Run the Notion login helper first."
             )
 
         last_exc = None
         for attempt in range(max_retries + 1):
             wait_timeout = initial_wait_ms * (attempt + 1)
+            current_span().set_attribute("attempts", attempt + 1)
             try:
                 with sync_playwright() as p:
                     browser_type = getattr(p, self.browser_name)
-                    browser: Browser = browser_type.launch(headless=self.headless)
-                    context = browser.new_context(storage_state=str(self.state_file))
+                    browser: "Browser" = browser_type.launch(headless=self.headless)
+                    state_file_lock = _STATE_FILE_LOCKS[str(self.state_file.resolve())]
+                    with state_file_lock:
+                        context = browser.new_context(storage_state=str(self.state_file))
                     page = context.new_page()
 
                     logger.info("| ○ Navigating to initial state for %s...", category)
                     # Start timing from the moment we begin navigating to the initial state page.
                     start_time = time.time()
                     page.goto(initial_state_url, wait_until="load", timeout=60_000)
-                    context.storage_state(path=str(self.state_file))
+                    with state_file_lock:
+                        context.storage_state(path=str(self.state_file))
 
                     initial_state_id = self._extract_initial_state_id_from_url(
                         initial_state_url
@@ -898,7 +942,8 @@ class NotionStateManager(BaseStateManager):
                     )
                     duplicated_url = page.url
                     # Validate URL pattern again at this higher level (should already be validated inside).
-                    context.storage_state(path=str(self.state_file))
+                    with state_file_lock:
+                        context.storage_state(path=str(self.state_file))
                     # Log how long the whole duplication (navigate → duplicate) took.
                     elapsed = time.time() - start_time
                     logger.info(
@@ -926,16 +971,95 @@ class NotionStateManager(BaseStateManager):
         """
         Get service-specific configuration for agent execution.
 
+        The MCP server must talk to the same integration (shard) as this
+        manager, so the eval key is taken from the manager itself.
+
         Returns:
             Dictionary containing configuration needed by the agent/MCP server
         """
-        from src.config.config_schema import ConfigRegistry
+        return {"notion_key": self.eval_notion_key}
+
+    def get_verification_environment(self, messages_path: str = None) -> Dict[str, str]:
+        """Bind the verification script to this shard's evaluation integration.
+
+        The script's Notion requests are written next to messages.json and
+        merged into the task's API usage by :meth:`collect_api_usage`.
+        """
+        env = super().get_verification_environment(messages_path)
+        env["EVAL_NOTION_API_KEY"] = self.eval_notion_key
+        if messages_path:
+            from .api_stats import STATS_FILE_ENV
 
-        # Get the eval_api_key from config registry
-        config = ConfigRegistry.get_config("notion").get_all()
-        service_config = {}
+            self._verification_stats_path = Path(messages_path).parent / "notion_api_stats.verify.json"
+            self._verification_stats_path.unlink(missing_ok=True)
+            env[STATS_FILE_ENV] = str(self._verification_stats_path)
+        return env
+
+    # =========================================================================
+    # Resuming interrupted runs
+    # =========================================================================
 
-        if "eval_api_key" in config:
-            service_config["notion_key"] = config["eval_api_key"]
+    def get_resume_state(self, task: BaseTask) -> Dict[str, Any]:
+        """The duplicated page of *task*, so a later run can continue on it."""
+        if not isinstance(task, NotionTask) or not task.duplicated_initial_state_id:
+            return {}
+        return {
+            "page_id": task.duplicated_initial_state_id,
+            "page_url": task.duplicated_initial_state_url,
+            "original_url": task.original_initial_state_url,
+        }
+
+    @traced("notion.resume")
+    def resume(self, task: BaseTask, state: Dict[str, Any]) -> bool:
+        """Reattach *task* to its duplicated page, restoring it if cleanup archived it."""
+        page_id = state.get("page_id")
+        if not isinstance(task, NotionTask) or not page_id:
+            return False
+
+        self.api_stats.reset()
+        with self.api_stats.stage("setup"):
+            try:
+                page = self.eval_notion_client.pages.retrieve(page_id=page_id)
+                if page.get("archived") or page.get("in_trash"):
+                    self.eval_notion_client.pages.update(page_id=page_id, archived=False)
+                    logger.info("| ✓ Restored archived initial state: %s", page_id)
+            except Exception as e:
+                logger.warning("| ✗ Cannot resume on initial state %s: %s", page_id, e)
+                return False
+
+        self._store_initial_state_info(
+            task,
+            InitialStateInfo(
+                state_id=page_id,
+                state_url=state.get("page_url"),
+                metadata={
+                    "original_url": state.get("original_url"),
+                    "category": task.category_id,
+                    "task_name": task.name,
+                },
+            ),
+        )
+        logger.info("| ✓ Reattached to initial state %s for %s", page_id, task.name)
+        return True
+
+    # =========================================================================
+    # API usage accounting
+    # =========================================================================
 
-        return service_config
+    def set_up(self, task: BaseTask) -> bool:
+        self.api_stats.reset()
+        with self.api_stats.stage("setup"):
+            return super().set_up(task)
+
+    def clean_up(self, task: BaseTask = None) -> bool:
+        with self.api_stats.stage("cleanup"):
+            return super().clean_up(task)
+
+    def collect_api_usage(self) -> Dict[str, Any]:
+        """Notion requests of the current task per stage and endpoint; resets the counters."""
+        if self._verification_stats_path is not None:
+            self.api_stats.merge_file(self._verification_stats_path)
+            self._verification_stats_path = None
+        usage = self.api_stats.snapshot()
+        self.api_stats.reset()
+        return usage
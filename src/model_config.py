@@ -5,10 +5,15 @@ Model Configuration for MCPMark
 
 This module provides configuration management for different LLM models,
 automatically detecting the required API keys and base URLs based on the model name.
+
+Rate limits of the provider account (requests / tokens per minute) come from
+``<PROVIDER>_RPM_LIMIT`` / ``<PROVIDER>_TPM_LIMIT`` (e.g. ``OPENAI_TPM_LIMIT``)
+or from optional ``rpm`` / ``tpm`` entries in ``MODEL_CONFIGS``; they feed the
+LLM admission controller (``src.admission``). Unset means unlimited.
 """
 
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from src.logger import get_logger
 
@@ -186,6 +191,23 @@ class ModelConfig:
 
         self.litellm_input_model_name = model_info.get("litellm_input_model_name", model_name)
 
+        # Provider account budgets for LLM admission control
+        self.provider = model_info["provider"]
+        self.rpm = self._get_limit("RPM", model_info.get("rpm"))
+        self.tpm = self._get_limit("TPM", model_info.get("tpm"))
+
+    def _get_limit(self, kind: str, default: Optional[int]) -> Optional[int]:
+        """Reads ``<PROVIDER>_<KIND>_LIMIT`` from the environment, falling back to *default*."""
+        env_var = f"{self.provider.upper()}_{kind}_LIMIT"
+        value = os.getenv(env_var)
+        if not value:
+            return default
+        try:
+            return int(value) or None
+        except ValueError:
+            logger.warning(f"Ignoring invalid {env_var}={value!r}")
+            return default
+
     def _get_model_info(self, model_name: str) -> Dict[str, str]:
         """
         Retrieves the configuration details for a given model name.
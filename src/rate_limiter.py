@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Rate Limiting Utilities for MCPMark
+===================================
+
+Provides a small token-bucket rate limiter that can be shared between the
+synchronous code paths (state managers, Notion clients) and the asynchronous
+agent loop of a single evaluation shard.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting requests per second.
+
+    Each shard of an evaluation owns one limiter so that all traffic issued
+    with the same integration credentials stays within the provider budget.
+    """
+
+    def __init__(self, requests_per_second: float, burst: Optional[int] = None):
+        """
+        Args:
+            requests_per_second: Sustained number of requests allowed per second.
+            burst: Maximum number of requests that may be issued back-to-back
+                (defaults to one second worth of requests).
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+
+        self.rate = float(requests_per_second)
+        self.capacity = float(burst if burst is not None else max(1, int(self.rate)))
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RateLimiter(rate={self.rate}/s, burst={int(self.capacity)})"
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_refill
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+            # Tokens may go negative: the deficit is the queue of waiting callers
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block until a request may be issued. Returns the time waited."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Asynchronous variant of :meth:`acquire` that yields to the event loop."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
@@ -7,7 +7,7 @@ This module provides utilities for saving evaluation results in a structured for
 """
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -36,6 +36,8 @@ class TaskResult:
         turn_count: Number of turns taken during task execution.
         agent_execution_time: Time for Step 2 (agent execution) in seconds.
         task_execution_time: Total time for Steps 1-4 in seconds.
+        tool_stats: Per-tool call statistics (calls, errors, latency, bytes).
+        api_usage: Service API requests per stage and endpoint.
     """
 
     task_name: str
@@ -50,6 +52,8 @@ class TaskResult:
     turn_count: Optional[int] = None  # Number of turns taken during task execution
     agent_execution_time: float = 0.0  # Time for Step 2 (agent execution) in seconds
     task_execution_time: float = 0.0  # Total time for Steps 1-4 in seconds
+    tool_stats: Optional[Dict[str, Dict[str, Any]]] = None  # Per-tool call statistics
+    api_usage: Optional[Dict[str, Any]] = None  # Service API requests per stage / endpoint
 
     @property
     def status(self) -> str:
@@ -57,17 +61,187 @@ class TaskResult:
         return "PASS" if self.success else "FAIL"
 
 
+class TaskResultRecord:
+    """
+    Compact handle of a TaskResult that has been saved to its task directory.
+
+    Keeps the fields the reports aggregate; the trajectory and the large
+    meta.json fields (verification output, tool and API statistics) are read
+    from disk on access instead of being held for the whole evaluation.
+    """
+
+    __slots__ = (
+        "task_name",
+        "success",
+        "category_id",
+        "task_id",
+        "error_message",
+        "verification_error",
+        "token_usage",
+        "turn_count",
+        "agent_execution_time",
+        "task_execution_time",
+        "task_dir",
+    )
+
+    def __init__(
+        self,
+        task_name: str,
+        success: bool,
+        task_dir: Path,
+        category_id: Optional[str] = None,
+        task_id: Optional[str] = None,
+        error_message: Optional[str] = None,
+        verification_error: Optional[str] = None,
+        token_usage: Optional[Dict[str, int]] = None,
+        turn_count: Optional[int] = None,
+        agent_execution_time: float = 0.0,
+        task_execution_time: float = 0.0,
+    ):
+        self.task_name = task_name
+        self.success = success
+        self.task_dir = Path(task_dir)
+        self.category_id = category_id
+        self.task_id = task_id
+        self.error_message = error_message
+        self.verification_error = verification_error
+        self.token_usage = token_usage
+        self.turn_count = turn_count
+        self.agent_execution_time = agent_execution_time
+        self.task_execution_time = task_execution_time
+
+    @classmethod
+    def from_result(cls, result: TaskResult, task_dir: Path) -> "TaskResultRecord":
+        """Handle of *result*, whose messages.json and meta.json are in *task_dir*."""
+        return cls(
+            task_name=result.task_name,
+            success=result.success,
+            task_dir=task_dir,
+            category_id=result.category_id,
+            task_id=result.task_id,
+            error_message=result.error_message,
+            verification_error=result.verification_error,
+            token_usage=result.token_usage,
+            turn_count=result.turn_count,
+            agent_execution_time=result.agent_execution_time,
+            task_execution_time=result.task_execution_time,
+        )
+
+    @classmethod
+    def from_meta(cls, meta_data: Dict[str, Any], task_dir: Path, category_id, task_id) -> "TaskResultRecord":
+        """Handle of a result saved as *meta_data* in *task_dir*."""
+        execution_result = meta_data["execution_result"]
+        return cls(
+            task_name=meta_data["task_name"],
+            success=execution_result["success"],
+            task_dir=task_dir,
+            category_id=category_id,
+            task_id=task_id,
+            error_message=execution_result.get("error_message"),
+            verification_error=execution_result.get("verification_error"),
+            token_usage=meta_data.get("token_usage", {}),
+            turn_count=meta_data.get("turn_count"),
+            agent_execution_time=meta_data.get("agent_execution_time", 0.0),
+            task_execution_time=meta_data.get("task_execution_time", 0.0),
+        )
+
+    @property
+    def status(self) -> str:
+        """Returns the status of the task as 'PASS' or 'FAIL'."""
+        return "PASS" if self.success else "FAIL"
+
+    @property
+    def model_output(self) -> Optional[Any]:
+        """The saved trajectory (messages.json), loaded on every access."""
+        return self._read_json("messages.json")
+
+    @property
+    def verification_output(self) -> Optional[str]:
+        return (self._read_json("meta.json") or {}).get("execution_result", {}).get("verification_output")
+
+    @property
+    def tool_stats(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        return (self._read_json("meta.json") or {}).get("tool_stats")
+
+    @property
+    def api_usage(self) -> Optional[Dict[str, Any]]:
+        return (self._read_json("meta.json") or {}).get("api_usage")
+
+    def _read_json(self, name: str) -> Optional[Any]:
+        path = self.task_dir / name
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {path}: {e}")
+            return None
+
+    def __repr__(self) -> str:
+        return f"TaskResultRecord(task_name={self.task_name!r}, success={self.success})"
+
+
+_TOKEN_KEYS = ("input_tokens", "output_tokens", "total_tokens", "reasoning_tokens")
+
+
+def _empty_totals() -> Dict[str, float]:
+    return {
+        "total": 0,
+        "successful": 0,
+        "failed": 0,
+        **{key: 0 for key in _TOKEN_KEYS},
+        "turns": 0,
+        "task_execution_time": 0.0,
+        "agent_execution_time": 0.0,
+    }
+
+
 @dataclass
 class EvaluationReport:
-    """Represents a complete evaluation report for a model."""
+    """Represents a complete evaluation report for a model.
+
+    Token, time and turn totals (overall and per category) are accumulated
+    once when the report is built and on :meth:`add_result`, so the
+    properties below do not re-iterate the results.
+    """
 
     model_name: str
     model_config: Dict[str, Any]
     total_tasks: int
     successful_tasks: int
     failed_tasks: int
-    task_results: List[TaskResult]
+    task_results: List[Any]  # TaskResult or TaskResultRecord
     tasks_filter: Optional[str] = None
+    _totals: Dict[str, float] = field(init=False, repr=False, default_factory=_empty_totals)
+    _category_totals: Dict[str, Dict[str, float]] = field(init=False, repr=False, default_factory=dict)
+
+    def __post_init__(self):
+        for result in self.task_results:
+            self._accumulate(result)
+
+    def add_result(self, result: Any) -> None:
+        """Append a task result and update the counts and totals."""
+        self.task_results.append(result)
+        self.total_tasks += 1
+        if result.success:
+            self.successful_tasks += 1
+        else:
+            self.failed_tasks += 1
+        self._accumulate(result)
+
+    def _accumulate(self, result: Any) -> None:
+        category = result.category_id or "Uncategorized"
+        if category not in self._category_totals:
+            self._category_totals[category] = _empty_totals()
+        for totals in (self._totals, self._category_totals[category]):
+            totals["total"] += 1
+            totals["successful" if result.success else "failed"] += 1
+            if result.token_usage:
+                for key in _TOKEN_KEYS:
+                    totals[key] += result.token_usage.get(key) or 0
+            if result.turn_count is not None:
+                totals["turns"] += result.turn_count
+            totals["task_execution_time"] += result.task_execution_time
+            totals["agent_execution_time"] += result.agent_execution_time
 
     @property
     def success_rate(self) -> float:
@@ -78,39 +252,23 @@ class EvaluationReport:
 
     @property
     def total_input_tokens(self) -> int:
-        """Calculate total input tokens across all tasks."""
-        total = 0
-        for result in self.task_results:
-            if result.token_usage:
-                total += (result.token_usage.get("input_tokens") or 0)
-        return total
+        """Total input tokens across all tasks."""
+        return self._totals["input_tokens"]
 
     @property
     def total_output_tokens(self) -> int:
-        """Calculate total output tokens across all tasks."""
-        total = 0
-        for result in self.task_results:
-            if result.token_usage:
-                total += (result.token_usage.get("output_tokens") or 0)
-        return total
+        """Total output tokens across all tasks."""
+        return self._totals["output_tokens"]
 
     @property
     def total_tokens(self) -> int:
-        """Calculate total tokens across all tasks."""
-        total = 0
-        for result in self.task_results:
-            if result.token_usage:
-                total += (result.token_usage.get("total_tokens") or 0)
-        return total
+        """Total tokens across all tasks."""
+        return self._totals["total_tokens"]
     
     @property
     def total_reasoning_tokens(self) -> int:
-        """Calculate total reasoning tokens across all tasks."""
-        total = 0
-        for result in self.task_results:
-            if result.token_usage:
-                total += (result.token_usage.get("reasoning_tokens") or 0)
-        return total
+        """Total reasoning tokens across all tasks."""
+        return self._totals["reasoning_tokens"]
 
     @property
     def avg_input_tokens(self) -> float:
@@ -142,97 +300,41 @@ class EvaluationReport:
 
     @property
     def total_task_execution_time(self) -> float:
-        """Calculates the total task execution time from sum of all task execution times."""
+        """Total task execution time, summed over the tasks."""
         # Use sum of individual task execution times instead of pipeline wall clock time
         # This ensures resume functionality shows correct total time
-        return sum(task.task_execution_time for task in self.task_results)
+        return self._totals["task_execution_time"]
     
     @property
     def total_agent_execution_time(self) -> float:
-        """Calculates the total agent execution time (Step 2) across all tasks."""
-        return sum(task.agent_execution_time for task in self.task_results)
+        """Total agent execution time (Step 2) across all tasks."""
+        return self._totals["agent_execution_time"]
 
     def get_category_stats(self) -> Dict[str, Dict[str, Any]]:
         """
         Calculates and returns success statistics grouped by task category.
         """
         category_stats = {}
-
-        for result in self.task_results:
-            category = result.category_id or "Uncategorized"
-            if category not in category_stats:
-                category_stats[category] = {
-                    "total": 0,
-                    "successful": 0,
-                    "failed": 0,
-                    "success_rate": 0.0,
-                    "avg_execution_time": 0.0,
-                    "avg_agent_execution_time": 0.0,
-                    "total_input_tokens": 0,
-                    "total_output_tokens": 0,
-                    "total_tokens": 0,
-                    "total_reasoning_tokens": 0,
-                    "avg_input_tokens": 0.0,
-                    "avg_output_tokens": 0.0,
-                    "avg_total_tokens": 0.0,
-                    "avg_reasoning_tokens": 0.0,
-                    "total_turns": 0,
-                    "avg_turns": 0.0,
-                }
-
-            category_stats[category]["total"] += 1
-            if result.success:
-                category_stats[category]["successful"] += 1
-            else:
-                category_stats[category]["failed"] += 1
-
-            # Add token and turn usage
-            if result.token_usage:
-                category_stats[category]["total_input_tokens"] += (
-                    result.token_usage.get("input_tokens") or 0
-                )
-                category_stats[category]["total_output_tokens"] += (
-                    result.token_usage.get("output_tokens") or 0
-                )
-                category_stats[category]["total_tokens"] += (
-                    result.token_usage.get("total_tokens") or 0
-                )
-                category_stats[category]["total_reasoning_tokens"] += result.token_usage.get(
-                    "reasoning_tokens", 0
-                ) or 0
-
-            # Accumulate turns
-            if result.turn_count is not None:
-                category_stats[category]["total_turns"] += result.turn_count
-
-        # Calculate derived metrics like success rate and average time
-        for category, stats in category_stats.items():
-            if stats["total"] > 0:
-                stats["success_rate"] = (stats["successful"] / stats["total"]) * 100
-                category_results = [
-                    r
-                    for r in self.task_results
-                    if (r.category_id or "Uncategorized") == category
-                ]
-                total_time = sum(r.task_execution_time for r in category_results)
-                stats["avg_execution_time"] = total_time / len(category_results)
-                
-                # Add agent execution time stats
-                total_agent_time = sum(r.agent_execution_time for r in category_results)
-                stats["avg_agent_execution_time"] = total_agent_time / len(category_results)
-
-                # Calculate average tokens and turns
-                stats["avg_input_tokens"] = stats["total_input_tokens"] / stats["total"]
-                stats["avg_output_tokens"] = (
-                    stats["total_output_tokens"] / stats["total"]
-                )
-                stats["avg_total_tokens"] = stats["total_tokens"] / stats["total"]
-                stats["avg_reasoning_tokens"] = stats["total_reasoning_tokens"] / stats["total"]
-
-                stats["avg_turns"] = (
-                    stats["total_turns"] / stats["total"] if stats["total"] > 0 else 0
-                )
-
+        for category, totals in self._category_totals.items():
+            total = totals["total"]
+            category_stats[category] = {
+                "total": total,
+                "successful": totals["successful"],
+                "failed": totals["failed"],
+                "success_rate": (totals["successful"] / total) * 100,
+                "avg_execution_time": totals["task_execution_time"] / total,
+                "avg_agent_execution_time": totals["agent_execution_time"] / total,
+                "total_input_tokens": totals["input_tokens"],
+                "total_output_tokens": totals["output_tokens"],
+                "total_tokens": totals["total_tokens"],
+                "total_reasoning_tokens": totals["reasoning_tokens"],
+                "avg_input_tokens": totals["input_tokens"] / total,
+                "avg_output_tokens": totals["output_tokens"] / total,
+                "avg_total_tokens": totals["total_tokens"] / total,
+                "avg_reasoning_tokens": totals["reasoning_tokens"] / total,
+                "total_turns": totals["turns"],
+                "avg_turns": totals["turns"] / total,
+            }
         return category_stats
 
 
@@ -244,23 +346,24 @@ class ResultsReporter:
         pass
 
     def save_messages_json(self, messages: Any, output_path: Path) -> Path:
-        """Saves the conversation messages/trajectory as messages.json."""
+        """Saves the conversation messages/trajectory as compact messages.json.
+
+        The per-turn record lives in trajectory.jsonl; this is the final view
+        consumed by verification scripts.
+        """
         output_path.parent.mkdir(parents=True, exist_ok=True)
         with output_path.open("w", encoding="utf-8") as f:
-            json.dump(messages, f, indent=2, ensure_ascii=False)
+            json.dump(messages, f, ensure_ascii=False, separators=(",", ":"))
         return output_path
 
-    def save_meta_json(
+    def build_meta_data(
         self,
         task_result: TaskResult,
         model_config: Dict[str, Any],
         start_time: datetime,
         end_time: datetime,
-        output_path: Path,
-    ) -> Path:
-        """Saves task metadata (excluding messages) as meta.json."""
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
+    ) -> Dict[str, Any]:
+        """Builds the meta.json content (task metadata excluding messages)."""
         meta_data = {
             "task_name": task_result.task_name,
             "model_name": model_config.get("model_name", "unknown"),
@@ -279,7 +382,28 @@ class ResultsReporter:
             },
             "token_usage": task_result.token_usage or {},
             "turn_count": task_result.turn_count,
+            "tool_stats": task_result.tool_stats or {},
+            "api_usage": task_result.api_usage or {},
         }
+        for key in ("mcp_backend", "tool_schema_minifier"):
+            if model_config.get(key):
+                meta_data[key] = model_config[key]
+        return meta_data
+
+    def save_meta_json(
+        self,
+        task_result: TaskResult,
+        model_config: Dict[str, Any],
+        start_time: datetime,
+        end_time: datetime,
+        output_path: Path,
+        meta_data: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """Saves task metadata (excluding messages) as meta.json."""
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if meta_data is None:
+            meta_data = self.build_meta_data(task_result, model_config, start_time, end_time)
 
         with output_path.open("w", encoding="utf-8") as f:
             json.dump(meta_data, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Indexed Results Store for MCPMark
+=================================
+
+Keeps one row per task result in a local SQLite database, keyed by
+``(exp, model, service, run, task)``. The evaluator writes a row next to every
+``meta.json`` it saves, so resume checks, reports and the aggregator can query
+the index instead of walking the results tree and parsing every file.
+
+The database lives at ``results/<exp>/results.db``. Existing result
+directories can be imported once with::
+
+    python -m src.results_store --exp-name <exp>
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.aggregators.meta_loader import MetaFile, discover_meta_files, load_meta_files
+from src.logger import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+DB_FILENAME = "results.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    exp TEXT NOT NULL,
+    model TEXT NOT NULL,
+    service TEXT NOT NULL,
+    run TEXT NOT NULL,
+    task TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    error_message TEXT,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    total_tokens INTEGER,
+    reasoning_tokens INTEGER,
+    turn_count INTEGER,
+    agent_execution_time REAL,
+    task_execution_time REAL,
+    litellm_run_model_name TEXT,
+    meta TEXT NOT NULL,
+    PRIMARY KEY (exp, model, service, run, task)
+);
+CREATE INDEX IF NOT EXISTS idx_results_model_service_run
+    ON results (model, service, run);
+"""
+
+ResultKey = Tuple[str, str, str, str, str]
+
+
+class ResultsStore:
+    """Thread-safe SQLite index of task results (one row per meta.json)."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Several evaluator processes (one per model/service) may share one
+        # experiment database; WAL plus a busy timeout lets them interleave.
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=30, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_experiment(cls, exp_dir: Path) -> "ResultsStore":
+        """Open (or create) the store of the experiment rooted at *exp_dir*."""
+        return cls(Path(exp_dir) / DB_FILENAME)
+
+    @staticmethod
+    def exists_for_experiment(exp_dir: Path) -> bool:
+        return (Path(exp_dir) / DB_FILENAME).exists()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _row_from_meta(key: ResultKey, meta: Dict[str, Any]) -> Tuple:
+        execution_result = meta.get("execution_result", {}) or {}
+        token_usage = meta.get("token_usage", {}) or {}
+        return (
+            *key,
+            1 if execution_result.get("success") else 0,
+            execution_result.get("error_message"),
+            token_usage.get("input_tokens"),
+            token_usage.get("output_tokens"),
+            token_usage.get("total_tokens"),
+            token_usage.get("reasoning_tokens"),
+            meta.get("turn_count"),
+            meta.get("agent_execution_time"),
+            meta.get("task_execution_time"),
+            meta.get("litellm_run_model_name"),
+            json.dumps(meta, ensure_ascii=False),
+        )
+
+    def upsert_many(self, items: Iterable[Tuple[ResultKey, Dict[str, Any]]]) -> int:
+        """Insert or replace rows for ``(key, meta)`` pairs. Returns the row count."""
+        rows = [self._row_from_meta(key, meta) for key, meta in items]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def upsert(
+        self, exp: str, model: str, service: str, run: str, task: str, meta: Dict[str, Any]
+    ) -> None:
+        """Insert or replace the row of a single task result."""
+        self.upsert_many([((exp, model, service, run, task), meta)])
+
+    def delete(self, exp: str, model: str, service: str, run: str, task: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM results WHERE exp=? AND model=? AND service=? AND run=? AND task=?",
+                (exp, model, service, run, task),
+            )
+
+    def clear(self, exp: str) -> None:
+        """Remove every stored result of experiment *exp*."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results WHERE exp=?", (exp,))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_meta(
+        self, exp: str, model: str, service: str, run: str, task: str
+    ) -> Optional[Dict[str, Any]]:
+        """Return the stored meta.json content of one task result, if any."""
+        rows = self._query(
+            "SELECT meta FROM results WHERE exp=? AND model=? AND service=? AND run=? AND task=?",
+            (exp, model, service, run, task),
+        )
+        return json.loads(rows[0]["meta"]) if rows else None
+
+    def get_run_metas(
+        self, exp: str, model: str, service: str, run: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Return ``{task: meta}`` for every stored result of one run."""
+        rows = self._query(
+            "SELECT task, meta FROM results WHERE exp=? AND model=? AND service=? AND run=?",
+            (exp, model, service, run),
+        )
+        return {row["task"]: json.loads(row["meta"]) for row in rows}
+
+    def count(self, exp: str, model: Optional[str] = None, service: Optional[str] = None,
+              run: Optional[str] = None) -> int:
+        """Count stored results, optionally narrowed to a model/service/run."""
+        sql = "SELECT COUNT(*) FROM results WHERE exp=?"
+        params: List[str] = [exp]
+        for column, value in (("model", model), ("service", service), ("run", run)):
+            if value is not None:
+                sql += f" AND {column}=?"
+                params.append(value)
+        return self._query(sql, tuple(params))[0][0]
+
+    def collect_results(self, exp: str, k: int) -> Dict[str, Dict[str, Any]]:
+        """Return results nested as ``model -> service -> run-N -> task -> meta``.
+
+        Mirrors ``aggregate_results.collect_results``: only ``run-1`` .. ``run-k``
+        are returned and ``playwright_webarena`` is reported as ``playwright``.
+        """
+        runs = tuple(f"run-{idx}" for idx in range(1, k + 1))
+        if not runs:
+            return {}
+        placeholders = ", ".join("?" for _ in runs)
+        rows = self._query(
+            f"SELECT model, service, run, task, meta FROM results "
+            f"WHERE exp=? AND run IN ({placeholders})",
+            (exp, *runs),
+        )
+
+        results = defaultdict(lambda: defaultdict(lambda: defaultdict(dict)))
+        for row in rows:
+            service = "playwright" if row["service"] == "playwright_webarena" else row["service"]
+            results[row["model"]][service][row["run"]][row["task"]] = json.loads(row["meta"])
+        return results
+
+    # ------------------------------------------------------------------
+    # Import of existing result directories
+    # ------------------------------------------------------------------
+
+    def import_run_dir(
+        self, exp: str, model: str, service: str, run_dir: Path
+    ) -> Tuple[int, List[Path]]:
+        """Import every ``<task>/meta.json`` below *run_dir*.
+
+        Returns:
+            Tuple of (rows imported, meta.json files that could not be parsed)
+        """
+        files = [
+            (model, service, run_dir.name, task_dir.name, str(task_dir / "meta.json"))
+            for task_dir in run_dir.iterdir()
+            if task_dir.is_dir() and "__" in task_dir.name
+        ]
+        return self._import_files(exp, files)
+
+    def import_experiment_dir(self, exp_dir: Path) -> Tuple[int, List[Path]]:
+        """Import ``<exp_dir>/<model>__<service>/<run>/<task>/meta.json`` files."""
+        exp_dir = Path(exp_dir)
+        return self._import_files(exp_dir.name, discover_meta_files(exp_dir))
+
+    def _import_files(self, exp: str, files: List[MetaFile]) -> Tuple[int, List[Path]]:
+        # Keep the full documents (and the on-disk service name) in the store
+        report = load_meta_files(files, fields=None, normalize_services=False)
+        for path, reason in report.skipped:
+            logger.warning("Skipping unreadable %s: %s", path, reason)
+
+        items = [
+            ((exp, model, service, run, task), meta)
+            for model, services in report.results.items()
+            for service, runs in services.items()
+            for run, tasks in runs.items()
+            for task, meta in tasks.items()
+        ]
+        return self.upsert_many(items), [Path(path) for path, _ in report.skipped]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import existing MCPMark result directories into the results index"
+    )
+    parser.add_argument("--exp-name", required=True, help="Experiment name")
+    parser.add_argument(
+        "--results-dir",
+        type=Path,
+        default=Path("./results"),
+        help="Root results directory (default: ./results)",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Drop the existing index before importing",
+    )
+    args = parser.parse_args()
+
+    exp_dir = args.results_dir / args.exp_name
+    if not exp_dir.exists():
+        print(f"❌ Experiment directory {exp_dir} does not exist")
+        return 1
+
+    db_path = exp_dir / DB_FILENAME
+    store = ResultsStore(db_path)
+    if args.rebuild:
+        store.clear(exp_dir.name)
+    imported, skipped = store.import_experiment_dir(exp_dir)
+    store.close()
+
+    print(f"📥 Imported {imported} results into {db_path}")
+    if skipped:
+        print(f"⚠️  Skipped {len(skipped)} unreadable meta.json files")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
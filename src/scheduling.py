@@ -0,0 +1,147 @@
+"""
+Longest-Processing-Time-First Task Scheduling
+=============================================
+
+Tasks run in ``filter_tasks`` order, i.e. sorted by ``(category_id,
+task_id)``. When several shards pull from one queue, a long task that
+happens to sort last keeps one shard busy while the others idle, and that
+stretches the makespan.
+
+:class:`TaskDurationEstimator` predicts each task's duration from the
+``meta.json`` files of earlier experiments:
+
+- the median ``task_execution_time`` of the task's earlier runs;
+- for results without a time, the median ``turn_count`` times the observed
+  seconds per turn;
+- for tasks never run before, the median of their category, or else of all
+  tasks.
+
+:func:`schedule_longest_first` orders tasks by decreasing estimate (the LPT
+rule) and simulates greedy assignment to the workers, which gives the
+predicted makespan that the evaluator reports next to the actual one.
+"""
+
+import heapq
+import statistics
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.aggregators.meta_loader import discover_meta_files, load_meta_files
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+_HISTORY_FIELDS = {"task_execution_time": None, "turn_count": None, "early_stopped": None}
+
+
+@dataclass
+class TaskDurationEstimator:
+    """Per-task duration estimates (seconds), keyed by ``<category>__<task>`` directory name."""
+
+    times: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    turns: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+
+    @classmethod
+    def from_results(
+        cls, results_root: Path, service: str, model: Optional[str] = None
+    ) -> "TaskDurationEstimator":
+        """Collect durations of *service* tasks from every experiment below *results_root*.
+
+        Args:
+            results_root: Directory holding the experiment directories (``results/``)
+            service: Service directory suffix (``<model>__<service>``)
+            model: Only use this model's results if it has any for a task
+        """
+        files = []
+        for exp_dir in (path for path in Path(results_root).iterdir() if path.is_dir()):
+            files.extend(f for f in discover_meta_files(exp_dir) if f[1] == service)
+        report = load_meta_files(files, fields=_HISTORY_FIELDS, normalize_services=False)
+
+        estimator = cls()
+        own_model_tasks = set()
+        observations: List[Tuple[str, str, dict]] = []
+        for model_name, services in report.results.items():
+            for runs in services.values():
+                for tasks in runs.values():
+                    for task_dir, meta in tasks.items():
+                        if meta.get("early_stopped"):
+                            continue
+                        observations.append((model_name, task_dir, meta))
+                        if model_name == model:
+                            own_model_tasks.add(task_dir)
+
+        for model_name, task_dir, meta in observations:
+            if task_dir in own_model_tasks and model_name != model:
+                continue
+            seconds = meta.get("task_execution_time")
+            if isinstance(seconds, (int, float)) and seconds > 0:
+                estimator.times[task_dir].append(float(seconds))
+            turn_count = meta.get("turn_count")
+            if isinstance(turn_count, int) and turn_count > 0:
+                estimator.turns[task_dir].append(turn_count)
+        logger.debug(
+            "Duration history for %d %s tasks from %d results", len(estimator.times), service, len(observations)
+        )
+        return estimator
+
+    def __bool__(self) -> bool:
+        return bool(self.times)
+
+    def _seconds_per_turn(self) -> Optional[float]:
+        ratios = [
+            statistics.median(self.times[task]) / statistics.median(self.turns[task])
+            for task in self.times
+            if self.turns.get(task)
+        ]
+        return statistics.median(ratios) if ratios else None
+
+    def estimate_all(self, task_dirs: Iterable[str]) -> Dict[str, float]:
+        """Estimated seconds for each of *task_dirs*."""
+        task_dirs = list(task_dirs)
+        estimates: Dict[str, float] = {}
+        seconds_per_turn = self._seconds_per_turn()
+        for task_dir in task_dirs:
+            if self.times.get(task_dir):
+                estimates[task_dir] = statistics.median(self.times[task_dir])
+            elif seconds_per_turn and self.turns.get(task_dir):
+                estimates[task_dir] = seconds_per_turn * statistics.median(self.turns[task_dir])
+
+        by_category: Dict[str, List[float]] = defaultdict(list)
+        for task_dir, seconds in estimates.items():
+            by_category[task_dir.split("__", 1)[0]].append(seconds)
+        overall = statistics.median(estimates.values()) if estimates else 0.0
+        for task_dir in task_dirs:
+            if task_dir not in estimates:
+                category = by_category.get(task_dir.split("__", 1)[0])
+                estimates[task_dir] = statistics.median(category) if category else overall
+        return estimates
+
+
+def predicted_makespan(durations: Sequence[float], workers: int) -> float:
+    """Makespan of greedily assigning *durations*, in order, to the first free of *workers*."""
+    finish_times = [0.0] * max(workers, 1)
+    for duration in durations:
+        heapq.heappush(finish_times, heapq.heappop(finish_times) + duration)
+    return max(finish_times)
+
+
+def schedule_longest_first(
+    tasks: Sequence, estimates: Dict[str, float], key, workers: int
+) -> Tuple[List, float]:
+    """Order *tasks* longest first.
+
+    Args:
+        tasks: Tasks to schedule
+        estimates: Estimated seconds per task key
+        key: Maps a task to its key in *estimates*
+        workers: Number of workers pulling from the queue
+
+    Returns:
+        Tuple of (ordered tasks, predicted makespan in seconds)
+    """
+    # Stable sort: equal estimates keep their original (category, task) order
+    ordered = sorted(tasks, key=lambda task: -estimates.get(key(task), 0.0))
+    makespan = predicted_makespan([estimates.get(key(task), 0.0) for task in ordered], workers)
+    return ordered, makespan
@@ -38,6 +38,24 @@ SERVICES = {
                 "required": True,
                 "description": "Title of the parent page in evaluation workspace",
             },
+            "eval_shards": {
+                "env_var": "NOTION_EVAL_SHARDS",
+                "default": None,
+                "required": False,
+                "description": (
+                    "Optional ';'-separated list of 'eval_key,eval_hub_title,source_key,storage_state' "
+                    "tuples, one per Notion integration used to shard evaluation. When set, the "
+                    "shards replace the single integration above; empty fields fall back to it"
+                ),
+                "transform": "tuple_list",  # Split by ';' then by ','
+            },
+            "shard_requests_per_second": {
+                "env_var": "NOTION_SHARD_RPS",
+                "default": 3,
+                "required": False,
+                "description": "Notion API request budget per shard (Notion allows ~3 req/s per integration)",
+                "transform": "int",
+            },
             "playwright_headless": {
                 "env_var": "PLAYWRIGHT_HEADLESS",
                 "default": True,
@@ -73,6 +91,22 @@ SERVICES = {
                 "browser": "playwright_browser",
             },
         },
+        # Optional sharding across several Notion integrations. The shards replace
+        # the unsharded integration: each tuple overrides the state manager params
+        # below (positionally), and gets its own rate limiter so throughput scales
+        # with provisioned integrations. Shards sharing an eval hub don't clean it.
+        "sharding": {
+            "shards": "eval_shards",
+            "fields": [
+                "eval_notion_key",
+                "eval_parent_page_title",
+                "source_notion_key",
+                "state_file",
+            ],
+            "requests_per_second": "shard_requests_per_second",
+            "hub_field": "eval_parent_page_title",
+            "hub_cleanup_param": "cleanup_orphans",
+        },
         # MCP server is now instantiated dynamically in MCPAgent; kept for backward
         # compatibility but set to None to indicate deprecation.
         "mcp_server": None,
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Tracing for MCPMark
+===================
+
+Lightweight nested spans (task → stage → agent turn → LLM request / tool
+call) exported to a local JSONL file, one OTLP-style span per line. The current
+span is tracked in a ``contextvars.ContextVar`` so nesting follows both
+``await`` chains and ``asyncio.to_thread`` calls without passing spans around.
+
+The active :class:`Tracer` is looked up the same way: :func:`use_tracer`
+makes a tracer active for the current context (and the tasks and threads it
+starts), so several evaluators in one process each write their own trace
+file. :func:`configure_tracing` sets the process-wide fallback. Without
+either, tracing is off and spans are no-ops.
+
+Finished spans are buffered and written out at most every
+``FLUSH_INTERVAL_S`` seconds, and when the tracer is closed.
+
+Print the critical-path breakdown of a trace with::
+
+    python -m src.tracing results/<exp>/<model>__<service>/<run>/trace.jsonl
+"""
+
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "mcpmark_current_span", default=None
+)
+_active_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar(
+    "mcpmark_active_tracer", default=None
+)
+
+FLUSH_INTERVAL_S = 2.0
+
+
+def _new_id(num_bytes: int) -> str:
+    return os.urandom(num_bytes).hex()
+
+
+class Span:
+    """A timed operation with attributes; ended spans are handed to the exporter."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+        "attributes", "status", "status_message", "_tracer",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else _new_id(16)
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = "OK"
+        self.status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: Union[int, float] = 1) -> None:
+        """Increment a numeric attribute (e.g. retry counts)."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def set_error(self, message: str) -> None:
+        self.status = "ERROR"
+        self.status_message = message
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self._tracer._export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status},
+        }
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """Span stand-in used while tracing is disabled."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, key: str, amount: Union[int, float] = 1) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Creates spans and appends finished ones to a JSONL file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = self.path.open("a", encoding="utf-8")
+        self._closed = False
+        self._last_flush = time.monotonic()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        """Start a span without making it current (end it with ``span.end()``)."""
+        if parent is None:
+            parent = _current_span.get()
+        return Span(self, name, parent, attributes)
+
+    def _export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            if self._closed:
+                return  # span outlived its run; nothing to write to
+            # Buffered by the file object; flushed periodically, not per span
+            self._file.write(line + "\n")
+            now = time.monotonic()
+            if now - self._last_flush >= FLUSH_INTERVAL_S:
+                self._file.flush()
+                self._last_flush = now
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._file.flush()
+                self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._file.close()
+
+
+_tracer: Optional[Tracer] = None
+
+
+def configure_tracing(path: Union[str, Path, None]) -> Optional[Tracer]:
+    """Export spans to *path* from now on, process-wide (``None`` disables tracing).
+
+    Contexts with a tracer from :func:`use_tracer` keep using it.
+    """
+    global _tracer
+    previous = _tracer
+    _tracer = Tracer(path) if path else None
+    if previous is not None:
+        previous.flush()
+    return _tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """The tracer spans of the current context go to (None when tracing is off)."""
+    tracer = _active_tracer.get()
+    return tracer if tracer is not None else _tracer
+
+
+@contextmanager
+def use_tracer(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """Make *tracer* active in the block, and in tasks and threads started from it."""
+    token = _active_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _active_tracer.reset(token)
+
+
+def start_span(name: str, parent: Optional[Span] = None, **attributes: Any):
+    """Start a detached span (not made current); returns a no-op span when disabled."""
+    tracer = get_tracer()
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.start_span(name, parent, **attributes)
+
+
+@contextmanager
+def trace_span(name: str, parent: Optional[Span] = None, **attributes: Any) -> Iterator[Union[Span, _NoopSpan]]:
+    """Run the block inside a span that is current for nested spans.
+
+    Exceptions mark the span as failed and are re-raised.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+
+    span = tracer.start_span(name, parent, **attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.set_error(f"{type(exc).__name__}: {exc}")
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def current_span() -> Union[Span, _NoopSpan]:
+    """The innermost active span (a no-op span outside of any)."""
+    span = _current_span.get()
+    return span if span is not None and get_tracer() is not None else NOOP_SPAN
+
+
+def traced(name: str) -> Callable:
+    """Decorator running each call of a (sync or async) function in a span."""
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with trace_span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ----------------------------------------------------------------------
+# Critical-path analysis
+# ----------------------------------------------------------------------
+
+
+def load_spans(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return spans
+
+
+def critical_path(span: Dict[str, Any], children: Dict[str, List[Dict[str, Any]]]) -> Dict[str, float]:
+    """Attribute the wall time of *span* to the spans on its critical path.
+
+    Walks backwards from the span's end, repeatedly descending into the child
+    that finished last before the cursor; time not covered by a child counts
+    as the span's own ("self") time. Returns seconds per span name.
+    """
+    breakdown: Dict[str, float] = defaultdict(float)
+    cursor = span["endTimeUnixNano"]
+    start = span["startTimeUnixNano"]
+    pending = sorted(children.get(span["spanId"], []), key=lambda s: s["endTimeUnixNano"])
+
+    while cursor > start:
+        candidates = [c for c in pending if c["endTimeUnixNano"] <= cursor and c["startTimeUnixNano"] < cursor]
+        if not candidates:
+            breakdown[span["name"]] += (cursor - start) / 1e9
+            break
+        child = candidates[-1]
+        breakdown[span["name"]] += (cursor - child["endTimeUnixNano"]) / 1e9
+        for name, seconds in critical_path(child, children).items():
+            breakdown[name] += seconds
+        cursor = max(start, child["startTimeUnixNano"])
+        pending = [c for c in pending if c["endTimeUnixNano"] <= cursor]
+
+    return breakdown
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Critical-path breakdown of an MCPMark trace")
+    parser.add_argument("trace", type=Path, help="trace.jsonl written during an evaluation run")
+    parser.add_argument("--root", default="task", help="Span name to treat as root (default: task)")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print (default: 20)")
+    args = parser.parse_args()
+
+    spans = [s for s in load_spans(args.trace) if s.get("endTimeUnixNano")]
+    if not spans:
+        print(f"❌ No spans found in {args.trace}")
+        return 1
+
+    children: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        if span.get("parentSpanId"):
+            children[span["parentSpanId"]].append(span)
+
+    roots = [s for s in spans if s["name"] == args.root] or [s for s in spans if not s.get("parentSpanId")]
+
+    totals: Dict[str, float] = defaultdict(float)
+    wall = 0.0
+    for root in roots:
+        wall += (root["endTimeUnixNano"] - root["startTimeUnixNano"]) / 1e9
+        for name, seconds in critical_path(root, children).items():
+            totals[name] += seconds
+
+    counts: Dict[str, int] = defaultdict(int)
+    for span in spans:
+        counts[span["name"]] += 1
+
+    print(f"🧭 Critical path over {len(roots)} '{args.root}' spans ({wall:.1f}s total)\n")
+    print(f"  {'span':<28} {'critical s':>11} {'share':>7} {'count':>7}")
+    for name, seconds in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        share = seconds / wall if wall else 0.0
+        print(f"  {name:<28} {seconds:>11.2f} {share:>7.1%} {counts[name]:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
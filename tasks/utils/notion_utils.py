@@ -14,6 +14,12 @@ def get_notion_client():
             file=sys.stderr,
         )
         sys.exit(1)
+
+    # When run by the evaluator, count this script's requests towards the task
+    if os.getenv("NOTION_API_STATS_FILE"):
+        from src.mcp_services.notion.api_stats import create_counting_client, stats_from_environment
+
+        return create_counting_client(api_key, stats_from_environment())
     return Client(auth=api_key)
 
 